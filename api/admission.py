@@ -0,0 +1,125 @@
+"""Cost-based admission control for the generation endpoints.
+
+Every generation request carries an estimated CPU cost (see core/cost.py).
+Requests run immediately while the total in-flight cost fits the budget, wait
+in a FIFO queue up to `max_queue` entries, and are rejected with
+`Overloaded` beyond that (the API turns it into 503 + Retry-After).
+"""
+
+import asyncio
+import math
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Tuple
+
+
+class Overloaded(Exception):
+    """Raised when a request can't be admitted; `retry_after` is in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Server is at capacity, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """FIFO admission by estimated cost against a fixed in-flight budget.
+
+    A request costing more than the whole budget is clamped to it, so it is
+    still served, just alone.
+    """
+
+    def __init__(self, capacity: float, max_queue: int, queue_timeout: float):
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._in_use = 0.0
+        self._running = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._waiters: Deque[Tuple[float, asyncio.Future]] = deque()
+
+    async def acquire(self, cost: float) -> float:
+        """Wait for room for `cost`; returns the ticket to pass to `release`."""
+        cost = min(max(cost, 0.0), self.capacity)
+        if not self._waiters and self._in_use + cost <= self.capacity:
+            self._grant(cost)
+            return cost
+
+        if len(self._waiters) >= self.max_queue:
+            self._rejected += 1
+            raise Overloaded(self._retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (cost, future)
+        self._waiters.append(entry)
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except BaseException as exc:
+            self._abandon(entry)
+            if isinstance(exc, asyncio.TimeoutError):
+                self._rejected += 1
+                raise Overloaded(self._retry_after()) from None
+            raise
+        return cost
+
+    def release(self, cost: float) -> None:
+        self._in_use = max(0.0, self._in_use - cost)
+        self._running -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def admit(self, cost: float):
+        ticket = await self.acquire(cost)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    def status(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "in_use": round(self._in_use, 1),
+            "available": round(max(0.0, self.capacity - self._in_use), 1),
+            "running": self._running,
+            "queued": len(self._waiters),
+            "queued_cost": round(sum(cost for cost, _ in self._waiters), 1),
+            "max_queue": self.max_queue,
+            "admitted_total": self._admitted,
+            "rejected_total": self._rejected,
+        }
+
+    def _grant(self, cost: float) -> None:
+        self._in_use += cost
+        self._running += 1
+        self._admitted += 1
+
+    def _wake(self) -> None:
+        while self._waiters:
+            cost, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if self._in_use + cost > self.capacity:
+                break
+            self._waiters.popleft()
+            self._grant(cost)
+            future.set_result(None)
+
+    def _abandon(self, entry) -> None:
+        """Clean up after a waiter timed out or was cancelled."""
+        cost, future = entry
+        if future.done() and not future.cancelled():
+            # Granted just as we gave up waiting: hand the slot back.
+            self.release(cost)
+            return
+        future.cancel()
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            pass
+        self._wake()
+
+    def _retry_after(self) -> int:
+        # Cost is in CPU microseconds; assume the backlog drains at ~1 core.
+        backlog = self._in_use + sum(cost for cost, _ in self._waiters)
+        return max(1, math.ceil(backlog / 1_000_000))
@@ -1,9 +1,20 @@
 """FastAPI application for synthetic data generation."""
 
+import asyncio
+import hashlib
+import io
+import json
 import os
-from fastapi import Depends, FastAPI, HTTPException
-from fastapi.responses import JSONResponse, PlainTextResponse
-from typing import Union
+import secrets
+import tarfile
+import time
+import zipfile
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Awaitable, Callable, Dict, Optional, Union
 import sys
 from pathlib import Path
 
@@ -11,24 +22,43 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core import SyntheticDataEngine, FieldSchema
+from core.cancellation import CancellationToken, Deadline, DeadlineExceeded, GenerationCancelled
+from core.cost import estimate_cost
+from core.progress import ProgressBoard, sse_event
+from core.registry import registry
 from core.kaggle_client import KaggleClient, KaggleError
 from core.schema_learner import infer_schema
 from formatters import CSVFormatter, JSONFormatter, SQLFormatter
 from api.models import (
     GenerateRequest, GenerateResponse, FieldTypesResponse,
-    FieldTypeInfo, ErrorResponse, FieldConfig,
+    ErrorResponse, FieldConfig,
     KaggleSearchRequest, KaggleSearchResponse, KaggleDatasetInfo,
-    KaggleCloneRequest, KaggleSchemaResponse,
+    KaggleCloneRequest, KaggleSchemaResponse, BatchGenerateRequest,
 )
 from api.auth import (
-    ApiUser, get_current_user, consume_request_quota,
-    enforce_row_limit,
+    ApiUser, get_current_user, consume_request_quota, consume_requests,
+    refund_requests, enforce_row_limit,
+    ADMISSION_CAPACITY, ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT,
 )
+from api.admission import AdmissionController, Overloaded
 
 _IS_PRODUCTION = os.environ.get('PRODUCTION') == '1' or os.environ.get('FLASK_ENV') == 'production'
 _DOCS_ENABLED = os.environ.get('API_DOCS_ENABLED', '0' if _IS_PRODUCTION else '1') == '1'
+_WARMUP_ENABLED = os.environ.get('SYNGEN_WARMUP', '1') == '1'
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build generator state before the first request rather than during it.
+    # A no-op in workers forked from an already warmed gunicorn master.
+    if _WARMUP_ENABLED:
+        from core.warmup import warm_up
+        await run_in_threadpool(warm_up)
+    yield
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Syngen API",
     description="REST API for generating synthetic data with customizable fields and output formats",
     version="1.0.0",
@@ -38,6 +68,167 @@ app = FastAPI(
 )
 
 
+admission = AdmissionController(ADMISSION_CAPACITY, ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT)
+
+
+progress_board = ProgressBoard()
+PROGRESS_IDLE_TIMEOUT = 60.0
+
+# How often a generating request checks whether its client is still there
+DISCONNECT_POLL_INTERVAL = 0.5
+# Non-standard "client closed request" status, logged for abandoned generations
+CLIENT_CLOSED_REQUEST = 499
+
+
+class ClientDisconnected(Exception):
+    """The client went away before its generation finished."""
+
+
+def _progress_key(user: ApiUser, progress_id: str) -> str:
+    # Scoped per user so one caller can't follow another's generation
+    return f"{user.id}:{progress_id}"
+
+
+def _overloaded(exc: Overloaded, user: ApiUser, count: int = 1) -> HTTPException:
+    """503 for a request turned away by admission control; its quota is given back."""
+    refund_requests(user, count)
+    return HTTPException(
+        status_code=503,
+        detail=str(exc),
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _build_fields(field_configs) -> list:
+    """Convert API field models to validated FieldSchema objects."""
+    fields = []
+    for field_config in field_configs:
+        field_schema = FieldSchema(
+            name=field_config.name,
+            field_type=field_config.type,
+            constraints=field_config.constraints or {}
+        )
+        field_schema.validate()
+        fields.append(field_schema)
+    return fields
+
+
+# format -> (media type, file extension)
+_FORMAT_MEDIA = {
+    "json": ("application/json", "json"),
+    "csv": ("text/csv", "csv"),
+    "sql": ("text/plain", "sql"),
+}
+
+
+def _encode_table(data: list, output_format: str, table_name: str,
+                  cancel: Optional[CancellationToken] = None) -> bytes:
+    """Encode generated rows in the requested output format."""
+    if output_format == "csv":
+        return CSVFormatter.format(data, cancel=cancel).encode("utf-8")
+    if output_format == "sql":
+        return SQLFormatter.format(data, table_name, cancel=cancel).encode("utf-8")
+    return JSONFormatter.encode(data, cancel=cancel)
+
+
+def _deadline_exceeded(exc: DeadlineExceeded) -> HTTPException:
+    return HTTPException(status_code=504, detail=str(exc))
+
+
+async def _until_disconnected(http_request: Request, work: Awaitable,
+                              cancel: Optional[CancellationToken] = None):
+    """Await `work`, abandoning it if the client disconnects first.
+
+    On disconnect `cancel` is set, so generation running in a worker thread
+    stops at its next batch, and ClientDisconnected is raised.
+    """
+    task = asyncio.ensure_future(work)
+
+    async def watch() -> None:
+        while not await http_request.is_disconnected():
+            await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+    watcher = asyncio.ensure_future(watch())
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except BaseException:
+        if cancel is not None:
+            cancel.cancel()
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+    if task.done():
+        return task.result()
+    if cancel is not None:
+        cancel.cancel()
+    task.cancel()
+    raise ClientDisconnected()
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Future, cancel: CancellationToken):
+        self.task = task
+        self.cancel = cancel
+        self.waiters = 0
+
+
+class _SingleFlight:
+    """Coalesces concurrent calls with the same key onto one in-flight computation.
+
+    The first caller starts `work(cancel)`; callers that arrive with the same
+    key while it is running await the same result instead of repeating it.
+    The shared work is only cancelled once every waiter has gone away.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, _Flight] = {}
+
+    async def run(self, key: str, work: Callable[[CancellationToken], Awaitable[bytes]]) -> bytes:
+        flight = self._inflight.get(key)
+        if flight is None:
+            cancel = CancellationToken()
+            flight = _Flight(asyncio.ensure_future(work(cancel)), cancel)
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda t: self._forget(key, flight))
+        flight.waiters += 1
+        try:
+            # shield: one caller disconnecting must not cancel the others' result
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                flight.cancel.cancel()
+                self._forget(key, flight)
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        task = flight.task
+        if task.done() and not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+
+_single_flight = _SingleFlight()
+
+
+def _request_key(request) -> str:
+    """Canonical hash of a generation request, used to coalesce identical ones."""
+    canonical = json.dumps(request.model_dump(), sort_keys=True,
+                           separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _json_rows_response(meta: dict, data: list) -> Response:
+    """JSON response whose rows are encoded once by the formatter and spliced into the envelope.
+
+    Skips JSONResponse/response_model rendering, which would walk every row
+    dict a second time.
+    """
+    body = JSONFormatter.envelope(meta, JSONFormatter.encode(data))
+    return Response(content=body, media_type="application/json")
+
+
 @app.get("/", tags=["General"])
 async def root():
     """Health check endpoint."""
@@ -55,215 +246,50 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/status", tags=["General"])
+async def status():
+    """Current admission budget and queue for this API process.
+
+    Costs are estimated CPU microseconds (rows x per-field-type weights).
+    """
+    return {"status": "healthy", "admission": admission.status()}
+
+
+FIELD_TYPES_MAX_AGE = 3600
+
+# (registry version, JSON body, ETag) of the last /field-types rendering
+_field_types_rendered: Optional[tuple] = None
+
+
+def _render_field_types() -> tuple:
+    """/field-types body and ETag, re-rendered only when the registry changes."""
+    global _field_types_rendered
+    len(registry)  # discovers plugin types first, which bumps the version
+    if _field_types_rendered is None or _field_types_rendered[0] != registry.version:
+        field_types = [field_type.to_dict() for field_type in registry.values()]
+        body = json.dumps({"field_types": field_types}, separators=(",", ":")).encode()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        _field_types_rendered = (registry.version, body, etag)
+    return _field_types_rendered
+
+
 @app.get("/field-types", response_model=FieldTypesResponse, tags=["Info"])
-async def get_field_types():
-    """Get list of supported field types and their constraints."""
-    field_types = [
-        FieldTypeInfo(
-            type="integer",
-            description="Random integer within range",
-            supported_constraints=["min", "max"]
-        ),
-        FieldTypeInfo(
-            type="float",
-            description="Random floating-point number",
-            supported_constraints=["min", "max", "precision"]
-        ),
-        FieldTypeInfo(
-            type="string",
-            description="Random alphanumeric string",
-            supported_constraints=["length", "min_length", "max_length", "charset"]
-        ),
-        FieldTypeInfo(
-            type="email",
-            description="Random email address",
-            supported_constraints=["domain"]
-        ),
-        FieldTypeInfo(
-            type="phone",
-            description="Random phone number",
-            supported_constraints=["format"]
-        ),
-        FieldTypeInfo(
-            type="date",
-            description="Random date within range",
-            supported_constraints=["start", "end", "format"]
-        ),
-        FieldTypeInfo(
-            type="datetime",
-            description="Random datetime within range",
-            supported_constraints=["start", "end", "format"]
-        ),
-        FieldTypeInfo(
-            type="boolean",
-            description="Random boolean value",
-            supported_constraints=["true_probability"]
-        ),
-        FieldTypeInfo(
-            type="uuid",
-            description="Universally unique identifier",
-            supported_constraints=["version"]
-        ),
-        FieldTypeInfo(
-            type="name",
-            description="Random person name",
-            supported_constraints=["type"]
-        ),
-        FieldTypeInfo(
-            type="address",
-            description="Random street address",
-            supported_constraints=[]
-        ),
-        FieldTypeInfo(
-            type="city",
-            description="Random city name",
-            supported_constraints=[]
-        ),
-        FieldTypeInfo(
-            type="country",
-            description="Random country name",
-            supported_constraints=[]
-        ),
-        FieldTypeInfo(
-            type="company",
-            description="Random company name",
-            supported_constraints=[]
-        ),
-        FieldTypeInfo(
-            type="url",
-            description="Random URL",
-            supported_constraints=[]
-        ),
-        FieldTypeInfo(
-            type="category",
-            description="Random value sampled from a custom list, optionally weighted",
-            supported_constraints=["choices", "weights"]
-        ),
-        # Call center metrics
-        FieldTypeInfo(
-            type="call_duration",
-            description="Call handle time in seconds (right-skewed distribution)",
-            supported_constraints=["min", "max", "mean"]
-        ),
-        FieldTypeInfo(
-            type="wait_time",
-            description="Time in queue before being answered, in seconds",
-            supported_constraints=["min", "max", "mean"]
-        ),
-        FieldTypeInfo(
-            type="hold_time",
-            description="Time on hold during the call, in seconds",
-            supported_constraints=["min", "max", "mean"]
-        ),
-        FieldTypeInfo(
-            type="call_type",
-            description="Call direction (Inbound/Outbound)",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="call_channel",
-            description="Contact channel (Phone/Chat/Email/Social Media)",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="call_department",
-            description="Queue/department that handled the call",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="agent_id",
-            description="Agent identifier drawn from a bounded roster",
-            supported_constraints=["prefix", "num_agents"]
-        ),
-        FieldTypeInfo(
-            type="call_priority",
-            description="Priority/severity of the call or ticket",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="call_outcome",
-            description="How the call ended (Resolved, Escalated, Abandoned, ...)",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="resolution_status",
-            description="Resolution state of the underlying issue",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="sentiment",
-            description="Sentiment label (Positive/Neutral/Negative)",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="csat_score",
-            description="Customer satisfaction score, skewed toward satisfied",
-            supported_constraints=["scale", "choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="nps_score",
-            description="Net Promoter Score response (0-10), skewed toward promoters",
-            supported_constraints=["choices", "weights"]
-        ),
-        # Demographics
-        FieldTypeInfo(
-            type="age",
-            description="Age in years, skewed toward working-age adults",
-            supported_constraints=["min", "max", "mode"]
-        ),
-        FieldTypeInfo(
-            type="gender",
-            description="Gender identity",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="ethnicity",
-            description="Race/ethnicity category (US Census-style buckets)",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="marital_status",
-            description="Marital status",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="education_level",
-            description="Highest level of education attained",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="employment_status",
-            description="Employment status",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="income_bracket",
-            description="Household income bracket label",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="household_size",
-            description="Number of people in the household",
-            supported_constraints=["min", "max", "choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="language_preference",
-            description="Preferred language",
-            supported_constraints=["choices", "weights"]
-        ),
-        FieldTypeInfo(
-            type="generation",
-            description="Generational cohort label (Gen Z, Millennial, ...)",
-            supported_constraints=["choices", "weights"]
-        ),
-    ]
-
-    return FieldTypesResponse(field_types=field_types)
+async def get_field_types(http_request: Request):
+    """Get list of supported field types and their constraints.
+
+    Served with an ETag; send it back in If-None-Match to get a 304.
+    """
+    _, body, etag = _render_field_types()
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={FIELD_TYPES_MAX_AGE}"}
+    if etag in http_request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.post("/generate", response_model=None, tags=["Generation"])
 async def generate_data(
     request: GenerateRequest,
+    http_request: Request,
     user: ApiUser = Depends(consume_request_quota),
 ):
     """
@@ -273,49 +299,81 @@ async def generate_data(
     - json: Returns JSON array of objects
     - csv: Returns CSV string with headers
     - sql: Returns SQL INSERT statements
+
+    If the client disconnects, generation stops within one batch of rows.
+
+    With `deadline_ms`, generation that can't finish in time either fails
+    early with 504 (`on_deadline="fail"`) or returns the rows finished so
+    far (`on_deadline="truncate"`), flagged with `"truncated": true` in JSON
+    and an `X-Truncated: true` header.
     """
+    deadline = Deadline(request.deadline_ms) if request.deadline_ms else None
     try:
         enforce_row_limit(request.rows, user)
 
-        # Convert API model to FieldSchema objects
-        fields = []
-        for field_config in request.fields:
-            field_schema = FieldSchema(
-                name=field_config.name,
-                field_type=field_config.type,
-                constraints=field_config.constraints or {}
-            )
-            field_schema.validate()
-            fields.append(field_schema)
-
-        # Generate data
-        engine = SyntheticDataEngine(fields)
-        data = engine.generate(request.rows)
-
-        # Format output
+        fields = _build_fields(request.fields)
+        progress_key = _progress_key(user, request.progress_id) if request.progress_id else None
+        if progress_key:
+            progress_board.start(progress_key, request.rows)
+
+        def produce(cancel: CancellationToken) -> tuple:
+            engine = SyntheticDataEngine(fields, seed=request.seed)
+            progress = progress_board.callback(progress_key) if progress_key else None
+            data = engine.generate(request.rows, progress=progress, cancel=cancel,
+                                   deadline=deadline, on_deadline=request.on_deadline)
+            if request.format == "json":
+                return JSONFormatter.envelope(
+                    {"success": True, "rows_generated": len(data), "format": "json",
+                     "truncated": len(data) < request.rows},
+                    JSONFormatter.encode(data, cancel=cancel),
+                ), len(data)
+            return _encode_table(data, request.format, request.table_name, cancel=cancel), len(data)
+
+        async def admitted(cancel: CancellationToken) -> tuple:
+            async with admission.admit(estimate_cost(fields, request.rows, request.format)):
+                return await run_in_threadpool(produce, cancel)
+
+        # Seeded requests are deterministic, so identical concurrent ones
+        # share a single generation (each caller has already paid its quota).
+        # A deadline or progress id ties the work to one caller's clock or
+        # progress feed, so those requests always run on their own.
+        shared = request.seed is not None and not (request.deadline_ms or request.progress_id)
+        try:
+            if not shared:
+                cancel = CancellationToken()
+                body, rows_generated = await _until_disconnected(http_request, admitted(cancel), cancel)
+            else:
+                body, rows_generated = await _until_disconnected(
+                    http_request, _single_flight.run(_request_key(request), admitted),
+                )
+        except Overloaded as e:
+            if progress_key:
+                progress_board.finish(progress_key, error=str(e))
+            raise _overloaded(e, user)
+        except (ClientDisconnected, GenerationCancelled):
+            if progress_key:
+                progress_board.finish(progress_key, error="Cancelled: client disconnected")
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
+        except DeadlineExceeded as e:
+            if progress_key:
+                progress_board.finish(progress_key, error=str(e))
+            raise _deadline_exceeded(e)
+        except Exception:
+            if progress_key:
+                progress_board.finish(progress_key, error="Generation failed")
+            raise
+        if progress_key:
+            progress_board.finish(progress_key)
+
+        media_type, ext = _FORMAT_MEDIA[request.format]
+        headers = {}
+        if rows_generated < request.rows:
+            headers = {"X-Truncated": "true", "X-Rows-Generated": str(rows_generated)}
         if request.format == "json":
-            return JSONResponse(
-                content={
-                    "success": True,
-                    "rows_generated": len(data),
-                    "format": "json",
-                    "data": data
-                }
-            )
-        elif request.format == "csv":
-            csv_output = CSVFormatter.format(data)
-            return PlainTextResponse(
-                content=csv_output,
-                media_type="text/csv",
-                headers={"Content-Disposition": "attachment; filename=synthetic_data.csv"}
-            )
-        elif request.format == "sql":
-            sql_output = SQLFormatter.format(data, request.table_name)
-            return PlainTextResponse(
-                content=sql_output,
-                media_type="text/plain",
-                headers={"Content-Disposition": f"attachment; filename={request.table_name}.sql"}
-            )
+            return Response(content=body, media_type=media_type, headers=headers)
+        filename = f"{request.table_name}.sql" if request.format == "sql" else f"synthetic_data.{ext}"
+        headers["Content-Disposition"] = f"attachment; filename={filename}"
+        return Response(content=body, media_type=media_type, headers=headers)
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -338,26 +396,16 @@ async def generate_preview(
         # Limit to 10 rows for preview
         preview_rows = min(request.rows, 10)
 
-        # Convert API model to FieldSchema objects
-        fields = []
-        for field_config in request.fields:
-            field_schema = FieldSchema(
-                name=field_config.name,
-                field_type=field_config.type,
-                constraints=field_config.constraints or {}
-            )
-            field_schema.validate()
-            fields.append(field_schema)
+        fields = _build_fields(request.fields)
 
         # Generate data
-        engine = SyntheticDataEngine(fields)
+        engine = SyntheticDataEngine(fields, seed=request.seed)
         data = engine.generate(preview_rows)
 
-        return GenerateResponse(
-            success=True,
-            rows_generated=len(data),
-            format="json",
-            data=data
+        # Same shape as GenerateResponse, without re-validating every row through it
+        return _json_rows_response(
+            {"success": True, "rows_generated": len(data), "format": "json"},
+            data,
         )
 
     except ValueError as e:
@@ -368,6 +416,201 @@ async def generate_preview(
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only sink that lets zipfile/tarfile output be streamed out piece by piece."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _stream_archive(archive: str, entries, boundary: str):
+    """Yield the archive bytes as each table's (filename, media_type, body) becomes ready."""
+    if archive == "multipart":
+        async for filename, media_type, body in entries:
+            yield (
+                f"--{boundary}\r\n"
+                f"Content-Type: {media_type}\r\n"
+                f"Content-Disposition: attachment; filename={filename}\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode("ascii") + body + b"\r\n"
+        yield f"--{boundary}--\r\n".encode("ascii")
+        return
+
+    sink = _ChunkBuffer()
+    if archive == "tar":
+        bundle = tarfile.open(fileobj=sink, mode="w|")
+        async for filename, _, body in entries:
+            info = tarfile.TarInfo(filename)
+            info.size = len(body)
+            info.mtime = int(time.time())
+            bundle.addfile(info, io.BytesIO(body))
+            yield sink.drain()
+    else:
+        bundle = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+        async for filename, _, body in entries:
+            bundle.writestr(filename, body)
+            yield sink.drain()
+    bundle.close()
+    yield sink.drain()
+
+
+@app.get("/progress/{progress_id}", tags=["Generation"])
+async def generation_progress(
+    progress_id: str,
+    user: ApiUser = Depends(get_current_user),
+):
+    """
+    Follow a running generation as a Server-Sent Events stream.
+
+    Pass the same `progress_id` in a `/generate` request. Emits `progress`
+    events (rows_done, total_rows, elapsed, rows_per_second) after each batch
+    of rows and a final `done` event; the stream may be opened before the
+    generation request is sent. Progress is tracked per API process.
+    """
+    key = _progress_key(user, progress_id)
+
+    async def events():
+        version = 0
+        idle_since = time.monotonic()
+        while True:
+            entry = progress_board.get(key)
+            if entry and entry["version"] > version:
+                version = entry.pop("version")
+                idle_since = time.monotonic()
+                yield sse_event("done" if entry["done"] else "progress", entry)
+                if entry["done"]:
+                    return
+            elif time.monotonic() - idle_since > PROGRESS_IDLE_TIMEOUT:
+                yield sse_event("timeout", {"progress_id": progress_id})
+                return
+            await asyncio.sleep(0.25)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/generate/batch", response_model=None, tags=["Generation"])
+async def generate_batch(
+    request: BatchGenerateRequest,
+    user: ApiUser = Depends(get_current_user),
+):
+    """
+    Generate several named tables in one request.
+
+    Tables are generated concurrently and returned together as a zip or tar
+    archive, or as a `multipart/mixed` stream (one part per table). The whole
+    batch is charged against the daily quota in a single step, one request
+    per table.
+    """
+    names = [table.name for table in request.tables]
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail="Table names must be unique within a batch")
+    if any(table.deadline_ms for table in request.tables):
+        # The archive is already streaming by the time a table could miss it
+        raise HTTPException(status_code=400, detail="deadline_ms is not supported for batch requests")
+
+    # Validate everything up front so a bad table fails the batch before any quota is used
+    engines = {}
+    plan = []
+    for table in request.tables:
+        enforce_row_limit(table.rows, user)
+        try:
+            fields = _build_fields(table.fields)
+            key = repr([f.to_dict() for f in fields])
+            if key not in engines:
+                # Constraint errors (unknown locale, reversed range, ...) only
+                # surface when values are drawn; one throwaway row catches
+                # them here instead of mid-stream, after the 200 is sent.
+                engines[key] = SyntheticDataEngine(fields)
+                engines[key].generate(1)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"{table.name}: {e}")
+        # Unseeded tables with an identical schema share one engine (and its
+        # generators); seeded ones need their own streams to stay reproducible.
+        if table.seed is not None:
+            plan.append((table, SyntheticDataEngine(fields, seed=table.seed)))
+        else:
+            plan.append((table, engines[key]))
+    enforce_row_limit(sum(table.rows for table in request.tables), user)
+
+    consume_requests(user, len(request.tables))
+    cost = sum(estimate_cost(engine.fields, table.rows, table.format) for table, engine in plan)
+    try:
+        ticket = await admission.acquire(cost)
+    except Overloaded as e:
+        raise _overloaded(e, user, len(request.tables))
+
+    released = False
+
+    def release_admission() -> None:
+        # Called when streaming ends, and again as a background task in case
+        # the stream is never started (e.g. the client left first).
+        nonlocal released
+        if not released:
+            released = True
+            admission.release(ticket)
+
+    # Set if the stream is abandoned (client gone), so tables still being
+    # generated in worker threads stop at their next batch.
+    cancel = CancellationToken()
+
+    def build(table, engine) -> tuple:
+        media_type, ext = _FORMAT_MEDIA[table.format]
+        progress_key = _progress_key(user, table.progress_id) if table.progress_id else None
+        progress = progress_board.callback(progress_key) if progress_key else None
+        try:
+            data = engine.generate(table.rows, progress=progress, cancel=cancel)
+        except GenerationCancelled:
+            if progress_key:
+                progress_board.finish(progress_key, error="Cancelled: client disconnected")
+            raise
+        if progress_key:
+            progress_board.finish(progress_key)
+        body = _encode_table(data, table.format, table.table_name or table.name, cancel=cancel)
+        return f"{table.name}.{ext}", media_type, body
+
+    tasks = [asyncio.ensure_future(run_in_threadpool(build, table, engine)) for table, engine in plan]
+
+    async def entries():
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            if not all(task.done() for task in tasks):
+                cancel.cancel()
+            for task in tasks:
+                task.cancel()
+            release_admission()
+
+    boundary = secrets.token_hex(16)
+    if request.archive == "multipart":
+        media_type = f"multipart/mixed; boundary={boundary}"
+        headers = {}
+    else:
+        ext = "zip" if request.archive == "zip" else "tar"
+        media_type = "application/zip" if ext == "zip" else "application/x-tar"
+        headers = {"Content-Disposition": f"attachment; filename=synthetic_data.{ext}"}
+
+    return StreamingResponse(_stream_archive(request.archive, entries(), boundary),
+                             media_type=media_type, headers=headers,
+                             background=BackgroundTask(release_admission))
+
+
 @app.post("/kaggle/search", response_model=KaggleSearchResponse, tags=["Kaggle"])
 async def kaggle_search(
     request: KaggleSearchRequest,
@@ -439,6 +682,7 @@ async def kaggle_schema(
 @app.post("/kaggle/clone", response_model=None, tags=["Kaggle"])
 async def kaggle_clone(
     request: KaggleCloneRequest,
+    http_request: Request,
     user: ApiUser = Depends(consume_request_quota),
 ):
     """
@@ -461,7 +705,18 @@ async def kaggle_clone(
             raise HTTPException(status_code=400, detail="Could not infer any fields from this dataset")
 
         engine = SyntheticDataEngine(fields)
-        data = engine.generate(request.rows)
+        cancel = CancellationToken()
+
+        async def admitted() -> list:
+            async with admission.admit(estimate_cost(fields, request.rows, request.format)):
+                return await run_in_threadpool(engine.generate, request.rows, None, cancel)
+
+        try:
+            data = await _until_disconnected(http_request, admitted(), cancel)
+        except Overloaded as e:
+            raise _overloaded(e, user)
+        except (ClientDisconnected, GenerationCancelled):
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
 
         if request.format == "csv":
             return PlainTextResponse(
@@ -475,14 +730,16 @@ async def kaggle_clone(
                 media_type="text/plain",
                 headers={"Content-Disposition": f"attachment; filename={request.table_name}.sql"},
             )
-        return JSONResponse(content={
-            "success": True,
-            "dataset_ref": request.dataset_ref,
-            "rows_generated": len(data),
-            "format": "json",
-            "fields": [f.to_dict() for f in fields],
-            "data": data,
-        })
+        return _json_rows_response(
+            {
+                "success": True,
+                "dataset_ref": request.dataset_ref,
+                "rows_generated": len(data),
+                "format": "json",
+                "fields": [f.to_dict() for f in fields],
+            },
+            data,
+        )
     except KaggleError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
@@ -2,13 +2,17 @@
 
 import os
 import sqlite3
+import threading
 from dataclasses import dataclass
 from datetime import date
-from typing import Optional
+from typing import Dict, Optional
 
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from core.quota import QuotaLedger, sync_usage
+from core.ttl_cache import TTLCache
+
 bearer_scheme = HTTPBearer(auto_error=False)
 
 DEFAULT_DB = os.path.join(
@@ -18,6 +22,15 @@ DEFAULT_DB = os.path.join(
 )
 FREE_TIER_LIMIT = int(os.environ.get('FREE_TIER_LIMIT', '1000'))
 MAX_ROWS = int(os.environ.get('MAX_ROWS_FREE', '100000'))
+API_KEY_CACHE_TTL = float(os.environ.get('API_KEY_CACHE_TTL', '30'))
+API_KEY_CACHE_SIZE = int(os.environ.get('API_KEY_CACHE_SIZE', '1024'))
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+QUOTA_FLUSH_INTERVAL = float(os.environ.get('QUOTA_FLUSH_INTERVAL', '2'))
+QUOTA_SAFETY_MARGIN = int(os.environ.get('QUOTA_SAFETY_MARGIN', '10'))
+# Admission budget: estimated CPU microseconds of generation work in flight per process
+ADMISSION_CAPACITY = float(os.environ.get('ADMISSION_CAPACITY_US', '8000000'))
+ADMISSION_MAX_QUEUE = int(os.environ.get('ADMISSION_MAX_QUEUE', '16'))
+ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', '30'))
 
 
 @dataclass
@@ -35,19 +48,54 @@ def _db_path() -> str:
     return DEFAULT_DB
 
 
+_local = threading.local()
+
+
 def _get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(_db_path())
+    """Return this thread's connection, opening it (in WAL mode) on first use.
+
+    FastAPI runs sync dependencies on a threadpool, so one connection per
+    thread is reused across requests instead of reconnecting every call.
+    WAL lets concurrent uvicorn workers read while another one writes, and
+    the busy timeout makes writers wait for the lock rather than fail.
+    """
+    path = _db_path()
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and getattr(_local, 'path', None) == path:
+        return conn
+
+    conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
     conn.row_factory = sqlite3.Row
+    conn.execute(f'PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}')
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    _local.conn = conn
+    _local.path = path
     return conn
 
 
-def _lookup_user(api_key: str) -> Optional[sqlite3.Row]:
-    with _get_connection() as conn:
-        return conn.execute(
-            'SELECT id, is_pro, requests_today, last_request_date, is_active '
-            'FROM users WHERE api_key = ?',
-            (api_key,),
-        ).fetchone()
+# api_key -> users row. Only hits are cached; an unknown key is looked up
+# again every time so a freshly created key works immediately. A revoked or
+# regenerated key can stay valid for up to API_KEY_CACHE_TTL seconds here.
+_user_cache = TTLCache(API_KEY_CACHE_TTL, API_KEY_CACHE_SIZE)
+
+
+def _lookup_user(api_key: str) -> Optional[dict]:
+    cached = _user_cache.get(api_key)
+    if cached is not None:
+        return cached
+
+    row = _get_connection().execute(
+        'SELECT id, is_pro, requests_today, last_request_date, is_active '
+        'FROM users WHERE api_key = ?',
+        (api_key,),
+    ).fetchone()
+    if row is None:
+        return None
+
+    row = dict(row)
+    _user_cache.put(api_key, row)
+    return row
 
 
 def _daily_limit(is_pro: bool) -> int:
@@ -58,7 +106,7 @@ def _max_rows(is_pro: bool) -> int:
     return MAX_ROWS
 
 
-def _effective_requests_today(row: sqlite3.Row) -> int:
+def _effective_requests_today(row: dict) -> int:
     today = date.today().isoformat()
     last = row['last_request_date']
     if last != today:
@@ -66,24 +114,23 @@ def _effective_requests_today(row: sqlite3.Row) -> int:
     return row['requests_today'] or 0
 
 
-def _try_consume_request(user_id: int, limit: int) -> bool:
-    """Atomically increment usage only if the user is under their daily limit."""
-    today = date.today().isoformat()
-    with _get_connection() as conn:
-        cursor = conn.execute(
-            '''UPDATE users SET
-                requests_today = CASE WHEN last_request_date = ? THEN requests_today + 1 ELSE 1 END,
-                last_request_date = ?,
-                total_requests = total_requests + 1
-               WHERE id = ? AND is_active = 1
-               AND (
-                 last_request_date IS NULL OR last_request_date != ?
-                 OR (last_request_date = ? AND requests_today < ?)
-               )''',
-            (today, today, user_id, today, today, limit),
-        )
-        conn.commit()
-        return cursor.rowcount > 0
+def _sync_usage(day: date, deltas: Dict[int, int]) -> Dict[int, int]:
+    """Apply aggregated request deltas for `day` and return the persisted counts."""
+    conn = _get_connection()
+    with conn:
+        return sync_usage(conn.execute, day, deltas)
+
+
+_quota_ledger = QuotaLedger(
+    _sync_usage,
+    flush_interval=QUOTA_FLUSH_INTERVAL,
+    safety_margin=QUOTA_SAFETY_MARGIN,
+)
+
+
+def _try_consume_request(user_id: int, limit: int, amount: int = 1) -> bool:
+    """Count usage against the daily limit; persisted by the write-behind ledger."""
+    return _quota_ledger.try_consume(user_id, limit, amount)
 
 
 def get_current_user(
@@ -107,14 +154,24 @@ def get_current_user(
     )
 
 
-def consume_request_quota(user: ApiUser = Depends(get_current_user)) -> ApiUser:
-    """Authenticate and atomically consume one request from the user's daily quota."""
+def consume_requests(user: ApiUser, count: int) -> None:
+    """Consume `count` requests from the user's daily quota in one step, or raise 429."""
     limit = _daily_limit(user.is_pro)
-    if not _try_consume_request(user.id, limit):
+    if not _try_consume_request(user.id, limit, count):
         raise HTTPException(
             status_code=429,
             detail=f'Daily limit of {limit} requests reached. Resets at midnight UTC.',
         )
+
+
+def refund_requests(user: ApiUser, count: int = 1) -> None:
+    """Return requests to the user's quota, e.g. when the server turned them away."""
+    _quota_ledger.refund(user.id, count)
+
+
+def consume_request_quota(user: ApiUser = Depends(get_current_user)) -> ApiUser:
+    """Authenticate and atomically consume one request from the user's daily quota."""
+    consume_requests(user, 1)
     return user
 
 
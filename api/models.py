@@ -34,6 +34,13 @@ class GenerateRequest(BaseModel):
     fields: List[FieldConfig] = Field(..., min_length=1, description="Field definitions")
     format: Literal["json", "csv", "sql"] = Field(default="json", description="Output format")
     table_name: Optional[str] = Field(default="synthetic_data", description="Table name for SQL format")
+    seed: Optional[int] = Field(default=None, description="Seed for reproducible output; identical seeded requests return identical data")
+    progress_id: Optional[str] = Field(default=None, pattern=r"^[A-Za-z0-9_-]{8,64}$",
+                                       description="Client-chosen id to follow this generation at GET /progress/{progress_id}")
+    deadline_ms: Optional[int] = Field(default=None, ge=1, le=600_000,
+                                       description="Time budget for generation, counted from when the request arrives")
+    on_deadline: Literal["fail", "truncate"] = Field(default="fail",
+                                                     description="When the deadline can't be met: fail early, or return the rows finished so far")
 
     model_config = {
         "json_schema_extra": {
@@ -52,11 +59,45 @@ class GenerateRequest(BaseModel):
     }
 
 
+class NamedGenerateRequest(GenerateRequest):
+    """One table in a batch generation request."""
+    name: str = Field(..., pattern=r"^[A-Za-z_][A-Za-z0-9_]*$", max_length=64,
+                      description="Table name; also used as the file name inside the archive")
+    table_name: Optional[str] = Field(default=None, description="Table name for SQL format (defaults to `name`)")
+
+
+class BatchGenerateRequest(BaseModel):
+    """Request to generate several tables in one call."""
+    tables: List[NamedGenerateRequest] = Field(..., min_length=1, max_length=100, description="Tables to generate")
+    archive: Literal["zip", "tar", "multipart"] = Field(default="zip", description="How the tables are packaged in the response")
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "archive": "zip",
+                    "tables": [
+                        {"name": "users", "rows": 50, "format": "csv", "fields": [
+                            {"name": "id", "type": "integer"},
+                            {"name": "email", "type": "email"}
+                        ]},
+                        {"name": "calls", "rows": 200, "format": "sql", "fields": [
+                            {"name": "agent", "type": "agent_id"},
+                            {"name": "duration", "type": "call_duration"}
+                        ]}
+                    ]
+                }
+            ]
+        }
+    }
+
+
 class GenerateResponse(BaseModel):
     """Response containing generated data."""
     success: bool = Field(..., description="Whether generation was successful")
     rows_generated: int = Field(..., description="Number of rows generated")
     format: str = Field(..., description="Output format")
+    truncated: bool = Field(default=False, description="True if fewer rows than requested were generated because of the deadline")
     data: Any = Field(..., description="Generated data (format depends on 'format' field)")
 
 
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Import-time benchmark for the CLI and service entry points.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter for
+each target and reports the cumulative import cost, net of what the
+interpreter loads at startup anyway. Each target is measured several times
+and the fastest run is kept, to filter out scheduler noise.
+
+    python benchmarks/import_time.py            # report
+    python benchmarks/import_time.py --check    # exit 1 if over budget
+    python benchmarks/import_time.py --top 10   # also list the slowest imports
+
+Budgets are deliberately loose (a few times the measured cost); they are
+meant to catch a heavy dependency creeping onto an import path, such as
+Faker being loaded again before a Faker-backed field is generated.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> budget in ms
+TARGETS: Dict[str, float] = {
+    'core': 20,
+    'formatters': 30,
+    'cli.main': 100,
+    'api.app': 1500,
+}
+
+# Must not be imported just by importing the target.
+FORBIDDEN = {
+    'core': ['faker'],
+    'formatters': ['faker'],
+    'cli.main': ['faker', 'requests'],
+}
+
+
+def _importtime(statement: str) -> List[Tuple[int, int, str]]:
+    """(self us, cumulative us, indented name) for each import `statement` triggers."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((int(self_us), int(cumulative_us), name[1:]))
+    return entries
+
+
+def measure(module: str, repeat: int = 5) -> Tuple[float, List[Tuple[int, int, str]]]:
+    """Fastest net import time of `module` in ms, and that run's entries."""
+    startup = {name.strip() for _, _, name in _importtime('pass')}
+    best = None
+    for _ in range(repeat):
+        entries = [e for e in _importtime(f'import {module}') if e[2].strip() not in startup]
+        total = sum(cumulative for _, cumulative, name in entries if not name.startswith(' '))
+        if best is None or total < best[0]:
+            best = (total, entries)
+    return best[0] / 1000, best[1]
+
+
+def loaded_modules(module: str) -> set:
+    result = subprocess.run(
+        [sys.executable, '-c', f'import sys, {module}; print("\\n".join(sys.modules))'],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return set(result.stdout.split())
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=list(TARGETS), help='modules to measure')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per module (fastest is kept)')
+    parser.add_argument('--top', type=int, default=0, help='show the N slowest imports per module')
+    parser.add_argument('--check', action='store_true', help='exit 1 if a budget is exceeded')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        ms, entries = measure(module, args.repeat)
+        budget = TARGETS.get(module)
+        status = ''
+        if budget is not None:
+            status = 'ok' if ms <= budget else 'OVER BUDGET'
+            failed |= ms > budget
+        heavy = sorted(set(FORBIDDEN.get(module, ())) & loaded_modules(module))
+        if heavy:
+            status = f'imports {", ".join(heavy)}'
+            failed = True
+        budget_text = f'{budget:.0f}' if budget is not None else '-'
+        print(f'{module:<12} {ms:8.1f} ms  (budget {budget_text} ms)  {status}')
+        for self_us, _, name in sorted(entries, reverse=True)[:args.top]:
+            print(f'    {self_us / 1000:7.1f} ms  {name.strip()}')
+
+    return 1 if args.check and failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
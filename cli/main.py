@@ -3,12 +3,14 @@
 
 import argparse
 import sys
+import textwrap
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core import SyntheticDataEngine, FieldSchema
+from core.registry import registry
 from formatters import CSVFormatter, JSONFormatter, SQLFormatter
 
 
@@ -101,14 +103,12 @@ def get_field_constraints(field_type: str) -> dict:
 def interactive_field_setup() -> list:
     """Interactively configure fields."""
     print("\nSupported field types:")
-    print("  integer, float, string, email, phone, date, datetime, boolean")
-    print("  uuid, name, address, city, country, company, url, category")
-    print("  Call center: call_duration, wait_time, hold_time, call_type, call_channel,")
-    print("               call_department, agent_id, call_priority, call_outcome,")
-    print("               resolution_status, sentiment, csat_score, nps_score")
-    print("  Demographics: age, gender, ethnicity, marital_status, education_level,")
-    print("                employment_status, income_bracket, household_size,")
-    print("                language_preference, generation")
+    by_category = {}
+    for field_type in registry.values():
+        by_category.setdefault(field_type.category, []).append(field_type.name)
+    for category, names in by_category.items():
+        print(textwrap.fill(', '.join(names), width=79, initial_indent=f"  {category}: ",
+                            subsequent_indent=' ' * (len(category) + 4)))
     print()
 
     num_fields = 0
@@ -130,20 +130,8 @@ def interactive_field_setup() -> list:
 
         field_type = input("  Type: ").strip().lower()
 
-        valid_types = [
-            'integer', 'float', 'string', 'email', 'phone',
-            'date', 'datetime', 'boolean', 'uuid', 'name',
-            'address', 'city', 'country', 'company', 'url', 'category',
-            'call_duration', 'wait_time', 'hold_time', 'call_type',
-            'call_channel', 'call_department', 'agent_id', 'call_priority',
-            'call_outcome', 'resolution_status', 'sentiment', 'csat_score',
-            'nps_score', 'age', 'gender', 'ethnicity', 'marital_status',
-            'education_level', 'employment_status', 'income_bracket',
-            'household_size', 'language_preference', 'generation',
-        ]
-
-        while field_type not in valid_types:
-            print(f"  Invalid type. Choose from: {', '.join(valid_types)}")
+        while field_type not in registry:
+            print(f"  Invalid type. Choose from: {', '.join(registry)}")
             field_type = input("  Type: ").strip().lower()
 
         constraints = get_field_constraints(field_type)
@@ -1,6 +1,15 @@
 """Core synthetic data generation engine."""
 
-from .engine import SyntheticDataEngine
-from .schema import FieldSchema
-
 __all__ = ['SyntheticDataEngine', 'FieldSchema']
+
+
+def __getattr__(name):
+    # Imported on first use, so that importing a light submodule (e.g.
+    # core.quota from the web app) doesn't load the engine and Faker.
+    if name == 'SyntheticDataEngine':
+        from .engine import SyntheticDataEngine
+        return SyntheticDataEngine
+    if name == 'FieldSchema':
+        from .schema import FieldSchema
+        return FieldSchema
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,64 @@
+"""Cooperative cancellation for long-running generation work.
+
+A `CancellationToken` is checked by the engine between batches and by the
+formatters between row chunks, so a request whose client has gone away stops
+within one batch instead of producing output nobody will read. A `Deadline`
+bounds how long a generation may run, checked at the same batch boundaries.
+"""
+
+import threading
+import time
+
+
+class GenerationCancelled(Exception):
+    """Raised inside generation/formatting once its token has been cancelled."""
+
+
+class CancellationToken:
+    """Thread-safe cancel flag."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise GenerationCancelled("Generation was cancelled")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a generation can't finish within its deadline."""
+
+    def __init__(self, deadline_ms: float, rows_done: int, total_rows: int):
+        super().__init__(
+            f"Deadline of {deadline_ms:g} ms exceeded "
+            f"({rows_done:,} of {total_rows:,} rows generated)"
+        )
+        self.deadline_ms = deadline_ms
+        self.rows_done = rows_done
+        self.total_rows = total_rows
+
+
+class Deadline:
+    """A point in time, `timeout_ms` from creation, that work must finish by.
+
+    Create it when the request arrives so that time spent queued counts too.
+    """
+
+    def __init__(self, timeout_ms: float):
+        self.timeout_ms = timeout_ms
+        self.expires_at = time.monotonic() + timeout_ms / 1000
+
+    def remaining(self) -> float:
+        """Seconds left (negative once expired)."""
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
@@ -1,73 +1,37 @@
 """Main synthetic data generation engine."""
 
-from typing import List, Dict, Any
+import hashlib
+import random
+import time
+from typing import List, Dict, Any, Iterator, Optional
+from .cancellation import CancellationToken, Deadline, DeadlineExceeded
+from .column_cache import ColumnCache, field_fingerprint
+from .progress import GenerationProgress, ProgressCallback
 from .schema import FieldSchema
-from .generators import (
-    IntegerGenerator, FloatGenerator, StringGenerator, EmailGenerator,
-    PhoneGenerator, DateGenerator, DateTimeGenerator, BooleanGenerator,
-    UUIDGenerator, NameGenerator, AddressGenerator, CityGenerator,
-    CountryGenerator, CompanyGenerator, URLGenerator, CategoryGenerator,
-    CallDurationGenerator, WaitTimeGenerator, HoldTimeGenerator,
-    CallTypeGenerator, CallChannelGenerator, CallDepartmentGenerator,
-    AgentIdGenerator, CallPriorityGenerator, CallOutcomeGenerator,
-    ResolutionStatusGenerator, SentimentGenerator, CSATScoreGenerator,
-    NPSScoreGenerator, AgeGenerator, GenderGenerator, EthnicityGenerator,
-    MaritalStatusGenerator, EducationLevelGenerator, EmploymentStatusGenerator,
-    IncomeBracketGenerator, HouseholdSizeGenerator, LanguagePreferenceGenerator,
-    GenerationGenerator,
-)
+from .registry import registry
 
 
 class SyntheticDataEngine:
     """Core engine for generating synthetic data."""
 
-    GENERATOR_MAP = {
-        'integer': IntegerGenerator,
-        'float': FloatGenerator,
-        'string': StringGenerator,
-        'email': EmailGenerator,
-        'phone': PhoneGenerator,
-        'date': DateGenerator,
-        'datetime': DateTimeGenerator,
-        'boolean': BooleanGenerator,
-        'uuid': UUIDGenerator,
-        'name': NameGenerator,
-        'address': AddressGenerator,
-        'city': CityGenerator,
-        'country': CountryGenerator,
-        'company': CompanyGenerator,
-        'url': URLGenerator,
-        'category': CategoryGenerator,
-        # Call center metrics
-        'call_duration': CallDurationGenerator,
-        'wait_time': WaitTimeGenerator,
-        'hold_time': HoldTimeGenerator,
-        'call_type': CallTypeGenerator,
-        'call_channel': CallChannelGenerator,
-        'call_department': CallDepartmentGenerator,
-        'agent_id': AgentIdGenerator,
-        'call_priority': CallPriorityGenerator,
-        'call_outcome': CallOutcomeGenerator,
-        'resolution_status': ResolutionStatusGenerator,
-        'sentiment': SentimentGenerator,
-        'csat_score': CSATScoreGenerator,
-        'nps_score': NPSScoreGenerator,
-        # Demographics
-        'age': AgeGenerator,
-        'gender': GenderGenerator,
-        'ethnicity': EthnicityGenerator,
-        'marital_status': MaritalStatusGenerator,
-        'education_level': EducationLevelGenerator,
-        'employment_status': EmploymentStatusGenerator,
-        'income_bracket': IncomeBracketGenerator,
-        'household_size': HouseholdSizeGenerator,
-        'language_preference': LanguagePreferenceGenerator,
-        'generation': GenerationGenerator,
-    }
-
-    def __init__(self, fields: List[FieldSchema]):
-        """Initialize engine with field schemas."""
+    BATCH_SIZE = 1000
+
+    # field type -> generator class (see core.registry); imported on first lookup
+    GENERATOR_MAP = registry.classes
+
+    def __init__(self, fields: List[FieldSchema], seed: Optional[int] = None,
+                 column_cache: Optional[ColumnCache] = None):
+        """Initialize engine with field schemas.
+
+        With a `seed`, output is reproducible: each field draws from its own
+        stream derived from (seed, field name), so a column's values do not
+        depend on which other fields are in the schema. That also lets a
+        `column_cache` reuse unchanged columns across edits of a schema
+        (it is ignored without a seed).
+        """
         self.fields = fields
+        self.seed = seed
+        self.column_cache = column_cache if seed is not None else None
         self.generators = {}
 
         for field_schema in fields:
@@ -75,7 +39,16 @@ class SyntheticDataEngine:
             generator_class = self.GENERATOR_MAP.get(field_schema.field_type)
             if not generator_class:
                 raise ValueError(f"No generator found for type: {field_schema.field_type}")
-            self.generators[field_schema.name] = generator_class(field_schema.constraints)
+            self.generators[field_schema.name] = generator_class(
+                field_schema.constraints, rng=self._field_rng(field_schema.name),
+            )
+
+    def _field_rng(self, field_name: str) -> Optional[random.Random]:
+        """Independent random stream for one field, or None when unseeded."""
+        if self.seed is None:
+            return None
+        digest = hashlib.sha256(f"{self.seed}:{field_name}".encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], 'big'))
 
     def generate_row(self) -> Dict[str, Any]:
         """Generate a single row of data."""
@@ -85,15 +58,108 @@ class SyntheticDataEngine:
             row[field_schema.name] = generator.generate()
         return row
 
-    def generate(self, num_rows: int) -> List[Dict[str, Any]]:
-        """Generate multiple rows of synthetic data."""
+    def generate_columns(self, num_rows: int) -> Dict[str, list]:
+        """Generate `num_rows` values per field, column by column."""
+        return {
+            field_schema.name: self.generators[field_schema.name].generate_batch(num_rows)
+            for field_schema in self.fields
+        }
+
+    def generate(self, num_rows: int,
+                 progress: Optional[ProgressCallback] = None,
+                 cancel: Optional[CancellationToken] = None,
+                 deadline: Optional[Deadline] = None,
+                 on_deadline: str = 'fail') -> List[Dict[str, Any]]:
+        """Generate multiple rows of synthetic data.
+
+        Rows are built in batches of BATCH_SIZE, each generated column-wise;
+        `progress`, if given, is called once per batch. `cancel` is checked
+        before each batch and raises GenerationCancelled once set.
+
+        With a `deadline`, a batch is only started if it is expected to
+        finish in time (judged by the previous batch). Otherwise, with
+        on_deadline='truncate' the rows done so far are returned (fewer than
+        `num_rows`, possibly none); with 'fail' DeadlineExceeded is raised - as
+        soon as the remaining rows are projected to overrun, rather than at
+        the deadline.
+        """
+        rows: List[Dict[str, Any]] = []
+        for batch in self.iter_batches(num_rows, progress, cancel, deadline, on_deadline):
+            rows.extend(batch)
+        return rows
+
+    def iter_batches(self, num_rows: int,
+                     progress: Optional[ProgressCallback] = None,
+                     cancel: Optional[CancellationToken] = None,
+                     deadline: Optional[Deadline] = None,
+                     on_deadline: str = 'fail') -> Iterator[List[Dict[str, Any]]]:
+        """Like `generate`, but yield each batch of rows as soon as it is built.
+
+        Lets callers stream output (e.g. straight into a file) without
+        holding every row in memory.
+        """
         if num_rows < 1:
             raise ValueError("Number of rows must be at least 1")
+        if on_deadline not in ('fail', 'truncate'):
+            raise ValueError("on_deadline must be 'fail' or 'truncate'")
+
+        names = [field_schema.name for field_schema in self.fields]
+        rows_done = 0
+        started = time.perf_counter()
+        batch_seconds = 0.0
+
+        # Columns served from the cache skip their generator entirely; the
+        # others are collected so they can be cached once complete.
+        cached: Dict[str, list] = {}
+        fresh: Dict[str, list] = {}
+        fingerprints: Dict[str, str] = {}
+        if self.column_cache is not None and num_rows <= self.column_cache.max_column_rows:
+            for field_schema in self.fields:
+                fingerprint = fingerprints[field_schema.name] = field_fingerprint(field_schema)
+                column = self.column_cache.get(fingerprint, self.seed, num_rows)
+                if column is None:
+                    fresh[field_schema.name] = []
+                else:
+                    cached[field_schema.name] = column
+
+        for offset in range(0, num_rows, self.BATCH_SIZE):
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            size = min(self.BATCH_SIZE, num_rows - offset)
+            if deadline is not None:
+                remaining = deadline.remaining()
+                if on_deadline == 'fail':
+                    needed = batch_seconds * (num_rows - offset) / self.BATCH_SIZE
+                else:
+                    needed = batch_seconds * size / self.BATCH_SIZE
+                if remaining <= 0 or needed > remaining:
+                    if on_deadline == 'truncate':
+                        return
+                    raise DeadlineExceeded(deadline.timeout_ms, rows_done, num_rows)
+            batch_started = time.perf_counter()
+            if cached or fresh:
+                columns = [
+                    cached[name][offset:offset + size] if name in cached
+                    else self.generators[name].generate_batch(size)
+                    for name in names
+                ]
+                for name, values in zip(names, columns):
+                    if name in fresh:
+                        fresh[name].extend(values)
+            else:
+                columns = self.generate_columns(size).values()
+            batch = [dict(zip(names, values)) for values in zip(*columns)]
+            batch_seconds = (time.perf_counter() - batch_started) * self.BATCH_SIZE / size
+            rows_done += size
+            if progress is not None:
+                progress(GenerationProgress(rows_done, num_rows, time.perf_counter() - started))
+            yield batch
 
-        return [self.generate_row() for _ in range(num_rows)]
+        for name, column in fresh.items():
+            self.column_cache.put(fingerprints[name], self.seed, column)
 
     @classmethod
     def from_config(cls, config: Dict[str, Any]) -> 'SyntheticDataEngine':
         """Create engine from configuration dictionary."""
         fields = [FieldSchema.from_dict(f) for f in config.get('fields', [])]
-        return cls(fields)
+        return cls(fields, seed=config.get('seed'))
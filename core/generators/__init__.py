@@ -1,64 +1,29 @@
-"""Data generators for different field types."""
+"""Data generators for different field types.
 
-from .base import BaseGenerator
-from .common import CategoryGenerator
-from .numeric import IntegerGenerator, FloatGenerator
-from .text import StringGenerator, EmailGenerator, PhoneGenerator, NameGenerator, UUIDGenerator
-from .text import AddressGenerator, CityGenerator, CountryGenerator, CompanyGenerator, URLGenerator
-from .datetime import DateGenerator, DateTimeGenerator
-from .boolean import BooleanGenerator
-from .callcenter import (
-    CallDurationGenerator, WaitTimeGenerator, HoldTimeGenerator,
-    CallTypeGenerator, CallChannelGenerator, CallDepartmentGenerator,
-    AgentIdGenerator, CallPriorityGenerator, CallOutcomeGenerator,
-    ResolutionStatusGenerator, SentimentGenerator, CSATScoreGenerator,
-    NPSScoreGenerator,
-)
-from .demographics import (
-    AgeGenerator, GenderGenerator, EthnicityGenerator, MaritalStatusGenerator,
-    EducationLevelGenerator, EmploymentStatusGenerator, IncomeBracketGenerator,
-    HouseholdSizeGenerator, LanguagePreferenceGenerator, GenerationGenerator,
-)
+Generator modules are imported on first use (PEP 562): most schemas only
+touch a few of them, and the Faker-backed ones are expensive to load. Which
+field type uses which generator is recorded in core.registry.
+"""
 
-__all__ = [
-    'BaseGenerator',
-    'CategoryGenerator',
-    'IntegerGenerator',
-    'FloatGenerator',
-    'StringGenerator',
-    'EmailGenerator',
-    'PhoneGenerator',
-    'DateGenerator',
-    'DateTimeGenerator',
-    'BooleanGenerator',
-    'UUIDGenerator',
-    'NameGenerator',
-    'AddressGenerator',
-    'CityGenerator',
-    'CountryGenerator',
-    'CompanyGenerator',
-    'URLGenerator',
-    'CallDurationGenerator',
-    'WaitTimeGenerator',
-    'HoldTimeGenerator',
-    'CallTypeGenerator',
-    'CallChannelGenerator',
-    'CallDepartmentGenerator',
-    'AgentIdGenerator',
-    'CallPriorityGenerator',
-    'CallOutcomeGenerator',
-    'ResolutionStatusGenerator',
-    'SentimentGenerator',
-    'CSATScoreGenerator',
-    'NPSScoreGenerator',
-    'AgeGenerator',
-    'GenderGenerator',
-    'EthnicityGenerator',
-    'MaritalStatusGenerator',
-    'EducationLevelGenerator',
-    'EmploymentStatusGenerator',
-    'IncomeBracketGenerator',
-    'HouseholdSizeGenerator',
-    'LanguagePreferenceGenerator',
-    'GenerationGenerator',
-]
+import importlib
+
+from ..registry import BUILTIN_TYPES
+
+# generator class -> module defining it: the built-in field types' generators,
+# as recorded in the registry, plus the base classes
+_MODULES = {
+    'BaseGenerator': f'{__name__}.base',
+    'TableGenerator': f'{__name__}.base',
+    **{cls: module for module, cls in (field_type.generator.split(':') for field_type in BUILTIN_TYPES)},
+}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
@@ -1,15 +1,26 @@
 """Base generator class for all field types."""
 
+import random
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Every value a TableGenerator can produce, and their cumulative weights
+# (None when uniform).
+ValueTable = Tuple[Sequence[Any], Optional[List[float]]]
 
 
 class BaseGenerator(ABC):
     """Abstract base class for data generators."""
 
-    def __init__(self, constraints: Dict[str, Any] = None):
-        """Initialize generator with optional constraints."""
+    def __init__(self, constraints: Dict[str, Any] = None, rng: Optional[random.Random] = None):
+        """Initialize generator with optional constraints.
+
+        `rng` is the random stream every value is drawn from; seeded engines
+        pass a per-field `random.Random`. Without one, the module-level
+        `random` functions are used, as before.
+        """
         self.constraints = constraints or {}
+        self.rng = rng if rng is not None else random
 
     @abstractmethod
     def generate(self) -> Any:
@@ -19,3 +30,37 @@ class BaseGenerator(ABC):
     def generate_batch(self, count: int) -> list:
         """Generate multiple values."""
         return [self.generate() for _ in range(count)]
+
+
+class TableGenerator(BaseGenerator):
+    """Base for generators with a small output domain.
+
+    `table()` lists every value the generator can produce, formatted once,
+    so a batch is just index draws (one rng.random() per row). Domains over
+    TABLE_LIMIT values aren't worth listing; `table()` returns None for
+    them and each row comes from `generate_value()` instead.
+    """
+
+    TABLE_LIMIT = 10_000
+
+    @abstractmethod
+    def table(self) -> Optional[ValueTable]:
+        """All values and their cumulative weights, or None over TABLE_LIMIT."""
+
+    @abstractmethod
+    def generate_value(self) -> Any:
+        """One value, for domains too large to tabulate."""
+
+    def generate(self) -> Any:
+        """Generate a single value."""
+        return self.generate_batch(1)[0]
+
+    def generate_batch(self, count: int) -> list:
+        try:
+            table = self._table
+        except AttributeError:
+            table = self._table = self.table()
+        if table is None:
+            return [self.generate_value() for _ in range(count)]
+        values, cum_weights = table
+        return self.rng.choices(values, cum_weights=cum_weights, k=count)
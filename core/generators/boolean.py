@@ -1,6 +1,5 @@
 """Boolean data generator."""
 
-import random
 from .base import BaseGenerator
 
 
@@ -10,4 +9,4 @@ class BooleanGenerator(BaseGenerator):
     def generate(self) -> bool:
         """Generate a random boolean."""
         probability = self.constraints.get('true_probability', 0.5)
-        return random.random() < probability
+        return self.rng.random() < probability
@@ -2,18 +2,19 @@
 
 import math
 import random
-from .base import BaseGenerator
-from .common import weighted_choice
+from functools import lru_cache
+from .base import BaseGenerator, TableGenerator
+from .common import weighted_choice, weighted_table
 
 
-def _lognormal_duration(mean: float, min_val: int, max_val: int, sigma: float = 0.6) -> int:
+def _lognormal_duration(mean: float, min_val: int, max_val: int, sigma: float = 0.6, rng=random) -> int:
     """Model a duration (seconds) with the right-skewed shape real call times have.
 
     Most calls cluster near `mean` with a long tail of outliers, rather than
     the uniform spread a plain randint would produce.
     """
     mu = math.log(max(mean, 1)) - (sigma ** 2) / 2
-    value = random.lognormvariate(mu, sigma)
+    value = rng.lognormvariate(mu, sigma)
     return int(min(max(value, min_val), max_val))
 
 
@@ -24,7 +25,7 @@ class CallDurationGenerator(BaseGenerator):
         min_val = self.constraints.get('min', 15)
         max_val = self.constraints.get('max', 1800)
         mean = self.constraints.get('mean', 240)
-        return _lognormal_duration(mean, min_val, max_val)
+        return _lognormal_duration(mean, min_val, max_val, rng=self.rng)
 
 
 class WaitTimeGenerator(BaseGenerator):
@@ -34,7 +35,7 @@ class WaitTimeGenerator(BaseGenerator):
         min_val = self.constraints.get('min', 0)
         max_val = self.constraints.get('max', 900)
         mean = self.constraints.get('mean', 45)
-        return _lognormal_duration(mean, min_val, max_val)
+        return _lognormal_duration(mean, min_val, max_val, rng=self.rng)
 
 
 class HoldTimeGenerator(BaseGenerator):
@@ -44,7 +45,7 @@ class HoldTimeGenerator(BaseGenerator):
         min_val = self.constraints.get('min', 0)
         max_val = self.constraints.get('max', 600)
         mean = self.constraints.get('mean', 30)
-        return _lognormal_duration(mean, min_val, max_val)
+        return _lognormal_duration(mean, min_val, max_val, rng=self.rng)
 
 
 class CallTypeGenerator(BaseGenerator):
@@ -55,6 +56,7 @@ class CallTypeGenerator(BaseGenerator):
             self.constraints,
             default_choices=['Inbound', 'Outbound'],
             default_weights=[0.75, 0.25],
+            rng=self.rng,
         )
 
 
@@ -66,6 +68,7 @@ class CallChannelGenerator(BaseGenerator):
             self.constraints,
             default_choices=['Phone', 'Chat', 'Email', 'Social Media'],
             default_weights=[0.6, 0.25, 0.1, 0.05],
+            rng=self.rng,
         )
 
 
@@ -80,16 +83,29 @@ class CallDepartmentGenerator(BaseGenerator):
                 'Sales', 'Retention', 'Returns & Exchanges',
             ],
             default_weights=[0.3, 0.25, 0.2, 0.1, 0.1, 0.05],
+            rng=self.rng,
         )
 
 
-class AgentIdGenerator(BaseGenerator):
+@lru_cache(maxsize=64)
+def _agent_ids(prefix: str, num_agents: int) -> tuple:
+    return tuple(f"{prefix}-{agent_num:04d}" for agent_num in range(1, num_agents + 1))
+
+
+class AgentIdGenerator(TableGenerator):
     """Generate an agent identifier from a bounded pool, mimicking a real roster."""
 
-    def generate(self) -> str:
+    def table(self):
         prefix = self.constraints.get('prefix', 'AGT')
         num_agents = self.constraints.get('num_agents', 50)
-        agent_num = random.randint(1, num_agents)
+        if not 0 < num_agents <= self.TABLE_LIMIT:
+            return None
+        return _agent_ids(prefix, num_agents), None
+
+    def generate_value(self) -> str:
+        prefix = self.constraints.get('prefix', 'AGT')
+        num_agents = self.constraints.get('num_agents', 50)
+        agent_num = self.rng.randint(1, num_agents)
         return f"{prefix}-{agent_num:04d}"
 
 
@@ -101,6 +117,7 @@ class CallPriorityGenerator(BaseGenerator):
             self.constraints,
             default_choices=['Low', 'Medium', 'High', 'Critical'],
             default_weights=[0.4, 0.4, 0.15, 0.05],
+            rng=self.rng,
         )
 
 
@@ -115,6 +132,7 @@ class CallOutcomeGenerator(BaseGenerator):
                 'Abandoned', 'Voicemail', 'Transferred',
             ],
             default_weights=[0.55, 0.12, 0.13, 0.08, 0.05, 0.07],
+            rng=self.rng,
         )
 
 
@@ -126,6 +144,7 @@ class ResolutionStatusGenerator(BaseGenerator):
             self.constraints,
             default_choices=['Resolved', 'Unresolved', 'Escalated', 'Pending'],
             default_weights=[0.65, 0.1, 0.1, 0.15],
+            rng=self.rng,
         )
 
 
@@ -137,26 +156,34 @@ class SentimentGenerator(BaseGenerator):
             self.constraints,
             default_choices=['Positive', 'Neutral', 'Negative'],
             default_weights=[0.45, 0.35, 0.2],
+            rng=self.rng,
         )
 
 
-class CSATScoreGenerator(BaseGenerator):
+class CSATScoreGenerator(TableGenerator):
     """Generate a customer satisfaction score (1-5), skewed toward satisfied."""
 
-    def generate(self) -> int:
+    def _defaults(self):
         scale_max = self.constraints.get('scale', 5)
-        default_weights = [0.05, 0.08, 0.12, 0.35, 0.4][:scale_max]
-        return int(weighted_choice(
-            self.constraints,
-            default_choices=list(range(1, scale_max + 1)),
-            default_weights=default_weights,
-        ))
+        return list(range(1, scale_max + 1)), [0.05, 0.08, 0.12, 0.35, 0.4][:scale_max]
+
+    def table(self):
+        choices, cum_weights = weighted_table(self.constraints, *self._defaults())
+        return [int(c) for c in choices], cum_weights
+
+    def generate_value(self) -> int:
+        return int(weighted_choice(self.constraints, *self._defaults(), rng=self.rng))
 
 
-class NPSScoreGenerator(BaseGenerator):
+class NPSScoreGenerator(TableGenerator):
     """Generate a Net Promoter Score response (0-10), skewed toward promoters."""
 
-    def generate(self) -> int:
-        choices = list(range(0, 11))
-        weights = [0.02, 0.02, 0.02, 0.03, 0.04, 0.06, 0.08, 0.12, 0.18, 0.2, 0.23]
-        return int(weighted_choice(self.constraints, choices, weights))
+    CHOICES = list(range(0, 11))
+    WEIGHTS = [0.02, 0.02, 0.02, 0.03, 0.04, 0.06, 0.08, 0.12, 0.18, 0.2, 0.23]
+
+    def table(self):
+        choices, cum_weights = weighted_table(self.constraints, self.CHOICES, self.WEIGHTS)
+        return [int(c) for c in choices], cum_weights
+
+    def generate_value(self) -> int:
+        return int(weighted_choice(self.constraints, self.CHOICES, self.WEIGHTS, self.rng))
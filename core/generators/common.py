@@ -1,12 +1,13 @@
 """Generic generators shared across domains."""
 
 import random
+from itertools import accumulate
 from typing import Any, Dict, List, Optional
-from .base import BaseGenerator
+from .base import BaseGenerator, ValueTable
 
 
 def weighted_choice(constraints: Dict[str, Any], default_choices: List[str],
-                     default_weights: Optional[List[float]] = None) -> Any:
+                     default_weights: Optional[List[float]] = None, rng=random) -> Any:
     """Pick a random value, letting constraints override the choice pool/weights.
 
     Domain generators (gender, sentiment, call_outcome, ...) ship with a
@@ -17,8 +18,20 @@ def weighted_choice(constraints: Dict[str, Any], default_choices: List[str],
     weights = constraints.get('weights', default_weights if choices is default_choices else None)
 
     if weights and len(weights) == len(choices):
-        return random.choices(choices, weights=weights, k=1)[0]
-    return random.choice(choices)
+        return rng.choices(choices, weights=weights, k=1)[0]
+    return rng.choice(choices)
+
+
+def weighted_table(constraints: Dict[str, Any], default_choices: List[Any],
+                   default_weights: Optional[List[float]] = None) -> ValueTable:
+    """The choices and cumulative weights `weighted_choice` would pick from,
+    as a TableGenerator table."""
+    choices = constraints.get('choices', default_choices)
+    weights = constraints.get('weights', default_weights if choices is default_choices else None)
+
+    if weights and len(weights) == len(choices):
+        return list(choices), list(accumulate(weights))
+    return list(choices), None
 
 
 class CategoryGenerator(BaseGenerator):
@@ -34,5 +47,5 @@ class CategoryGenerator(BaseGenerator):
         weights = self.constraints.get('weights')
 
         if weights and len(weights) == len(choices):
-            return random.choices(choices, weights=weights, k=1)[0]
-        return random.choice(choices)
+            return self.rng.choices(choices, weights=weights, k=1)[0]
+        return self.rng.choice(choices)
@@ -1,18 +1,19 @@
 """Date and time generators."""
 
 from datetime import datetime, timedelta
-import random
-from faker import Faker
-from .base import BaseGenerator
+from functools import lru_cache
+from .base import BaseGenerator, TableGenerator
 
-fake = Faker()
 
+@lru_cache(maxsize=64)
+def _formatted_days(start_date: datetime, days: int, date_format: str) -> tuple:
+    return tuple((start_date + timedelta(days=day)).strftime(date_format) for day in range(days + 1))
 
-class DateGenerator(BaseGenerator):
+
+class DateGenerator(TableGenerator):
     """Generate random dates."""
 
-    def generate(self) -> str:
-        """Generate a random date."""
+    def _range(self) -> tuple:
         start_date = self.constraints.get('start', '2020-01-01')
         end_date = self.constraints.get('end', '2024-12-31')
         date_format = self.constraints.get('format', '%Y-%m-%d')
@@ -21,10 +22,18 @@ class DateGenerator(BaseGenerator):
             start_date = datetime.strptime(start_date, '%Y-%m-%d')
         if isinstance(end_date, str):
             end_date = datetime.strptime(end_date, '%Y-%m-%d')
+        return start_date, (end_date - start_date).days, date_format
 
-        time_between = end_date - start_date
-        days_between = time_between.days
-        random_days = random.randint(0, days_between)
+    def table(self):
+        start_date, days_between, date_format = self._range()
+        if not 0 <= days_between < self.TABLE_LIMIT:
+            return None
+        return _formatted_days(start_date, days_between, date_format), None
+
+    def generate_value(self) -> str:
+        """Generate a random date."""
+        start_date, days_between, date_format = self._range()
+        random_days = self.rng.randint(0, days_between)
         random_date = start_date + timedelta(days=random_days)
 
         return random_date.strftime(date_format)
@@ -46,7 +55,7 @@ class DateTimeGenerator(BaseGenerator):
 
         time_between = end_date - start_date
         seconds_between = time_between.total_seconds()
-        random_seconds = random.randint(0, int(seconds_between))
+        random_seconds = self.rng.randint(0, int(seconds_between))
         random_datetime = start_date + timedelta(seconds=random_seconds)
 
         return random_datetime.strftime(datetime_format)
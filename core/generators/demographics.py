@@ -1,6 +1,5 @@
 """Demographic data generators."""
 
-import random
 from .base import BaseGenerator
 from .common import weighted_choice
 
@@ -20,7 +19,7 @@ class AgeGenerator(BaseGenerator):
         # Triangular skews the bulk of ages toward working-age adults
         # rather than a flat spread across the whole range.
         mode = self.constraints.get('mode', min(min_val + 25, max_val))
-        return int(random.triangular(min_val, max_val, mode))
+        return int(self.rng.triangular(min_val, max_val, mode))
 
 
 class GenderGenerator(BaseGenerator):
@@ -31,6 +30,7 @@ class GenderGenerator(BaseGenerator):
             self.constraints,
             default_choices=['Male', 'Female', 'Non-binary', 'Prefer not to say'],
             default_weights=[0.48, 0.48, 0.02, 0.02],
+            rng=self.rng,
         )
 
 
@@ -46,6 +46,7 @@ class EthnicityGenerator(BaseGenerator):
                 'Native Hawaiian or Other Pacific Islander', 'Two or More Races',
             ],
             default_weights=[0.58, 0.19, 0.12, 0.06, 0.01, 0.002, 0.038],
+            rng=self.rng,
         )
 
 
@@ -57,6 +58,7 @@ class MaritalStatusGenerator(BaseGenerator):
             self.constraints,
             default_choices=['Single', 'Married', 'Divorced', 'Widowed', 'Separated'],
             default_weights=[0.35, 0.45, 0.12, 0.05, 0.03],
+            rng=self.rng,
         )
 
 
@@ -71,6 +73,7 @@ class EducationLevelGenerator(BaseGenerator):
                 "Associate Degree", "Bachelor's Degree", "Master's Degree", 'Doctorate',
             ],
             default_weights=[0.1, 0.27, 0.2, 0.1, 0.22, 0.09, 0.02],
+            rng=self.rng,
         )
 
 
@@ -85,6 +88,7 @@ class EmploymentStatusGenerator(BaseGenerator):
                 'Unemployed', 'Retired', 'Student',
             ],
             default_weights=[0.5, 0.12, 0.08, 0.06, 0.14, 0.1],
+            rng=self.rng,
         )
 
 
@@ -99,6 +103,7 @@ class IncomeBracketGenerator(BaseGenerator):
                 '$75,000-$99,999', '$100,000-$149,999', '$150,000+',
             ],
             default_weights=[0.17, 0.22, 0.19, 0.15, 0.16, 0.11],
+            rng=self.rng,
         )
 
 
@@ -111,7 +116,7 @@ class HouseholdSizeGenerator(BaseGenerator):
         choices = list(range(min_val, max_val + 1))
         base_weights = [0.28, 0.34, 0.16, 0.13, 0.06, 0.02, 0.01]
         weights = (base_weights + [0.005] * len(choices))[:len(choices)]
-        return int(weighted_choice(self.constraints, choices, weights))
+        return int(weighted_choice(self.constraints, choices, weights, self.rng))
 
 
 class LanguagePreferenceGenerator(BaseGenerator):
@@ -122,6 +127,7 @@ class LanguagePreferenceGenerator(BaseGenerator):
             self.constraints,
             default_choices=['English', 'Spanish', 'Mandarin', 'Vietnamese', 'Other'],
             default_weights=[0.78, 0.13, 0.03, 0.02, 0.04],
+            rng=self.rng,
         )
 
 
@@ -133,4 +139,5 @@ class GenerationGenerator(BaseGenerator):
             self.constraints,
             default_choices=_GENERATIONS,
             default_weights=[0.14, 0.18, 0.22, 0.2, 0.21, 0.05],
+            rng=self.rng,
         )
@@ -1,6 +1,5 @@
 """Numeric data generators."""
 
-import random
 from .base import BaseGenerator
 
 
@@ -11,7 +10,7 @@ class IntegerGenerator(BaseGenerator):
         """Generate a random integer within constraints."""
         min_val = self.constraints.get('min', 0)
         max_val = self.constraints.get('max', 1000)
-        return random.randint(min_val, max_val)
+        return self.rng.randint(min_val, max_val)
 
 
 class FloatGenerator(BaseGenerator):
@@ -23,5 +22,5 @@ class FloatGenerator(BaseGenerator):
         max_val = self.constraints.get('max', 1000.0)
         precision = self.constraints.get('precision', 2)
 
-        value = random.uniform(min_val, max_val)
+        value = self.rng.uniform(min_val, max_val)
         return round(value, precision)
@@ -1,111 +1,301 @@
 """Text-based data generators."""
 
+import os
 import random
 import string
-import uuid
-from faker import Faker
+import struct
+import threading
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional
 from .base import BaseGenerator
+from ..locale_packs import load_pack
+from ..value_pools import compose, get_pool
 
-fake = Faker()
+if TYPE_CHECKING:
+    from faker import Faker
+
+_thread_fakers = threading.local()
+_shared_faker = None
+_shared_lock = threading.Lock()
+
+
+def _new_faker() -> 'Faker':
+    # Faker takes ~0.1s to import, so it is only loaded once a Faker-backed
+    # generator is actually asked for a value.
+    from faker import Faker
+    return Faker()
+
+
+class FakerBackedGenerator(BaseGenerator):
+    """Base for generators that delegate to Faker providers."""
+
+    @property
+    def fake(self) -> 'Faker':
+        """Faker drawing from this generator's random stream.
+
+        Unseeded generators share one process-wide instance. Seeded ones use
+        a per-thread Faker whose `random` is pointed at `self.rng` on each
+        access, so concurrent engines never interleave their streams.
+        """
+        global _shared_faker
+        if self.rng is random:
+            if _shared_faker is None:
+                with _shared_lock:
+                    if _shared_faker is None:
+                        _shared_faker = _new_faker()
+            return _shared_faker
+        faker = getattr(_thread_fakers, 'faker', None)
+        if faker is None:
+            faker = _thread_fakers.faker = _new_faker()
+        faker.random = self.rng
+        return faker
+
+
+class PooledGenerator(BaseGenerator):
+    """Base for generators composed from the locale data pools.
+
+    Values are built from the component lists and templates of a locale
+    pack (see core.locale_packs), the way Faker would build them, without
+    calling Faker. `placeholder` names the Faker method being reproduced.
+    """
+
+    placeholder = ''
+
+    def __init__(self, constraints=None, rng=None):
+        super().__init__(constraints, rng)
+        # Fail on an unknown locale when the field is set up, not mid-generation
+        load_pack(self.locale)
+
+    @property
+    def locale(self):
+        return self.constraints.get('locale') or None
+
+    def generate(self) -> str:
+        """Generate one value."""
+        return self.generate_batch(1)[0]
+
+    def generate_batch(self, count: int) -> list:
+        return compose(self.placeholder, self.rng, count, self.locale)
+
+
+@lru_cache(maxsize=64)
+def _charset_table(charset: str) -> Optional[tuple]:
+    """A bytes.translate table mapping random bytes uniformly onto `charset`,
+    and the bytes to delete so that every character is equally likely. None
+    when the charset isn't single-byte."""
+    if not charset or len(charset) > 256 or max(map(ord, charset)) > 255:
+        return None
+    usable = 256 - 256 % len(charset)
+    table = bytes(ord(charset[b % len(charset)]) for b in range(usable)) + bytes(256 - usable)
+    return table, bytes(range(usable, 256))
 
 
 class StringGenerator(BaseGenerator):
-    """Generate random strings."""
+    """Generate random strings.
+
+    Values are made BLOCK at a time: their lengths and characters are each
+    one bulk randbytes() draw, mapped with bytes.translate and sliced up.
+    Whole blocks are always made, and what a batch doesn't use is kept for
+    the next one, so a seeded column comes out the same however its rows
+    are asked for.
+    """
+
+    BLOCK = 1024
+
+    def __init__(self, constraints=None, rng=None):
+        super().__init__(constraints, rng)
+        # Values made but not handed out yet. Unseeded generators may be
+        # shared between threads.
+        self._ready: List[str] = []
+        self._ready_lock = threading.Lock()
 
     def generate(self) -> str:
         """Generate a random string."""
+        return self.generate_batch(1)[0]
+
+    def generate_batch(self, count: int) -> list:
+        charset = self.constraints.get('charset', string.ascii_letters + string.digits)
+        table = _charset_table(charset) if isinstance(charset, str) else None
+        if table is None:
+            return [''.join(self.rng.choices(charset, k=self._lengths(1)[0])) for _ in range(count)]
+        with self._ready_lock:
+            while len(self._ready) < count:
+                self._ready.extend(self._block(*table))
+            values = self._ready[:count]
+            del self._ready[:count]
+        return values
+
+    def _block(self, table: bytes, rejected: bytes) -> list:
+        lengths = self._lengths(self.BLOCK)
+        text = self._random_bytes(sum(lengths), table, rejected).decode('latin-1')
+        values, start = [], 0
+        for length in lengths:
+            values.append(text[start:start + length])
+            start += length
+        return values
+
+    def _lengths(self, count: int) -> list:
         length = self.constraints.get('length', 10)
         min_length = self.constraints.get('min_length', length)
         max_length = self.constraints.get('max_length', length)
-
-        actual_length = random.randint(min_length, max_length) if min_length != max_length else length
-
-        charset = self.constraints.get('charset', string.ascii_letters + string.digits)
-        return ''.join(random.choices(charset, k=actual_length))
-
-
-class EmailGenerator(BaseGenerator):
+        if min_length == max_length:
+            return [length] * count
+        span = max_length - min_length + 1
+        if not 0 < span <= 256:
+            return [self.rng.randint(min_length, max_length) for _ in range(count)]
+        # Each length is a pick from a "charset" of the span's offsets.
+        offsets = self._random_bytes(count, *_charset_table(''.join(map(chr, range(span)))))
+        return [min_length + offset for offset in offsets]
+
+    def _random_bytes(self, count: int, table: bytes, rejected: bytes) -> bytes:
+        """`count` uniform picks from a _charset_table."""
+        picks = b''
+        while len(picks) < count:
+            # Draw enough that the bytes translate() deletes rarely leave us short.
+            short = count - len(picks)
+            picks += self.rng.randbytes(short * 256 // (256 - len(rejected)) + 16).translate(table, rejected)
+        return picks[:count]
+
+
+class EmailGenerator(PooledGenerator):
     """Generate random email addresses."""
 
-    def generate(self) -> str:
-        """Generate a random email address."""
+    placeholder = 'email'
+
+    def generate_batch(self, count: int) -> list:
         domain = self.constraints.get('domain', None)
         if domain:
-            username = fake.user_name()
-            return f"{username}@{domain}"
-        return fake.email()
+            return [f"{username}@{domain}"
+                    for username in compose('user_name', self.rng, count, self.locale)]
+        return super().generate_batch(count)
 
 
-class PhoneGenerator(BaseGenerator):
+class PhoneGenerator(PooledGenerator):
     """Generate random phone numbers."""
 
-    def generate(self) -> str:
-        """Generate a random phone number."""
-        format_type = self.constraints.get('format', 'US')
-        if format_type == 'US':
-            return fake.phone_number()
-        return fake.phone_number()
+    placeholder = 'phone_number'
+
+
+# Stamp the version nibble (byte 6) and RFC 4122 variant bits (byte 8) onto
+# every UUID in a buffer with one bytes.translate per batch.
+_UUID_V4 = bytes((b & 0x0F) | 0x40 for b in range(256))
+_UUID_VARIANT = bytes((b & 0x3F) | 0x80 for b in range(256))
 
 
 class UUIDGenerator(BaseGenerator):
-    """Generate UUIDs."""
+    """Generate UUIDs: random (version 4, the default) or time-ordered (version 7).
+
+    A batch is cut from one buffer of random bytes, `os.urandom` or the
+    field's seeded stream. Version 7 UUIDs start with the Unix time in
+    milliseconds and a 12-bit counter, so each one sorts after the last and
+    bulk inserts append to the end of a B-tree index instead of splitting
+    pages all over it. Unseeded, the time comes from the clock; seeded, it
+    counts up from a start drawn from the stream (within the year after
+    SEEDED_EPOCH_MS), so seeded output is reproducible like every other type.
+    """
+
+    VERSIONS = (4, 7)
+    SEEDED_EPOCH_MS = 1_704_067_200_000  # 2024-01-01T00:00:00Z
+    _YEAR_MS = 365 * 24 * 3600 * 1000
+
+    def __init__(self, constraints=None, rng=None):
+        super().__init__(constraints, rng)
+        # Last v7 (milliseconds << 12 | counter) handed out. Unseeded
+        # generators may be shared between threads.
+        self._sequence = 0
+        self._sequence_lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        version = self.constraints.get('version') or 4
+        if str(version) not in {str(v) for v in self.VERSIONS}:
+            raise ValueError(f"Unsupported UUID version '{version}'. Use 4 or 7")
+        return int(version)
 
     def generate(self) -> str:
         """Generate a UUID."""
-        version = self.constraints.get('version', 4)
-        if version == 4:
-            return str(uuid.uuid4())
-        return str(uuid.uuid4())
-
-
-class NameGenerator(BaseGenerator):
+        return self.generate_batch(1)[0]
+
+    def generate_batch(self, count: int) -> list:
+        version = self.version
+        if self.rng is random:
+            data = bytearray(os.urandom(16 * count))
+        else:
+            if version == 7 and not self._sequence:
+                # Drawn ahead of the first batch's bytes, so the column
+                # doesn't depend on how it is split into batches.
+                self._sequence = (self.SEEDED_EPOCH_MS + self.rng.randrange(self._YEAR_MS)) << 12
+            data = bytearray(self.rng.randbytes(16 * count))
+        if version == 7:
+            self._stamp_time(data, count)
+        else:
+            data[6::16] = data[6::16].translate(_UUID_V4)
+        data[8::16] = data[8::16].translate(_UUID_VARIANT)
+        h = data.hex()
+        return [f'{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}'
+                for i in range(0, 32 * count, 32)]
+
+    def _stamp_time(self, data: bytearray, count: int) -> None:
+        # Bytes 0-7 of each UUID become 48 bits of milliseconds, the version
+        # and a counter. When the counter runs out within one millisecond, the
+        # timestamp moves on a millisecond early (RFC 9562, section 6.2).
+        with self._sequence_lock:
+            start = self._sequence + 1
+            if self.rng is random:
+                start = max(time.time_ns() // 1_000_000 << 12, start)
+            self._sequence = start + count - 1
+        heads = struct.pack(f'>{count}Q', *[(s >> 12) << 16 | 0x7000 | (s & 0xFFF)
+                                             for s in range(start, start + count)])
+        for i in range(8):
+            data[i::16] = heads[i::8]
+
+
+class NameGenerator(PooledGenerator):
     """Generate random names."""
 
-    def generate(self) -> str:
-        """Generate a random name."""
+    placeholder = 'name'
+
+    def generate_batch(self, count: int) -> list:
         name_type = self.constraints.get('type', 'full')
         if name_type == 'first':
-            return fake.first_name()
+            return get_pool('first_name', self.locale).choices(self.rng, count)
         elif name_type == 'last':
-            return fake.last_name()
-        return fake.name()
+            return get_pool('last_name', self.locale).choices(self.rng, count)
+        return super().generate_batch(count)
 
 
-class AddressGenerator(BaseGenerator):
-    """Generate random addresses."""
+class AddressGenerator(PooledGenerator):
+    """Generate random addresses, on one line."""
 
-    def generate(self) -> str:
-        """Generate a random address."""
-        return fake.address().replace('\n', ', ')
+    placeholder = 'address_line'
+
+    def generate_batch(self, count: int) -> list:
+        # Nested templates (e.g. en_GB's street address) can span lines too.
+        return [address.replace('\n', ', ') for address in super().generate_batch(count)]
 
 
-class CityGenerator(BaseGenerator):
+class CityGenerator(PooledGenerator):
     """Generate random city names."""
 
-    def generate(self) -> str:
-        """Generate a random city name."""
-        return fake.city()
+    placeholder = 'city'
 
 
-class CountryGenerator(BaseGenerator):
+class CountryGenerator(FakerBackedGenerator):
     """Generate random country names."""
 
     def generate(self) -> str:
         """Generate a random country name."""
-        return fake.country()
+        return self.fake.country()
 
 
-class CompanyGenerator(BaseGenerator):
+class CompanyGenerator(PooledGenerator):
     """Generate random company names."""
 
-    def generate(self) -> str:
-        """Generate a random company name."""
-        return fake.company()
+    placeholder = 'company'
 
 
-class URLGenerator(BaseGenerator):
+class URLGenerator(PooledGenerator):
     """Generate random URLs."""
 
-    def generate(self) -> str:
-        """Generate a random URL."""
-        return fake.url()
+    placeholder = 'url'
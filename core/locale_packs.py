@@ -0,0 +1,300 @@
+"""Precompiled per-locale data packs.
+
+Faker is slow to import and to set up a locale, and slow per call. The
+component lists and format templates behind its names, addresses,
+companies, phone numbers, emails and URLs are static, though, so a build
+step snapshots them into one file per locale under core/locale_data/:
+
+    python -m core.locale_packs              # rebuild every pack in LOCALES
+    python -m core.locale_packs de_DE pl_PL  # (re)build just these
+
+Run it after upgrading Faker or adding a locale, and commit the files.
+
+A pack is a small directory followed by value pools in the
+`core.value_pools` format, each 8-byte aligned:
+
+    header     magic, format version, pool count
+    directory  per pool: name (64 bytes), offset, size
+    pools
+
+`load_pack` memory-maps the file read-only, so loading a locale is a
+handful of syscalls and its pages are shared by every process on the host.
+Values Faker computes in code rather than picks from a list (postcodes,
+state abbreviations, domain words) are kept as a sample of SAMPLE_SIZE of
+its outputs.
+"""
+
+import argparse
+import mmap
+import os
+import re
+import struct
+import sys
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .value_pools import (LEXIFY, LOWERCASE, NUMERIFY, SLUGIFY, UPPERCASE, StringPool, encode_pool,
+                          slugify)
+
+PACK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'locale_data')
+DEFAULT_LOCALE = 'en_US'
+LOCALES = ('en_US', 'en_GB', 'en_CA', 'en_AU', 'de_DE', 'fr_FR', 'es_ES', 'it_IT',
+           'nl_NL', 'pt_BR', 'pl_PL')
+
+# Faker methods every pack snapshots. Generators compose these; the
+# placeholders in their templates are resolved to more pools recursively.
+ROOTS = ('name', 'city', 'street_name', 'company', 'phone_number', 'user_name')
+
+# Outputs of a method drawn for its pool when it has no static data.
+SAMPLE_SIZE = 2000
+
+_MAGIC = b'SGLP'
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sII')
+_ENTRY = struct.Struct('<64sQQ')
+_LOCALE = re.compile(r'^[a-z]{2,3}(_[A-Z]{2})?$')
+_PLACEHOLDER = re.compile(r'\{\{(\w+)\}\}')
+_RANDOM_ELEMENT = re.compile(r'random_element\(\s*self\.(\w+)\s*\)')
+_FALLBACK = re.compile(r'^\s*return self\.(\w+)\(\)\s*$', re.M)
+# Formatting a template pool can't reproduce: private helpers or tables
+# (_to_ascii is SLUGIFY), f-strings, str.format.
+_OWN_FORMATTING = re.compile(r'self\._(?!to_ascii\()\w|\bf[\'"]|\.format\(')
+
+
+def _derived_roots(snapshot: '_Snapshot') -> Dict[str, object]:
+    """Templates for roots Faker assembles in code rather than from a list."""
+    internet = snapshot.provider('internet')
+    address_formats = snapshot.provider('address').address_formats
+    if isinstance(address_formats, dict):
+        address_line = {t.replace('\n', ', '): w for t, w in address_formats.items()}
+    else:
+        address_line = [t.replace('\n', ', ') for t in address_formats]
+    return {
+        'email': ('{{user_name}}@{{safe_domain_name}}',),  # email(safe=True)
+        'domain_name': ('{{domain_word}}.{{tld}}',),
+        'url': [f'{scheme}://{pattern}' for scheme in ('http', 'https')
+                for pattern in internet.url_formats],
+        'address_line': address_line,  # address(), on one line
+    }
+
+
+class _Snapshot:
+    """Collects the pools behind one locale's Faker methods.
+
+    Most of Faker's text methods are one of a few shapes: pick from a list
+    (`random_element(self.last_names)`), pick a template and fill it in
+    (`generator.parse(...)`, then maybe `numerify`, `lower()`, ...), or fall
+    back to another method when the locale lacks a list. The method each
+    placeholder resolves to is read to tell which. Anything else, including
+    a method that formats values itself, is sampled.
+    """
+
+    def __init__(self, locale: str):
+        from faker import Faker
+        self.fake = Faker(locale)
+        self.fake.seed_instance(0)
+        # Highest precedence first, the order Faker resolves methods in.
+        self.providers = self.fake.providers
+        # name -> (values, transforms); '<method>_format' pools hold templates.
+        self.pools: Dict[str, tuple] = {}
+        self._seen: Set[str] = set()
+
+    def provider(self, kind: str):
+        for provider in self.providers:
+            if provider.__module__.split('.')[2] == kind:
+                return provider
+        raise LookupError(f'No {kind} provider')
+
+    def add(self, method: str) -> bool:
+        """Snapshot the data behind `method`; False if it has none."""
+        import inspect  # build step only; too slow to import at runtime
+        if method in self.pools or f'{method}_format' in self.pools:
+            return True
+        if method in self._seen:
+            return False  # unresolvable, or a template that refers to itself
+        self._seen.add(method)
+        provider = next((p for p in self.providers if callable(getattr(p, method, None))), None)
+        if provider is None:
+            return False
+        source = inspect.getsource(getattr(type(provider), method))
+        if _OWN_FORMATTING.search(source):
+            return self.add_sample(method)
+        transforms = _transforms(source)
+        for attribute in _RANDOM_ELEMENT.findall(source):
+            values = getattr(provider, attribute, None)
+            if not isinstance(values, (tuple, list, dict)) or not values:
+                continue  # e.g. the branch behind `if hasattr(self, ...)`
+            if not all(isinstance(v, str) for v in values):
+                break
+            if 'parse(' in source or transforms & (NUMERIFY | LEXIFY):
+                return self.add_templates(method, values, transforms)
+            if transforms:
+                values = _apply(values, transforms)
+            self.pools[method] = (values, 0)
+            return True
+        fallback = _FALLBACK.search(source)
+        if fallback and self.add(fallback.group(1)):
+            target = fallback.group(1)
+            if target in self.pools:
+                self.pools[method] = self.pools[target]
+            else:
+                self.pools[f'{method}_format'] = self.pools[f'{target}_format']
+            return True
+        return self.add_sample(method)
+
+    def add_templates(self, method: str, templates, transforms: int = 0) -> bool:
+        """Add '<method>_format', keeping the templates whose placeholders resolve."""
+        self._seen.add(method)
+        weights = templates if isinstance(templates, dict) else None
+        kept = [t for t in templates if all(self.add(p) for p in _PLACEHOLDER.findall(t))]
+        if not kept:
+            return False
+        values = {t: weights[t] for t in kept} if weights is not None else kept
+        self.pools[f'{method}_format'] = (values, transforms)
+        return True
+
+    def add_sample(self, method: str) -> bool:
+        try:
+            values = [getattr(self.fake, method)() for _ in range(SAMPLE_SIZE)]
+        except Exception:
+            return False
+        if not all(isinstance(v, str) for v in values):
+            return False
+        self.pools[method] = (values, 0)
+        return True
+
+
+def _transforms(source: str) -> int:
+    transforms = 0
+    if 'numerify(' in source or 'bothify(' in source:
+        transforms |= NUMERIFY
+    if 'lexify(' in source or 'bothify(' in source:
+        transforms |= LEXIFY
+    if '@lowercase' in source or '.lower()' in source or '@slugify' in source:
+        transforms |= LOWERCASE
+    if '@slugify' in source or '_to_ascii(' in source:
+        transforms |= SLUGIFY
+    if '.upper()' in source:
+        transforms |= UPPERCASE
+    return transforms
+
+
+def _apply(values, transforms: int):
+    # Lower-casing and slugifying a list pool can be done once, here.
+    def apply(value):
+        if transforms & LOWERCASE:
+            value = value.lower()
+        elif transforms & UPPERCASE:
+            value = value.upper()
+        if transforms & SLUGIFY:
+            value = slugify(value)
+        return value
+    if isinstance(values, dict):
+        return {apply(v): w for v, w in values.items()}
+    return [apply(v) for v in values]
+
+
+def build_pack(locale: str) -> bytes:
+    """Snapshot `locale`'s data from Faker into pack bytes."""
+    snapshot = _Snapshot(locale)
+    for root, templates in _derived_roots(snapshot).items():
+        snapshot.add_templates(root, templates)
+    for method in ROOTS:
+        snapshot.add(method)
+    pools = {name: encode_pool(values, transforms)
+             for name, (values, transforms) in sorted(snapshot.pools.items())}
+
+    offset = _HEADER.size + _ENTRY.size * len(pools)
+    directory, blobs = [], []
+    for name, data in pools.items():
+        if len(name) > 64:
+            raise ValueError(f'Pool name {name!r} is too long for a locale pack')
+        offset += -offset % 8
+        directory.append(_ENTRY.pack(name.encode('ascii'), offset, len(data)))
+        blobs.append(data)
+        offset += len(data)
+    parts = [_HEADER.pack(_MAGIC, _FORMAT_VERSION, len(pools)), *directory]
+    size = sum(map(len, parts))
+    for data in blobs:
+        parts.append(b'\0' * (-size % 8))
+        size += -size % 8
+        parts.append(data)
+        size += len(data)
+    return b''.join(parts)
+
+
+class LocalePack:
+    """Read-only, memory-mapped view of one pack file."""
+
+    def __init__(self, path: str, locale: str = ''):
+        self.locale = locale
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError(f'{path} is not a version {_FORMAT_VERSION} locale pack; rebuild it')
+        self._entries: Dict[str, Tuple[int, int]] = {}
+        for i in range(count):
+            name, offset, size = _ENTRY.unpack_from(self._map, _HEADER.size + i * _ENTRY.size)
+            self._entries[name.rstrip(b'\0').decode('ascii')] = (offset, size)
+
+    @property
+    def names(self) -> Iterable[str]:
+        return self._entries.keys()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def data(self, name: str) -> memoryview:
+        """The encoded pool `name` (KeyError if the pack has none)."""
+        offset, size = self._entries[name]
+        return memoryview(self._map)[offset:offset + size]
+
+    def pool(self, name: str) -> StringPool:
+        return StringPool(self.data(name))
+
+
+def available_locales() -> List[str]:
+    try:
+        return sorted(f[:-5] for f in os.listdir(PACK_DIR) if f.endswith('.pack'))
+    except FileNotFoundError:
+        return []
+
+
+def load_pack(locale: Optional[str] = None) -> LocalePack:
+    """The pack for `locale` (default: DEFAULT_LOCALE), mapped on first use."""
+    locale = locale or DEFAULT_LOCALE
+    if not isinstance(locale, str) or not _LOCALE.match(locale):
+        raise _unsupported(locale)
+    return _load_pack(locale)
+
+
+@lru_cache(maxsize=None)
+def _load_pack(locale: str) -> LocalePack:
+    path = os.path.join(PACK_DIR, f'{locale}.pack')
+    if not os.path.exists(path):
+        raise _unsupported(locale)
+    return LocalePack(path, locale)
+
+
+def _unsupported(locale) -> ValueError:
+    return ValueError(f"Unsupported locale '{locale}'. Available: {', '.join(available_locales())}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Build the locale data packs from Faker.')
+    parser.add_argument('locales', nargs='*', help=f'locales to build (default: {" ".join(LOCALES)})')
+    args = parser.parse_args(argv)
+    os.makedirs(PACK_DIR, exist_ok=True)
+    for locale in args.locales or LOCALES:
+        data = build_pack(locale)
+        path = os.path.join(PACK_DIR, f'{locale}.pack')
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+        print(f'{locale:8} {len(data) / 1024:7.1f} KiB  {path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
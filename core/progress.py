@@ -0,0 +1,168 @@
+"""Generation progress reporting.
+
+`SyntheticDataEngine.generate` calls a progress callback once per batch with
+a `GenerationProgress`. `ProgressBoard` keeps the latest one per key so a
+separate request (e.g. a Server-Sent Events stream) can follow a generation
+that is running elsewhere in the same process.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Optional
+
+
+@dataclass(frozen=True)
+class GenerationProgress:
+    """Snapshot of a running generation, emitted after each batch."""
+
+    rows_done: int
+    total_rows: int
+    elapsed: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def fraction(self) -> float:
+        return self.rows_done / self.total_rows if self.total_rows else 1.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data['elapsed'] = round(self.elapsed, 3)
+        data['rows_per_second'] = round(self.rows_per_second, 1)
+        return data
+
+
+ProgressCallback = Callable[[GenerationProgress], None]
+
+
+class ProgressBoard:
+    """Thread-safe latest-progress store, keyed by a caller-chosen id.
+
+    Entries are plain dicts with a `version` that bumps on every change, and
+    expire `ttl` seconds after their last update.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._entries: Dict[str, dict] = {}
+        self._updated: Dict[str, float] = {}
+        self._cond = threading.Condition()
+
+    def start(self, key: str, total_rows: int) -> None:
+        self._put(key, {'rows_done': 0, 'total_rows': total_rows, 'elapsed': 0.0,
+                        'rows_per_second': 0.0, 'done': False, 'error': None})
+
+    def callback(self, key: str) -> ProgressCallback:
+        """Engine progress callback that publishes to `key`."""
+        def publish(progress: GenerationProgress) -> None:
+            self._put(key, {**progress.to_dict(), 'done': False, 'error': None})
+        return publish
+
+    def finish(self, key: str, error: Optional[str] = None) -> None:
+        with self._cond:
+            entry = dict(self._entries.get(key) or {'rows_done': 0, 'total_rows': 0})
+        entry.update(done=True, error=error)
+        self._put(key, entry)
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._cond:
+            entry = self._entries.get(key)
+            return dict(entry) if entry else None
+
+    def wait(self, key: str, after_version: int, timeout: float) -> Optional[dict]:
+        """Block until `key` has a version newer than `after_version` (or timeout)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                entry = self._entries.get(key)
+                if entry and entry['version'] > after_version:
+                    return dict(entry)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return dict(entry) if entry else None
+                self._cond.wait(remaining)
+
+    def _put(self, key: str, entry: dict) -> None:
+        now = time.monotonic()
+        with self._cond:
+            previous = self._entries.get(key)
+            entry['version'] = (previous['version'] if previous else 0) + 1
+            self._entries[key] = entry
+            self._updated[key] = now
+            expired = [k for k, t in self._updated.items() if now - t > self.ttl]
+            for k in expired:
+                self._entries.pop(k, None)
+                self._updated.pop(k, None)
+            self._cond.notify_all()
+
+
+class FileProgressBoard(ProgressBoard):
+    """ProgressBoard shared between worker processes through small JSON files.
+
+    Gunicorn may route the progress stream to a different worker than the
+    one generating, so entries live in `directory` (one file per key,
+    replaced atomically) instead of process memory.
+    """
+
+    poll_interval = 0.2
+
+    def __init__(self, directory: str, ttl: float = 300.0):
+        super().__init__(ttl)
+        self.directory = directory
+        self._expired_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def wait(self, key: str, after_version: int, timeout: float) -> Optional[dict]:
+        deadline = time.monotonic() + timeout
+        while True:
+            entry = self.get(key)
+            if (entry and entry['version'] > after_version) or time.monotonic() >= deadline:
+                return entry
+            time.sleep(self.poll_interval)
+
+    def finish(self, key: str, error: Optional[str] = None) -> None:
+        entry = self.get(key) or {'rows_done': 0, 'total_rows': 0}
+        entry.update(done=True, error=error)
+        self._put(key, entry)
+
+    def _put(self, key: str, entry: dict) -> None:
+        previous = self.get(key)
+        entry['version'] = (previous['version'] if previous else 0) + 1
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp, self._path(key))
+        self._expire()
+
+    def _expire(self) -> None:
+        if time.monotonic() - self._expired_at < 60:
+            return
+        self._expired_at = time.monotonic()
+        cutoff = time.time() - self.ttl
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.json')
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
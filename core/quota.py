@@ -0,0 +1,196 @@
+"""Write-behind daily request counters shared by the API and web quota checks.
+
+Enforcing the daily limit used to cost an UPDATE + COMMIT per request. The
+ledger instead counts requests in memory and flushes aggregated deltas to the
+database every few seconds (and at shutdown). Each process only lets
+`safety_margin` unflushed requests pile up per user before it flushes
+synchronously, so with P processes the daily limit can be overshot by at most
+roughly (P - 1) * safety_margin requests.
+"""
+
+import atexit
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+
+# sync(day, {user_id: delta}) -> {user_id: requests_today persisted for `day`}.
+# Must add the deltas (which may be 0, meaning "just read") and return the
+# current count for every user passed in.
+SyncFunc = Callable[[date, Dict[int, int]], Dict[int, int]]
+
+# execute(sql, params) -> rows, for a DB-API or SQLAlchemy connection.
+ExecuteFunc = Callable[[str, Dict[str, Any]], Iterable[Any]]
+
+# Deltas are negative when refunds outnumber requests since the last flush,
+# so both counters are clamped at zero. Plain CASE keeps this portable
+# across SQLite and Postgres.
+_APPLY_DELTA_SQL = '''UPDATE users SET
+    requests_today = CASE
+        WHEN last_request_date = :day THEN
+            CASE WHEN requests_today + :n > 0 THEN requests_today + :n ELSE 0 END
+        WHEN last_request_date > :day THEN requests_today
+        ELSE CASE WHEN :n > 0 THEN :n ELSE 0 END END,
+    last_request_date = CASE
+        WHEN last_request_date > :day THEN last_request_date
+        ELSE :day END,
+    total_requests = CASE
+        WHEN total_requests + :n > 0 THEN total_requests + :n ELSE 0 END
+   WHERE id = :id'''
+
+_READ_USAGE_SQL = '''SELECT CASE
+        WHEN last_request_date = :day THEN COALESCE(requests_today, 0)
+        ELSE 0 END
+   FROM users WHERE id = :id'''
+
+
+def sync_usage(execute: ExecuteFunc, day: date, deltas: Dict[int, int]) -> Dict[int, int]:
+    """Apply `deltas` to the users table through `execute` and read back the counts.
+
+    Shared by the API and web ledgers; the caller owns the transaction.
+    """
+    params = {'day': day.isoformat()}
+    counts: Dict[int, int] = {}
+    for user_id, n in deltas.items():
+        if n:
+            execute(_APPLY_DELTA_SQL, {**params, 'n': n, 'id': user_id})
+        for row in execute(_READ_USAGE_SQL, {**params, 'id': user_id}):
+            counts[user_id] = row[0]
+    return counts
+
+
+@dataclass
+class _Entry:
+    persisted: int = 0
+    pending: int = 0
+    synced_at: float = 0.0
+    used_at: float = 0.0
+
+
+class QuotaLedger:
+    """In-memory daily request counters with periodic write-behind flushing."""
+
+    def __init__(self, sync: SyncFunc, flush_interval: float = 2.0,
+                 safety_margin: int = 10, max_staleness: float = 10.0,
+                 idle_eviction: float = 300.0):
+        self._sync = sync
+        self.flush_interval = flush_interval
+        self.safety_margin = max(1, safety_margin)
+        self.max_staleness = max_staleness
+        self.idle_eviction = idle_eviction
+
+        self._entries: Dict[Tuple[int, date], _Entry] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        atexit.register(self.close)
+
+    def try_consume(self, user_id: int, limit: int, amount: int = 1) -> bool:
+        """Count `amount` requests for today if the user stays within `limit`."""
+        self._ensure_flusher()
+        key = (user_id, date.today())
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            needs_sync = (
+                entry is None
+                or entry.pending + amount > self.safety_margin
+                or now - entry.synced_at > self.max_staleness
+            )
+        if needs_sync:
+            self.flush({key})
+
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry(synced_at=now))
+            entry.used_at = now
+            if entry.persisted + entry.pending + amount > limit:
+                return False
+            entry.pending += amount
+            return True
+
+    def refund(self, user_id: int, amount: int = 1) -> None:
+        """Give back requests counted today that were never served."""
+        with self._lock:
+            entry = self._entries.get((user_id, date.today()))
+            if entry is not None:
+                entry.pending -= amount
+
+    def usage(self, user_id: int) -> Optional[int]:
+        """Requests counted today by this process's view, or None if unknown."""
+        with self._lock:
+            entry = self._entries.get((user_id, date.today()))
+            return None if entry is None else entry.persisted + entry.pending
+
+    def flush(self, keys: Optional[Set[Tuple[int, date]]] = None) -> None:
+        """Write pending deltas (plus a read of any `keys`) through `sync`."""
+        with self._flush_lock:
+            with self._lock:
+                batches: Dict[date, Dict[int, int]] = {}
+                for key, entry in self._entries.items():
+                    if entry.pending or (keys and key in keys):
+                        batches.setdefault(key[1], {})[key[0]] = entry.pending
+                for key in keys or ():
+                    if key not in self._entries:
+                        batches.setdefault(key[1], {})[key[0]] = 0
+
+            for day, deltas in batches.items():
+                fresh = self._sync(day, deltas)
+                now = time.monotonic()
+                with self._lock:
+                    for user_id, delta in deltas.items():
+                        entry = self._entries.setdefault((user_id, day), _Entry(used_at=now))
+                        entry.pending -= delta
+                        entry.persisted = fresh.get(user_id, entry.persisted + delta)
+                        entry.synced_at = now
+
+            self._evict()
+
+    def close(self) -> None:
+        """Stop the background flusher and write out anything still pending."""
+        self._stop.set()
+        if self._pid == os.getpid():
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def _evict(self) -> None:
+        today = date.today()
+        cutoff = time.monotonic() - self.idle_eviction
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if not entry.pending and (key[1] != today or entry.used_at < cutoff)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def _ensure_flusher(self) -> None:
+        # Started lazily (and restarted after fork) because threads don't
+        # survive into preforked gunicorn/uvicorn workers.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            if self._pid is not None:
+                self._entries.clear()
+                self._flush_lock = threading.Lock()
+            self._pid = pid
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='quota-ledger', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # Deltas stay pending and are retried on the next tick.
+                pass
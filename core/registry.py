@@ -0,0 +1,286 @@
+"""Registry of field types: the one place that knows which types exist.
+
+Each `FieldType` records everything the rest of the code needs about a type
+- its generator (as an import path, loaded on first use), the constraints it
+accepts, a description and UI label, and its cost weight for admission
+control. The engine, `FieldSchema.validate`, the API's /field-types, the
+web UI and the CLI all read from `registry`.
+
+Third-party packages can add types through the `syngen.field_types` entry
+point group. Each entry point must resolve to a `FieldType` (or a list of
+them); point it at a light module, since the generator itself is only
+imported once the type is used:
+
+    [project.entry-points."syngen.field_types"]
+    ip_address = "mypackage.syngen_types:IP_ADDRESS"
+
+Entry points are discovered the first time the registry is listed or asked
+about a type it doesn't know, so lookups of built-in types never pay for it.
+"""
+
+import importlib
+import logging
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'syngen.field_types'
+
+# Cost weight (microseconds per value, see core.cost) for types that don't set one.
+DEFAULT_COST = 10.0
+
+
+@dataclass(frozen=True)
+class FieldType:
+    """Metadata for one field type."""
+
+    name: str
+    generator: str  # 'package.module:ClassName'
+    label: str
+    category: str
+    description: str
+    constraints: Tuple[str, ...] = ()
+    cost: float = DEFAULT_COST
+
+    def to_dict(self) -> dict:
+        return {
+            'type': self.name,
+            'description': self.description,
+            'supported_constraints': list(self.constraints),
+        }
+
+
+class FieldTypeRegistry(Mapping):
+    """Field type name -> FieldType, with lazily imported generator classes."""
+
+    def __init__(self, field_types: Iterable[FieldType],
+                 entry_point_group: Optional[str] = ENTRY_POINT_GROUP):
+        self._types: Dict[str, FieldType] = {}
+        self._classes: Dict[str, type] = {}
+        self._group = entry_point_group
+        self._lock = threading.RLock()
+        # Bumped on every change, so renderings of the registry can be cached.
+        self.version = 0
+        for field_type in field_types:
+            self.register(field_type)
+        self.classes = _GeneratorClasses(self)
+
+    def register(self, field_type: FieldType, replace: bool = False) -> None:
+        with self._lock:
+            if field_type.name in self._types and not replace:
+                raise ValueError(f"Field type '{field_type.name}' is already registered")
+            self._types[field_type.name] = field_type
+            self._classes.pop(field_type.name, None)
+            self.version += 1
+
+    def generator_class(self, name: str) -> type:
+        """The generator class for `name`, imported on first use. KeyError if unknown."""
+        cls = self._classes.get(name)
+        if cls is None:
+            module, _, attr = self[name].generator.partition(':')
+            cls = getattr(importlib.import_module(module), attr)
+            self._classes[name] = cls
+        return cls
+
+    def cost(self, name: str) -> float:
+        field_type = self._types.get(name)
+        return field_type.cost if field_type else DEFAULT_COST
+
+    def __getitem__(self, name: str) -> FieldType:
+        try:
+            return self._types[name]
+        except KeyError:
+            if not self._load_entry_points():
+                raise
+            return self._types[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self._types or (self._load_entry_points() and name in self._types)
+
+    def __iter__(self) -> Iterator[str]:
+        self._load_entry_points()
+        return iter(list(self._types))
+
+    def __len__(self) -> int:
+        self._load_entry_points()
+        return len(self._types)
+
+    def _load_entry_points(self) -> bool:
+        """Register plugin types, once. Returns True if this call loaded them."""
+        if self._group is None:
+            return False
+        with self._lock:
+            if self._group is None:
+                return False
+            group, self._group = self._group, None
+
+            from importlib.metadata import entry_points
+
+            for entry_point in entry_points(group=group):
+                try:
+                    loaded = entry_point.load()
+                    for field_type in ([loaded] if isinstance(loaded, FieldType) else loaded):
+                        self.register(field_type)
+                except Exception:
+                    logger.exception('Could not load field type plugin %r', entry_point.value)
+            return True
+
+
+class _GeneratorClasses(Mapping):
+    """Read-only view of a registry as field type name -> generator class."""
+
+    def __init__(self, registry: FieldTypeRegistry):
+        self._registry = registry
+
+    def __getitem__(self, name: str) -> type:
+        return self._registry.generator_class(name)
+
+    def __contains__(self, name) -> bool:
+        return name in self._registry
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._registry)
+
+    def __len__(self) -> int:
+        return len(self._registry)
+
+
+# Built-in types, in the order they are offered in the UI.
+BUILTIN_TYPES = (
+    # Numeric
+    FieldType('integer', 'core.generators.numeric:IntegerGenerator', 'Integer', 'Numeric',
+              'Random integer within range',
+              constraints=('min', 'max'), cost=0.7),
+    FieldType('float', 'core.generators.numeric:FloatGenerator', 'Float', 'Numeric',
+              'Random floating-point number',
+              constraints=('min', 'max', 'precision'), cost=0.8),
+
+    # Text
+    FieldType('string', 'core.generators.text:StringGenerator', 'String', 'Text',
+              'Random alphanumeric string',
+              constraints=('length', 'min_length', 'max_length', 'charset'), cost=0.2),
+    FieldType('name', 'core.generators.text:NameGenerator', 'Full Name', 'Text',
+              'Random person name',
+              constraints=('type', 'locale'), cost=4.6),
+    FieldType('company', 'core.generators.text:CompanyGenerator', 'Company Name', 'Text',
+              'Random company name',
+              constraints=('locale',), cost=4.6),
+
+    # Contact
+    FieldType('email', 'core.generators.text:EmailGenerator', 'Email Address', 'Contact',
+              'Random email address',
+              constraints=('domain', 'locale'), cost=9.8),
+    FieldType('phone', 'core.generators.text:PhoneGenerator', 'Phone Number', 'Contact',
+              'Random phone number',
+              constraints=('format', 'locale'), cost=5.6),
+    FieldType('url', 'core.generators.text:URLGenerator', 'URL', 'Contact',
+              'Random URL',
+              constraints=('locale',), cost=8.8),
+
+    # Location
+    FieldType('address', 'core.generators.text:AddressGenerator', 'Street Address', 'Location',
+              'Random street address',
+              constraints=('locale',), cost=21.8),
+    FieldType('city', 'core.generators.text:CityGenerator', 'City', 'Location',
+              'Random city name',
+              constraints=('locale',), cost=4.5),
+    FieldType('country', 'core.generators.text:CountryGenerator', 'Country', 'Location',
+              'Random country name',
+              constraints=(), cost=6.5),
+
+    # Date/Time
+    FieldType('date', 'core.generators.datetime:DateGenerator', 'Date', 'Date/Time',
+              'Random date within range',
+              constraints=('start', 'end', 'format'), cost=0.1),
+    FieldType('datetime', 'core.generators.datetime:DateTimeGenerator', 'DateTime', 'Date/Time',
+              'Random datetime within range',
+              constraints=('start', 'end', 'format'), cost=26.7),
+
+    # Other
+    FieldType('boolean', 'core.generators.boolean:BooleanGenerator', 'Boolean', 'Other',
+              'Random boolean value',
+              constraints=('true_probability',), cost=0.2),
+    FieldType('uuid', 'core.generators.text:UUIDGenerator', 'UUID', 'Other',
+              'Universally unique identifier',
+              constraints=('version',), cost=1.1),
+    FieldType('category', 'core.generators.common:CategoryGenerator', 'Custom Category', 'Other',
+              'Random value sampled from a custom list, optionally weighted',
+              constraints=('choices', 'weights'), cost=0.7),
+
+    # Call Center
+    FieldType('call_duration', 'core.generators.callcenter:CallDurationGenerator', 'Call Duration (sec)', 'Call Center',
+              'Call handle time in seconds (right-skewed distribution)',
+              constraints=('min', 'max', 'mean'), cost=2.1),
+    FieldType('wait_time', 'core.generators.callcenter:WaitTimeGenerator', 'Queue Wait Time (sec)', 'Call Center',
+              'Time in queue before being answered, in seconds',
+              constraints=('min', 'max', 'mean'), cost=2.3),
+    FieldType('hold_time', 'core.generators.callcenter:HoldTimeGenerator', 'Hold Time (sec)', 'Call Center',
+              'Time on hold during the call, in seconds',
+              constraints=('min', 'max', 'mean'), cost=2.1),
+    FieldType('call_type', 'core.generators.callcenter:CallTypeGenerator', 'Call Type', 'Call Center',
+              'Call direction (Inbound/Outbound)',
+              constraints=('choices', 'weights'), cost=1.8),
+    FieldType('call_channel', 'core.generators.callcenter:CallChannelGenerator', 'Call Channel', 'Call Center',
+              'Contact channel (Phone/Chat/Email/Social Media)',
+              constraints=('choices', 'weights'), cost=1.9),
+    FieldType('call_department', 'core.generators.callcenter:CallDepartmentGenerator', 'Department/Queue', 'Call Center',
+              'Queue/department that handled the call',
+              constraints=('choices', 'weights'), cost=2.0),
+    FieldType('agent_id', 'core.generators.callcenter:AgentIdGenerator', 'Agent ID', 'Call Center',
+              'Agent identifier drawn from a bounded roster',
+              constraints=('prefix', 'num_agents'), cost=0.1),
+    FieldType('call_priority', 'core.generators.callcenter:CallPriorityGenerator', 'Call Priority', 'Call Center',
+              'Priority/severity of the call or ticket',
+              constraints=('choices', 'weights'), cost=1.9),
+    FieldType('call_outcome', 'core.generators.callcenter:CallOutcomeGenerator', 'Call Outcome', 'Call Center',
+              'How the call ended (Resolved, Escalated, Abandoned, ...)',
+              constraints=('choices', 'weights'), cost=2.0),
+    FieldType('resolution_status', 'core.generators.callcenter:ResolutionStatusGenerator', 'Resolution Status', 'Call Center',
+              'Resolution state of the underlying issue',
+              constraints=('choices', 'weights'), cost=1.9),
+    FieldType('sentiment', 'core.generators.callcenter:SentimentGenerator', 'Sentiment', 'Call Center',
+              'Sentiment label (Positive/Neutral/Negative)',
+              constraints=('choices', 'weights'), cost=1.9),
+    FieldType('csat_score', 'core.generators.callcenter:CSATScoreGenerator', 'CSAT Score', 'Call Center',
+              'Customer satisfaction score, skewed toward satisfied',
+              constraints=('scale', 'choices', 'weights'), cost=0.1),
+    FieldType('nps_score', 'core.generators.callcenter:NPSScoreGenerator', 'NPS Score', 'Call Center',
+              'Net Promoter Score response (0-10), skewed toward promoters',
+              constraints=('choices', 'weights'), cost=0.2),
+
+    # Demographics
+    FieldType('age', 'core.generators.demographics:AgeGenerator', 'Age', 'Demographics',
+              'Age in years, skewed toward working-age adults',
+              constraints=('min', 'max', 'mode'), cost=1.0),
+    FieldType('gender', 'core.generators.demographics:GenderGenerator', 'Gender', 'Demographics',
+              'Gender identity',
+              constraints=('choices', 'weights'), cost=1.9),
+    FieldType('ethnicity', 'core.generators.demographics:EthnicityGenerator', 'Ethnicity', 'Demographics',
+              'Race/ethnicity category (US Census-style buckets)',
+              constraints=('choices', 'weights'), cost=2.1),
+    FieldType('marital_status', 'core.generators.demographics:MaritalStatusGenerator', 'Marital Status', 'Demographics',
+              'Marital status',
+              constraints=('choices', 'weights'), cost=1.9),
+    FieldType('education_level', 'core.generators.demographics:EducationLevelGenerator', 'Education Level', 'Demographics',
+              'Highest level of education attained',
+              constraints=('choices', 'weights'), cost=2.2),
+    FieldType('employment_status', 'core.generators.demographics:EmploymentStatusGenerator', 'Employment Status', 'Demographics',
+              'Employment status',
+              constraints=('choices', 'weights'), cost=2.2),
+    FieldType('income_bracket', 'core.generators.demographics:IncomeBracketGenerator', 'Income Bracket', 'Demographics',
+              'Household income bracket label',
+              constraints=('choices', 'weights'), cost=2.0),
+    FieldType('household_size', 'core.generators.demographics:HouseholdSizeGenerator', 'Household Size', 'Demographics',
+              'Number of people in the household',
+              constraints=('min', 'max', 'choices', 'weights'), cost=3.8),
+    FieldType('language_preference', 'core.generators.demographics:LanguagePreferenceGenerator', 'Language Preference', 'Demographics',
+              'Preferred language',
+              constraints=('choices', 'weights'), cost=2.0),
+    FieldType('generation', 'core.generators.demographics:GenerationGenerator', 'Generation', 'Demographics',
+              'Generational cohort label (Gen Z, Millennial, ...)',
+              constraints=('choices', 'weights'), cost=2.2),)
+
+registry = FieldTypeRegistry(BUILTIN_TYPES)
@@ -4,6 +4,8 @@ import re
 from typing import Any, Dict, Optional
 from dataclasses import dataclass, field
 
+from .registry import registry
+
 _SAFE_IDENTIFIER = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
 
 
@@ -26,23 +28,8 @@ class FieldSchema:
                 "Use letters, numbers, and underscores; must start with a letter or underscore."
             )
 
-        valid_types = [
-            'integer', 'float', 'string', 'email', 'phone',
-            'date', 'datetime', 'boolean', 'uuid', 'name',
-            'address', 'city', 'country', 'company', 'url', 'category',
-            # Call center metrics
-            'call_duration', 'wait_time', 'hold_time', 'call_type',
-            'call_channel', 'call_department', 'agent_id', 'call_priority',
-            'call_outcome', 'resolution_status', 'sentiment', 'csat_score',
-            'nps_score',
-            # Demographics
-            'age', 'gender', 'ethnicity', 'marital_status', 'education_level',
-            'employment_status', 'income_bracket', 'household_size',
-            'language_preference', 'generation',
-        ]
-
-        if self.field_type not in valid_types:
-            raise ValueError(f"Invalid field type: {self.field_type}. Must be one of {valid_types}")
+        if self.field_type not in registry:
+            raise ValueError(f"Invalid field type: {self.field_type}. Must be one of {list(registry)}")
 
         return True
 
@@ -0,0 +1,83 @@
+"""Short-lived files for generated output, fetched later by token.
+
+Large results are written straight to a spool file and the client gets a
+token to download it with, instead of the whole dataset being embedded in a
+JSON response. Files are named `<owner>-<token><suffix>`, so a token is only
+usable by the owner it was issued to, and are removed `ttl` seconds after
+they were written (or as soon as they are taken).
+"""
+
+import glob
+import os
+import re
+import secrets
+import time
+from typing import Optional, Tuple
+
+_TOKEN = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+
+
+class Spool:
+    """Directory of expiring output files addressed by (owner, token).
+
+    The directory must be shared by every worker that may serve the
+    download (a local temp dir is fine for a single host).
+    """
+
+    def __init__(self, directory: str, ttl: float = 900.0):
+        self.directory = directory
+        self.ttl = ttl
+        self._expired_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def create(self, owner, suffix: str = '') -> Tuple[str, str]:
+        """Reserve a new spool file; returns (token, path) for the caller to write."""
+        self._expire()
+        token = secrets.token_urlsafe(18)
+        return token, os.path.join(self.directory, f'{owner}-{token}{suffix}')
+
+    def find(self, owner, token: str) -> Optional[str]:
+        """Path of `owner`'s unexpired file for `token`, or None."""
+        if not _TOKEN.match(token or ''):
+            return None
+        for path in glob.glob(os.path.join(glob.escape(self.directory), f'{owner}-{token}*')):
+            try:
+                if time.time() - os.path.getmtime(path) <= self.ttl:
+                    return path
+            except OSError:
+                pass
+        return None
+
+    def take(self, owner, token: str) -> Optional[str]:
+        """Claim `owner`'s file for `token` so the token can't be used again.
+
+        Returns the file's new path (None if it is gone, or another request
+        claimed it first); the caller reads it and then `discard`s it.
+        """
+        path = self.find(owner, token)
+        if path is None:
+            return None
+        claimed = os.path.join(self.directory, f'.taken-{secrets.token_hex(8)}')
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            return None
+        return claimed
+
+    def discard(self, path: str) -> None:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _expire(self) -> None:
+        if time.monotonic() - self._expired_at < 60:
+            return
+        self._expired_at = time.monotonic()
+        cutoff = time.time() - self.ttl
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
@@ -0,0 +1,480 @@
+"""Value pools shared between processes through shared memory.
+
+A pool is a read-only list of strings, optionally weighted, packed into one
+flat buffer:
+
+    header   magic, flags, value count, blob size
+    offsets  count + 1 uint32 - value i is blob[offsets[i]:offsets[i + 1]]
+    alias    (weighted pools) count float64 probabilities + count uint32
+             aliases, a Walker alias table so a weighted draw is O(1)
+    blob     the values, UTF-8 encoded back to back
+
+`PoolStore` publishes pools into `multiprocessing.shared_memory` segments
+named `<namespace>-<pool>-<version>`, next to a tiny `<namespace>-<pool>`
+segment holding the current version. Any process in the namespace - forked
+workers inherit it, spawned ones read it from SYNGEN_POOL_NAMESPACE - maps
+the segments read-only instead of unpickling or copying the values.
+Publishing a pool again writes a new version and only then bumps the
+pointer, so readers switch atomically on their next lookup; a reader still
+holding the previous version keeps a valid mapping until it lets go.
+
+Where shared memory isn't available (e.g. no /dev/shm in some serverless
+runtimes), pools are kept in process memory instead.
+
+`get_pool` serves the pools of the locale data packs (see
+core.locale_packs) through the store, publishing a locale the first time
+it is used, and `compose` builds names, cities, companies and phone numbers
+from them at a fraction of the cost of a Faker call.
+"""
+
+import atexit
+import logging
+import os
+import re
+import string
+import struct
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence, Union
+
+if TYPE_CHECKING:
+    from multiprocessing.shared_memory import SharedMemory
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE_ENV = 'SYNGEN_POOL_NAMESPACE'
+
+_MAGIC = b'SGP1'
+_WEIGHTED = 1
+# Post-processing for composed template values, in the order it is applied.
+NUMERIFY = 2   # '#' -> 0-9 and Faker's other digit placeholders
+LEXIFY = 4     # '?' -> a random ASCII letter
+LOWERCASE = 8
+SLUGIFY = 16   # ASCII-fold, drop punctuation, spaces -> '-' (as for user names)
+UPPERCASE = 32
+_TRANSFORMS = NUMERIFY | LEXIFY | LOWERCASE | SLUGIFY | UPPERCASE
+_RANDOM_CHARS = NUMERIFY | LEXIFY
+_HEADER = struct.Struct('<4sIII')
+_VERSION = struct.Struct('<Q')
+
+PoolValues = Union[Sequence[str], Mapping[str, float]]
+
+
+def encode_pool(values: PoolValues, transforms: int = 0) -> bytes:
+    """Pack `values` into the pool format. A mapping is read as value -> weight.
+
+    `transforms` (NUMERIFY | LEXIFY | ...) marks a pool of templates whose
+    composed values are post-processed the way Faker does, e.g. phone
+    numbers get their `#`s replaced by digits.
+    """
+    weights = None
+    if isinstance(values, Mapping):
+        weights = [float(w) for w in values.values()]
+        values = list(values)
+    if not values:
+        raise ValueError('A value pool needs at least one value')
+    encoded = [v.encode('utf-8') for v in values]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    count = len(encoded)
+    flags = (_WEIGHTED if weights else 0) | (transforms & _TRANSFORMS)
+    parts = [_HEADER.pack(_MAGIC, flags, count, offsets[-1]),
+             struct.pack(f'<{count + 1}I', *offsets)]
+    if (count + 1) % 2:
+        parts.append(b'\0' * 4)  # keep the float64 table 8-byte aligned
+    if weights:
+        probabilities, aliases = _alias_table(weights)
+        parts.append(struct.pack(f'<{count}d', *probabilities))
+        parts.append(struct.pack(f'<{count}I', *aliases))
+    parts.extend(encoded)
+    return b''.join(parts)
+
+
+def _alias_table(weights: List[float]):
+    # Vose's method: every column i is split between i itself (probability
+    # probabilities[i]) and one other value, aliases[i].
+    count = len(weights)
+    total = sum(weights)
+    if total <= 0 or any(w < 0 for w in weights):
+        raise ValueError('Pool weights must be non-negative and not all zero')
+    scaled = [w * count / total for w in weights]
+    probabilities = [1.0] * count
+    aliases = list(range(count))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        probabilities[less] = scaled[less]
+        aliases[less] = more
+        scaled[more] -= 1.0 - scaled[less]
+        (small if scaled[more] < 1.0 else large).append(more)
+    return probabilities, aliases
+
+
+class StringPool:
+    """Read-only view of one encoded pool, wherever its buffer lives."""
+
+    def __init__(self, buffer, version: int = 0, segment=None):
+        self.version = version
+        self._segment = segment  # keeps a shared memory mapping alive
+        view = memoryview(buffer)
+        magic, flags, count, blob_size = _HEADER.unpack_from(view)
+        if magic != _MAGIC:
+            raise ValueError('Not a value pool')
+        start = _HEADER.size
+        end = start + 4 * (count + 1)
+        self._offsets = view[start:end].cast('I')
+        start = end + 4 * ((count + 1) % 2)
+        self._probabilities = self._aliases = None
+        if flags & _WEIGHTED:
+            self._probabilities = view[start:start + 8 * count].cast('d')
+            self._aliases = view[start + 8 * count:start + 12 * count].cast('I')
+            start += 12 * count
+        self._blob = view[start:start + blob_size]
+        self._views = [view, self._offsets, self._blob, self._probabilities, self._aliases]
+        self._count = count
+        self.weighted = bool(flags & _WEIGHTED)
+        self.transforms = flags & _TRANSFORMS
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('pool index out of range')
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+    def __iter__(self):
+        return (self[i] for i in range(self._count))
+
+    def choice(self, rng) -> str:
+        """One value drawn from `rng` (weighted pools honour their weights).
+
+        Every draw uses exactly one `rng.random()`, so a seeded stream gives
+        the same values whether they are drawn one at a time or in batches.
+        """
+        u = rng.random() * self._count
+        index = int(u)
+        if self._probabilities is not None and u - index >= self._probabilities[index]:
+            index = self._aliases[index]
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+    def choices(self, rng, k: int) -> List[str]:
+        choice = self.choice
+        return [choice(rng) for _ in range(k)]
+
+    def release(self) -> None:
+        """Drop this view's mapping. Only for pools nobody else is using."""
+        for view in reversed(self._views):
+            if view is not None:
+                view.release()
+        self._views = []
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def __del__(self):
+        # The mapping can only be closed once the views into it are gone.
+        try:
+            self.release()
+        except Exception:
+            pass
+
+
+def _open_segment(name: str, size: int = 0) -> 'SharedMemory':
+    # Imported here: multiprocessing costs ~25ms, paid once a pool is used.
+    from multiprocessing import shared_memory
+    create = size > 0
+    try:
+        return shared_memory.SharedMemory(name, create=create, size=size, track=False)
+    except TypeError:
+        pass
+    # Before Python 3.13 every process that opens a segment registers it
+    # with a resource tracker that unlinks it when that process exits,
+    # pulling pools out from under the other workers. Lifetime is managed
+    # by PoolStore instead.
+    from multiprocessing import resource_tracker
+    segment = shared_memory.SharedMemory(name, create=create, size=size)
+    resource_tracker.unregister(segment._name, 'shared_memory')
+    return segment
+
+
+def _unlink(name: str) -> None:
+    # Opened with default tracking so the register/unregister pair balances.
+    from multiprocessing import shared_memory
+    try:
+        segment = shared_memory.SharedMemory(name)
+    except FileNotFoundError:
+        return
+    try:
+        segment.unlink()
+    finally:
+        segment.close()
+
+
+class PoolStore:
+    """Versioned pools in shared memory, keyed by name.
+
+    Segments are owned by the process that first published each pool name
+    (normally the gunicorn master or the parent of a worker pool), which
+    unlinks them at exit.
+    """
+
+    def __init__(self, namespace: Optional[str] = None):
+        self.namespace = namespace or os.environ.get(NAMESPACE_ENV) or f'sg{os.getpid()}'
+        self._pointers: Dict[str, 'SharedMemory'] = {}
+        self._pools: Dict[str, StringPool] = {}
+        self._local: Dict[str, StringPool] = {}
+        self._owned: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def publish(self, name: str, values: PoolValues) -> int:
+        """Store `values` as the new version of pool `name`; returns that version."""
+        return self.publish_encoded(name, encode_pool(values))
+
+    def publish_encoded(self, name: str, data) -> int:
+        """Like `publish`, for a pool that is already encoded (e.g. from a locale pack)."""
+        with self._lock:
+            try:
+                pointer = self._pointer(name, create=True)
+            except OSError as exc:
+                logger.debug('Shared memory unavailable (%s); keeping pool %r in process', exc, name)
+                previous = self._local.get(name)
+                pool = StringPool(data, previous.version + 1 if previous else 1)
+                self._local[name] = pool
+                return pool.version
+            previous = _VERSION.unpack_from(pointer.buf)[0]
+            version = previous + 1
+            while True:
+                try:
+                    segment = _open_segment(self._segment_name(name, version), len(data))
+                    break
+                except FileExistsError:
+                    version += 1  # another process is publishing this pool too
+            segment.buf[:len(data)] = data
+            pool = StringPool(segment.buf, version, segment)
+            _VERSION.pack_into(pointer.buf, 0, version)
+            self._pools[name] = pool
+            if previous:
+                _unlink(self._segment_name(name, previous))
+            return version
+
+    def get(self, name: str) -> Optional[StringPool]:
+        """The current version of pool `name`, or None if it was never published."""
+        local = self._local.get(name)
+        if local is not None:
+            return local
+        with self._lock:
+            try:
+                pointer = self._pointer(name)
+            except FileNotFoundError:
+                return None
+            for _ in range(3):
+                version = _VERSION.unpack_from(pointer.buf)[0]
+                pool = self._pools.get(name)
+                if pool is not None and pool.version == version:
+                    return pool
+                if not version:
+                    return None
+                try:
+                    segment = _open_segment(self._segment_name(name, version))
+                except FileNotFoundError:
+                    continue  # replaced while we were looking; read the pointer again
+                pool = StringPool(segment.buf, version, segment)
+                self._pools[name] = pool
+                return pool
+            return None
+
+    def close(self) -> None:
+        """Unlink the segments this process owns (when it is the one that made them)."""
+        with self._lock:
+            for name, pid in list(self._owned.items()):
+                if pid != os.getpid():
+                    continue
+                pointer = self._pointers.get(name)
+                if pointer is not None:
+                    _unlink(self._segment_name(name, _VERSION.unpack_from(pointer.buf)[0]))
+                _unlink(self._pointer_name(name))
+                del self._owned[name]
+
+    def _pointer(self, name: str, create: bool = False) -> 'SharedMemory':
+        pointer = self._pointers.get(name)
+        if pointer is not None:
+            return pointer
+        try:
+            pointer = _open_segment(self._pointer_name(name))
+        except FileNotFoundError:
+            if not create:
+                raise
+            try:
+                pointer = _open_segment(self._pointer_name(name), _VERSION.size)
+                self._owned[name] = os.getpid()
+            except FileExistsError:
+                pointer = _open_segment(self._pointer_name(name))
+        self._pointers[name] = pointer
+        return pointer
+
+    def _pointer_name(self, name: str) -> str:
+        return f'{self.namespace}-{name}'
+
+    def _segment_name(self, name: str, version: int) -> str:
+        return f'{self.namespace}-{name}-{version}'
+
+
+store = PoolStore()
+_publish_lock = threading.Lock()
+
+
+def pool_key(name: str, locale: Optional[str] = None) -> str:
+    """Store key of pool `name` for `locale`; the default locale's pools are unprefixed."""
+    from .locale_packs import DEFAULT_LOCALE
+    return name if not locale or locale == DEFAULT_LOCALE else f'{locale}.{name}'
+
+
+def publish_locale(locale: Optional[str] = None) -> None:
+    """Publish the pools of `locale`'s data pack that aren't in the store yet."""
+    from .locale_packs import load_pack
+    pack = load_pack(locale)
+    with _publish_lock:
+        # Processes spawned from here on attach to the same pools.
+        os.environ.setdefault(NAMESPACE_ENV, store.namespace)
+        for name in pack.names:
+            if store.get(pool_key(name, locale)) is None:
+                store.publish_encoded(pool_key(name, locale), pack.data(name))
+
+
+def get_pool(name: str, locale: Optional[str] = None) -> StringPool:
+    """Pool `name` for `locale` from the store, publishing the locale on first use."""
+    key = pool_key(name, locale)
+    pool = store.get(key)
+    if pool is None:
+        publish_locale(locale)
+        pool = store.get(key)
+        if pool is None:
+            raise ValueError(f"No '{name}' data for locale '{locale or 'default'}'")
+    return pool
+
+
+_TOKEN = re.compile(r'\{\{(\w+)\}\}')
+_PUNCTUATION = re.compile(r'[^\w\s-]')
+_SPACES = re.compile(r'[-\s]+')
+_RUNS = re.compile(r'#+|[%$!@?]|[^#%$!@?]+')
+_LETTERS = string.ascii_letters
+# Faker's numerify placeholders: # 0-9, % 1-9, $ 2-9, and ! 0-9 or @ 1-9 half
+# the time (nothing otherwise). The digit is characters[int(u * span)].
+_DIGIT_RULES = {'#': (string.digits, 10, False), '%': (string.digits[1:], 9, False),
+                '$': (string.digits[2:], 8, False), '!': (string.digits, 20, True),
+                '@': (string.digits[1:], 18, True)}
+
+
+@lru_cache(maxsize=1024)
+def _parse(template: str) -> tuple:
+    # Alternating literal text and placeholders: ('', 'first_name', ' ', 'last_name', '')
+    return tuple(_TOKEN.split(template))
+
+
+def slugify(value: str) -> str:
+    """Faker's slug for user names: ASCII-folded, punctuation dropped, spaces as hyphens."""
+    if not value.isascii():
+        value = unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode('ascii')
+    return _SPACES.sub('-', _PUNCTUATION.sub('', value).strip())
+
+
+@lru_cache(maxsize=1024)
+def _random_chars(text: str, transforms: int) -> tuple:
+    """`text` as a str.format() pattern with a slot per numerify/lexify
+    placeholder, and the (characters, span, may be empty) rule for each slot.
+    A run of '#' is one slot, a number below `span` zero-padded to its length."""
+    rules = {}
+    if transforms & NUMERIFY:
+        rules.update(_DIGIT_RULES)
+    if transforms & LEXIFY:
+        rules['?'] = (_LETTERS, 52, False)
+    pattern, slots = [], []
+    for run in _RUNS.findall(text):
+        char = run[0]
+        if char == '#' and '#' in rules:
+            width = min(len(run), 15)  # exact within a float's 53 bits
+            for start in range(0, len(run), width):
+                size = len(run[start:start + width])
+                pattern.append(f'{{:0{size}d}}')
+                slots.append((None, 10 ** size, False))
+        elif char in rules:
+            pattern.append('{}' * len(run))
+            slots.extend([rules[char]] * len(run))
+        else:
+            pattern.append(run.replace('{', '{{').replace('}', '}}'))
+    return ''.join(pattern), tuple(slots)
+
+
+def _fill_random(text: str, transforms: int, rng) -> str:
+    # Faker's numerify/lexify, with one rng.random() per slot.
+    pattern, slots = _random_chars(text, transforms)
+    if not slots:
+        return text
+    random = rng.random
+    values = []
+    for characters, span, optional in slots:
+        u = random()
+        if characters is None:
+            values.append(int(u * span))
+        else:
+            values.append(characters[int(u * span)] if not optional or u < 0.5 else '')
+    return pattern.format(*values)
+
+
+class _Composer:
+    """Fills templates for one batch, resolving each placeholder to a pool once."""
+
+    def __init__(self, rng, locale: Optional[str]):
+        from .locale_packs import load_pack
+        self.rng = rng
+        self.locale = locale
+        self.pack = load_pack(locale)
+        self.pools: Dict[str, tuple] = {}
+
+    def value(self, placeholder: str) -> str:
+        pool, is_template = self.resolve(placeholder)
+        if not is_template:
+            return pool.choice(self.rng)
+        transforms = pool.transforms
+        parts = list(_parse(pool.choice(self.rng)))
+        for i, part in enumerate(parts):
+            if i % 2:
+                parts[i] = self.value(part)
+            elif part and transforms & _RANDOM_CHARS:
+                # Only the template's own text: values filled in have no
+                # placeholder characters, and this keeps _random_chars cached.
+                parts[i] = _fill_random(part, transforms, self.rng)
+        value = ''.join(parts)
+        if transforms & LOWERCASE:
+            value = value.lower()
+        elif transforms & UPPERCASE:
+            value = value.upper()
+        if transforms & SLUGIFY:
+            value = slugify(value)
+        return value
+
+    def resolve(self, placeholder: str) -> tuple:
+        # A placeholder is filled from its template pool ('<name>_format')
+        # when the locale has one, or else straight from its value pool.
+        resolved = self.pools.get(placeholder)
+        if resolved is None:
+            if f'{placeholder}_format' in self.pack:
+                resolved = (get_pool(f'{placeholder}_format', self.locale), True)
+            else:
+                resolved = (get_pool(placeholder, self.locale), False)
+            self.pools[placeholder] = resolved
+        return resolved
+
+
+def compose(placeholder: str, rng, count: int, locale: Optional[str] = None) -> List[str]:
+    """`count` values for a Faker-style `placeholder` (e.g. 'name', 'city') in
+    `locale`, with every template filled in from the matching pools."""
+    composer = _Composer(rng, locale)
+    return [composer.value(placeholder) for _ in range(count)]
@@ -0,0 +1,55 @@
+"""Warm up generators before a server forks its workers.
+
+Under a preforking server (`gunicorn --preload`, see gunicorn.conf.py) the
+app is loaded once in the master and every worker is forked from it.
+Anything built there before the fork - imported generator modules, Faker
+and its provider data, default value pools and lookup tables - is shared
+by all workers copy-on-write instead of being rebuilt in each one on its
+first request.
+
+`warm_up` builds that state by drawing a few values from every registered
+field type, seeded and unseeded, so each lazily built structure is created
+the way requests will use it. It then calls `gc.freeze()`: otherwise the
+first collection in each worker would touch every warmed object's header
+and copy the pages it was meant to share.
+"""
+
+import gc
+import logging
+import random
+import time
+from typing import Iterable, Optional
+
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_ROWS = 16
+
+# Set once every type has been warmed; inherited by forked workers, which
+# then skip warming again.
+_warmed_all = False
+
+
+def warm_up(field_types: Optional[Iterable[str]] = None, freeze: bool = True) -> float:
+    """Prebuild generator state for `field_types` (default: all). Returns seconds taken."""
+    global _warmed_all
+    if field_types is None and _warmed_all:
+        return 0.0
+    started = time.perf_counter()
+    for name in (registry if field_types is None else field_types):
+        generator_class = registry.generator_class(name)
+        try:
+            generator_class({}).generate_batch(SAMPLE_ROWS)
+            generator_class({}, rng=random.Random(0)).generate_batch(SAMPLE_ROWS)
+        except Exception:
+            # A type that needs constraints to generate still gets imported.
+            logger.debug('Warm-up could not sample %r with default constraints', name)
+    if field_types is None:
+        _warmed_all = True
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    elapsed = time.perf_counter() - started
+    logger.info('Warmed up generators in %.2fs', elapsed)
+    return elapsed
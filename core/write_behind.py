@@ -0,0 +1,110 @@
+"""In-process write-behind queue for records that don't need to be durable
+before the response is sent (e.g. generation history).
+
+Records are buffered in memory and handed to a `sink` in batches by a
+background thread every `flush_interval` seconds, sooner once `max_batch`
+records are waiting, and once more at interpreter exit. If the sink fails,
+the batch is kept for the next attempt. At most `max_pending` records are
+kept, and the oldest are dropped past that, so a long database outage can't
+grow memory without bound.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# sink(records) must persist the whole batch, or raise to have it retried.
+SinkFunc = Callable[[List[Any]], None]
+
+
+class WriteBehindQueue:
+    """Batches records for a sink, flushed from a background thread."""
+
+    def __init__(self, sink: SinkFunc, flush_interval: float = 1.0,
+                 max_batch: int = 500, max_pending: int = 10_000):
+        self._sink = sink
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+
+        self._pending: List[Any] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        atexit.register(self.close)
+
+    def put(self, record: Any) -> None:
+        self._ensure_flusher()
+        with self._lock:
+            self._pending.append(record)
+            self._trim()
+            if len(self._pending) >= self.max_batch:
+                self._wake.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> None:
+        """Hand everything queued so far to the sink (no-op when empty)."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                self._sink(batch)
+            except Exception:
+                with self._lock:
+                    self._pending[:0] = batch
+                    self._trim()
+                raise
+
+    def close(self) -> None:
+        """Stop the background flusher and write out anything still queued."""
+        self._stop.set()
+        self._wake.set()
+        if self._pid == os.getpid():
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Dropping %d unflushed records at shutdown', self.pending())
+
+    def _trim(self) -> None:
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            logger.warning('Write-behind queue full; dropped %d oldest records', overflow)
+
+    def _ensure_flusher(self) -> None:
+        # Started lazily (and restarted after fork) because threads don't
+        # survive into preforked gunicorn workers.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            if self._pid is not None:
+                self._pending.clear()
+                self._flush_lock = threading.Lock()
+            self._pid = pid
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Write-behind flush failed; will retry')
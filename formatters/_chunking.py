@@ -0,0 +1,17 @@
+"""Row chunking shared by the formatters' cancellable paths."""
+
+from typing import Any, Dict, Iterator, List
+
+CHUNK_ROWS = 1000
+
+
+def iter_chunks(data: List[Dict[str, Any]], cancel=None, size: int = CHUNK_ROWS) -> Iterator[List[Dict[str, Any]]]:
+    """Yield `data` in slices of `size` rows, checking `cancel` before each one.
+
+    `cancel` is anything with a `raise_if_cancelled()` method, normally a
+    core.cancellation.CancellationToken.
+    """
+    for start in range(0, len(data), size):
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+        yield data[start:start + size]
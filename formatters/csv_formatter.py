@@ -1,25 +1,38 @@
 """CSV output formatter."""
 
 import csv
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, Iterator, List
 from io import StringIO
 
+from ._chunking import iter_chunks
+
 
 class CSVFormatter:
     """Format synthetic data as CSV."""
 
     @staticmethod
-    def format(data: List[Dict[str, Any]]) -> str:
-        """Format data as CSV string."""
+    def format(data: List[Dict[str, Any]], cancel=None) -> str:
+        """Format data as CSV string, checking `cancel` between row chunks."""
         if not data:
             return ""
 
-        output = StringIO()
-        writer = csv.DictWriter(output, fieldnames=data[0].keys())
-        writer.writeheader()
-        writer.writerows(data)
+        return ''.join(CSVFormatter.stream(iter_chunks(data, cancel)))
 
-        return output.getvalue()
+    @staticmethod
+    def stream(batches: Iterable[List[Dict[str, Any]]]) -> Iterator[str]:
+        """Yield the CSV text for each batch of rows as it arrives (header first)."""
+        buffer = StringIO()
+        writer = None
+        for batch in batches:
+            if not batch:
+                continue
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=batch[0].keys())
+                writer.writeheader()
+            writer.writerows(batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
 
     @staticmethod
     def write_to_file(data: List[Dict[str, Any]], filepath: str) -> None:
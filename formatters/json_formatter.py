@@ -1,16 +1,53 @@
 """JSON output formatter."""
 
 import json
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, Iterator, List
+
+from ._chunking import iter_chunks
+
+
+def _json_fragments(batches: Iterable[List[Dict[str, Any]]], indent=None, separators=None,
+                    **kwargs) -> Iterator[str]:
+    """Pieces of json.dumps(rows, ...) for rows that arrive in batches."""
+    item_sep = separators[0] if separators else (',' if indent is not None else ', ')
+    # With an indent, each batch's array ends in "\n]"; only the last newline is kept.
+    tail = '\n' if indent is not None else ''
+    first = True
+    for batch in batches:
+        if not batch:
+            continue
+        body = json.dumps(batch, indent=indent, separators=separators, **kwargs)[1:-1 - len(tail)]
+        yield ('[' if first else item_sep) + body
+        first = False
+    yield '[]' if first else tail + ']'
 
 
 class JSONFormatter:
     """Format synthetic data as JSON."""
 
     @staticmethod
-    def format(data: List[Dict[str, Any]], indent: int = 2) -> str:
-        """Format data as JSON string."""
-        return json.dumps(data, indent=indent, default=str)
+    def format(data: List[Dict[str, Any]], indent: int = 2, cancel=None) -> str:
+        """Format data as JSON string, checking `cancel` between row chunks."""
+        return ''.join(_json_fragments(iter_chunks(data, cancel), indent=indent, default=str))
+
+    @staticmethod
+    def encode(data: List[Dict[str, Any]], cancel=None) -> bytes:
+        """Encode data as compact UTF-8 JSON bytes, ready to send as a response body."""
+        return ''.join(_json_fragments(
+            iter_chunks(data, cancel), ensure_ascii=False, separators=(',', ':'), default=str,
+        )).encode('utf-8')
+
+    @staticmethod
+    def stream(batches: Iterable[List[Dict[str, Any]]], indent: int = 2) -> Iterator[str]:
+        """Yield the `format` output piece by piece as batches of rows arrive."""
+        return _json_fragments(batches, indent=indent, default=str)
+
+    @staticmethod
+    def envelope(meta: Dict[str, Any], encoded: bytes, key: str = 'data') -> bytes:
+        """Splice already-encoded JSON into a `{**meta, key: ...}` object without re-encoding it."""
+        head = json.dumps(meta, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+        prefix = head[:-1] + b',' if meta else b'{'
+        return b''.join((prefix, json.dumps(key).encode('utf-8'), b':', encoded, b'}'))
 
     @staticmethod
     def write_to_file(data: List[Dict[str, Any]], filepath: str, indent: int = 2) -> None:
@@ -1,40 +1,56 @@
 """SQL INSERT statement formatter."""
 
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, Iterator, List
+
+from ._chunking import iter_chunks
 
 
 class SQLFormatter:
     """Format synthetic data as SQL INSERT statements."""
 
     @staticmethod
-    def format(data: List[Dict[str, Any]], table_name: str = "synthetic_data") -> str:
-        """Format data as SQL INSERT statements."""
+    def format(data: List[Dict[str, Any]], table_name: str = "synthetic_data", cancel=None) -> str:
+        """Format data as SQL INSERT statements, checking `cancel` between row chunks."""
         if not data:
             return ""
 
-        output = []
-        columns = list(data[0].keys())
-        columns_str = ', '.join(columns)
-
-        for row in data:
-            values = []
-            for col in columns:
-                value = row[col]
-                if value is None:
-                    values.append('NULL')
-                elif isinstance(value, bool):
-                    values.append('TRUE' if value else 'FALSE')
-                elif isinstance(value, (int, float)):
-                    values.append(str(value))
-                else:
-                    # Escape single quotes in strings
-                    escaped = str(value).replace("'", "''")
-                    values.append(f"'{escaped}'")
-
-            values_str = ', '.join(values)
-            output.append(f"INSERT INTO {table_name} ({columns_str}) VALUES ({values_str});")
-
-        return '\n'.join(output)
+        return ''.join(SQLFormatter.stream(iter_chunks(data, cancel), table_name))
+
+    @staticmethod
+    def stream(batches: Iterable[List[Dict[str, Any]]],
+               table_name: str = "synthetic_data") -> Iterator[str]:
+        """Yield the statements for each batch of rows as it arrives, one per line."""
+        columns = None
+        for batch in batches:
+            if not batch:
+                continue
+            if columns is None:
+                columns = list(batch[0].keys())
+                columns_str = ', '.join(columns)
+                separator = ''
+            else:
+                separator = '\n'
+
+            output = []
+            for row in batch:
+                values = []
+                for col in columns:
+                    value = row[col]
+                    if value is None:
+                        values.append('NULL')
+                    elif isinstance(value, bool):
+                        values.append('TRUE' if value else 'FALSE')
+                    elif isinstance(value, (int, float)):
+                        values.append(str(value))
+                    else:
+                        # Escape single quotes in strings
+                        escaped = str(value).replace("'", "''")
+                        values.append(f"'{escaped}'")
+
+                values_str = ', '.join(values)
+                output.append(f"INSERT INTO {table_name} ({columns_str}) VALUES ({values_str});")
+
+            yield separator + '\n'.join(output)
 
     @staticmethod
     def write_to_file(data: List[Dict[str, Any]], filepath: str, table_name: str = "synthetic_data") -> None:
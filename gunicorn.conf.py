@@ -0,0 +1,24 @@
+"""Gunicorn settings shared by the web app and (optionally) the API.
+
+Picked up automatically when gunicorn runs from the repository root
+(Railway, Docker); elsewhere pass it with `--config`. The app is loaded
+once in the master (`preload_app`) and generators are warmed up there, so
+workers fork with Faker, generator modules and default value tables already
+built and share those pages copy-on-write (see core/warmup.py). Set
+SYNGEN_WARMUP=0 to skip the warm-up, or pass --no-preload to go back to
+loading the app in every worker.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before workers fork.
+    if os.environ.get('SYNGEN_WARMUP', '1') == '1':
+        from core.warmup import warm_up
+        server.log.info('Warmed up generators in %.2fs', warm_up())
@@ -1,6 +1,14 @@
 #!/usr/bin/env python3
 """Quick test script for the synthetic data generator."""
 
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
 from core import SyntheticDataEngine, FieldSchema
 from formatters import CSVFormatter, JSONFormatter, SQLFormatter
 
@@ -49,5 +57,747 @@ def test_basic_generation():
     print("\n✓ All tests passed!")
 
 
+def test_seeded_preview_matches_full_output():
+    """A seeded preview must equal the first rows of the full dataset (web lazy preview)."""
+    fields = [
+        FieldSchema(name=field_type, field_type=field_type)
+        for field_type in SyntheticDataEngine.GENERATOR_MAP
+    ]
+    preview = SyntheticDataEngine(fields, seed=42).generate(100)
+    full = SyntheticDataEngine(fields, seed=42).generate(2500)
+    assert preview == full[:100]
+
+
+def test_registry_plugins_and_lazy_loading():
+    """Every built-in type resolves; entry-point plugins register without importing generators."""
+    from core.registry import BUILTIN_TYPES, FieldTypeRegistry, registry
+
+    import core.generators
+
+    for name in registry:
+        cls = registry.generator_class(name)
+        assert cls.__name__.endswith("Generator")
+        assert getattr(core.generators, cls.__name__) is cls
+        assert registry[name].cost > 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "syngen_plugin_meta.py"), "w") as f:
+            f.write("from core.registry import FieldType\n"
+                    "SKU = FieldType('sku', 'syngen_plugin_impl:SkuGenerator', 'SKU', 'Other', 'Stock unit')\n")
+        with open(os.path.join(tmp, "syngen_plugin_impl.py"), "w") as f:
+            f.write("from core.generators.base import BaseGenerator\n"
+                    "class SkuGenerator(BaseGenerator):\n"
+                    "    def generate(self):\n"
+                    "        return f'SKU-{self.rng.randint(0, 9999):04d}'\n")
+        dist_info = os.path.join(tmp, "syngen_plugin-1.0.dist-info")
+        os.mkdir(dist_info)
+        with open(os.path.join(dist_info, "METADATA"), "w") as f:
+            f.write("Metadata-Version: 2.1\nName: syngen-plugin\nVersion: 1.0\n")
+        with open(os.path.join(dist_info, "entry_points.txt"), "w") as f:
+            f.write("[syngen.field_types]\nsku = syngen_plugin_meta:SKU\n")
+
+        sys.path.insert(0, tmp)
+        try:
+            plugins = FieldTypeRegistry(BUILTIN_TYPES)
+            assert "integer" in plugins and "syngen_plugin_impl" not in sys.modules
+            assert "sku" in plugins and "syngen_plugin_impl" not in sys.modules
+            assert plugins.generator_class("sku")({}).generate().startswith("SKU-")
+        finally:
+            sys.path.remove(tmp)
+
+
+# Cold start of the web app (wsgi.py) on an already-migrated database, in ms.
+COLD_START_BUDGET_MS = float(os.environ.get("COLD_START_BUDGET_MS", "1500"))
+
+_COLD_START_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import wsgi
+elapsed = (time.perf_counter() - started) * 1000
+heavy = [m for m in ('faker', 'requests', 'core.engine', 'cryptography') if m in sys.modules]
+print(json.dumps({'ms': elapsed, 'heavy': heavy}))
+"""
+
+
+def test_web_cold_start_budget():
+    """Serverless cold start: no heavy imports and no schema DDL once migrated."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL="sqlite:///" + os.path.join(tmp, "cold.db"),
+                   SPOOL_DIR=os.path.join(tmp, "spool"), PROGRESS_DIR=os.path.join(tmp, "progress"))
+
+        def start():
+            out = subprocess.run([sys.executable, "-c", _COLD_START_PROBE], cwd=root, env=env,
+                                 capture_output=True, text=True, check=True).stdout
+            return json.loads(out.strip().splitlines()[-1])
+
+        start()  # first start of the deployment applies the schema
+        result = start()
+
+    print(f"web cold start: {result['ms']:.0f} ms (budget {COLD_START_BUDGET_MS:.0f} ms)")
+    assert result["heavy"] == [], f"loaded at cold start: {result['heavy']}"
+    assert result["ms"] < COLD_START_BUDGET_MS
+
+
+def test_cli_import_defers_faker():
+    """Faker is only imported once a Faker-backed field is generated."""
+    probe = (
+        "import sys\n"
+        "import cli.main\n"
+        "from core import SyntheticDataEngine, FieldSchema\n"
+        "SyntheticDataEngine([FieldSchema(name='n', field_type='integer')]).generate(10)\n"
+        "before = 'faker' in sys.modules\n"
+        "SyntheticDataEngine([FieldSchema(name='c', field_type='country')]).generate(10)\n"
+        "print(before, 'faker' in sys.modules)\n"
+    )
+    root = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, "-c", probe], cwd=root,
+                         capture_output=True, text=True, check=True).stdout.split()
+    assert out == ["False", "True"]
+
+
+def test_value_pools_shared_and_swapped():
+    """Another process attaches to published pools; republishing swaps versions atomically."""
+    from core.value_pools import NAMESPACE_ENV, PoolStore
+
+    store = PoolStore(namespace=f"sgtest{os.getpid()}")
+    try:
+        assert store.publish("colors", {"red": 3.0, "blue": 1.0}) == 1
+        old = store.get("colors")
+        assert sorted(old) == ["blue", "red"]
+        assert store.publish("colors", ["green"]) == 2
+        probe = ("from core.value_pools import PoolStore\n"
+                 "pool = PoolStore().get('colors')\n"
+                 "print(pool.version, list(pool))\n")
+        root = os.path.dirname(os.path.abspath(__file__))
+        out = subprocess.run([sys.executable, "-c", probe], cwd=root, capture_output=True, text=True,
+                             env={**os.environ, NAMESPACE_ENV: store.namespace}, check=True).stdout
+        assert out.strip() == "2 ['green']"
+        assert store.get("colors").version == 2 and sorted(old) == ["blue", "red"]
+    finally:
+        store.close()
+    assert PoolStore(namespace=store.namespace).get("colors") is None
+
+
+def test_locale_packs_generate_without_faker():
+    """Every shipped locale pack loads, and locale fields never import Faker."""
+    from core.locale_packs import LOCALES, available_locales, load_pack
+
+    assert set(LOCALES) <= set(available_locales())
+    for locale in LOCALES:
+        assert {"name_format", "last_name"} <= set(load_pack(locale).names)
+    probe = (
+        "import sys\n"
+        "from core import SyntheticDataEngine, FieldSchema\n"
+        "fields = [FieldSchema(name=t, field_type=t, constraints={'locale': 'de_DE'})\n"
+        "          for t in ('name', 'email', 'phone', 'company', 'address', 'city', 'url')]\n"
+        "rows = SyntheticDataEngine(fields, seed=3).generate(50)\n"
+        "assert all(row['phone'].lstrip('+(') and row['name'] for row in rows)\n"
+        "assert all('@' in row['email'] and '://' in row['url'] and ', ' in row['address'] for row in rows)\n"
+        "try:\n"
+        "    SyntheticDataEngine([FieldSchema(name='n', field_type='name', constraints={'locale': 'xx_XX'})]).generate(1)\n"
+        "except ValueError:\n"
+        "    print('faker' in sys.modules)\n"
+    )
+    root = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.run([sys.executable, "-c", probe], cwd=root,
+                         capture_output=True, text=True, check=True).stdout.split()
+    assert out == ["False"]
+
+
+def test_locale_rejected_when_engine_is_built(api_client):
+    """Bad locales, of any type, fail at engine construction and come back from the API as 400."""
+    for locale in (5, ["en_US"], "xx_XX", "../en_US"):
+        field = FieldSchema(name="mail", field_type="email", constraints={"locale": locale})
+        try:
+            SyntheticDataEngine([field])
+        except ValueError as e:
+            assert "Unsupported locale" in str(e)
+        else:
+            raise AssertionError(f"locale {locale!r} should be rejected")
+
+    client = api_client(4601)
+    field = {"name": "mail", "type": "email", "constraints": {"locale": 5}}
+    assert client.post("/generate", json={"rows": 5, "fields": [field]}).status_code == 400
+
+
+def test_string_blocks_independent_of_batching():
+    """Strings honour length and charset, and a seeded column doesn't depend on batch sizes."""
+    import random
+
+    from core.generators.text import StringGenerator
+
+    constraints = {"min_length": 2, "max_length": 6, "charset": "xyz"}
+    values = StringGenerator(constraints, rng=random.Random(7)).generate_batch(3000)
+    assert {len(v) for v in values} == {2, 3, 4, 5, 6}
+    assert set("".join(values)) == set("xyz")
+    split = StringGenerator(constraints, rng=random.Random(7))
+    assert [split.generate() for _ in range(5)] + split.generate_batch(2995) == values
+
+    # Unseeded generators are shared across threads without handing out a value twice.
+    from concurrent.futures import ThreadPoolExecutor
+
+    shared = StringGenerator({"length": 16})
+    with ThreadPoolExecutor(8) as pool:
+        batches = list(pool.map(lambda n: shared.generate_batch(n), [333, 700, 1] * 20))
+    assert [len(batch) for batch in batches] == [333, 700, 1] * 20
+    assert len({value for batch in batches for value in batch}) == 1034 * 20
+
+
+def test_table_generators_fall_back_for_large_domains():
+    """Small domains come from precomputed tables; ranges past TABLE_LIMIT are still generated."""
+    from core.generators.datetime import DateGenerator
+
+    narrow = DateGenerator({"start": "2024-02-27", "end": "2024-03-01", "format": "%d.%m"})
+    assert set(narrow.generate_batch(500)) == {"27.02", "28.02", "29.02", "01.03"}
+    wide = DateGenerator({"start": "1900-01-01", "end": "2099-12-31"})
+    assert wide.table() is None
+    assert all("1900-01-01" <= d <= "2099-12-31" for d in wide.generate_batch(500))
+
+    from core.generators.base import TableGenerator
+    from core.generators.callcenter import CSATScoreGenerator, NPSScoreGenerator
+
+    class TableOnly(TableGenerator):
+        def table(self):
+            return None
+
+    try:
+        TableOnly()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("generate_value must be implemented")
+    for cls, domain in ((CSATScoreGenerator, range(1, 6)), (NPSScoreGenerator, range(0, 11))):
+        generator = cls()
+        assert set(generator.table()[0]) == set(domain)
+        assert {generator.generate_value() for _ in range(500)} == set(domain)
+
+
+def test_uuid_versions():
+    """UUIDs carry the requested version; v7 keys come out in sort order."""
+    import uuid
+
+    fields = [FieldSchema(name="v4", field_type="uuid"),
+              FieldSchema(name="v7", field_type="uuid", constraints={"version": 7})]
+    engine = SyntheticDataEngine(fields)
+    rows = engine.generate(5000) + engine.generate(10)
+    assert {uuid.UUID(row["v4"]).version for row in rows} == {4}
+    assert {uuid.UUID(row["v7"]).version for row in rows} == {7}
+    keys = [row["v7"] for row in rows]
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+
+    # Seeded v7 keys are reproducible and independent of batch sizes.
+    seeded = SyntheticDataEngine(fields, seed=9).generate(2500)
+    assert SyntheticDataEngine(fields, seed=9).generate(100) == seeded[:100]
+    assert SyntheticDataEngine(fields, seed=10).generate(1) != seeded[:1]
+    assert [row["v7"] for row in seeded] == sorted(row["v7"] for row in seeded)
+
+    # Unseeded generators are shared across threads without handing out duplicates.
+    from concurrent.futures import ThreadPoolExecutor
+
+    from core.generators.text import UUIDGenerator
+
+    shared = UUIDGenerator({"version": 7})
+    with ThreadPoolExecutor(8) as pool:
+        batches = list(pool.map(lambda _: shared.generate_batch(500), range(64)))
+    assert len({key for batch in batches for key in batch}) == 64 * 500
+    try:
+        SyntheticDataEngine([FieldSchema(name="u", field_type="uuid", constraints={"version": 1})]).generate(1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("version 1 should be rejected")
+
+
+def test_quota_ledger_flush_and_refund():
+    """Counts are enforced in memory, flushed as deltas, and never persisted below zero."""
+    import sqlite3
+    from datetime import date, timedelta
+
+    from core.quota import QuotaLedger, sync_usage
+
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, requests_today INTEGER,"
+                 " total_requests INTEGER, last_request_date DATE)")
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    conn.execute("INSERT INTO users VALUES (1, 4, 9, ?), (2, 0, 0, NULL)", (yesterday,))
+
+    def sync(day, deltas):
+        with conn:
+            return sync_usage(conn.execute, day, deltas)
+
+    ledger = QuotaLedger(sync, flush_interval=3600)
+    try:
+        assert ledger.try_consume(1, limit=3, amount=2)
+        assert not ledger.try_consume(1, limit=3, amount=2)
+        ledger.refund(1)
+        assert ledger.usage(1) == 1
+        ledger.flush()
+        assert conn.execute("SELECT requests_today, total_requests FROM users WHERE id = 1").fetchone() == (1, 10)
+
+        # A refund for a request counted in an earlier flush must not go negative.
+        assert ledger.try_consume(2, limit=5)
+        ledger.flush()
+        ledger.refund(2, 3)
+        ledger.flush()
+        assert conn.execute("SELECT requests_today, total_requests FROM users WHERE id = 2").fetchone() == (0, 0)
+        assert sync(date.today(), {2: -1}) == {2: 0}
+    finally:
+        ledger.close()
+
+
+@pytest.fixture
+def api_client(tmp_path, monkeypatch):
+    """Factory of FastAPI test clients, each authenticated as a fresh user in a throwaway database.
+
+    Quota and key caches are process-wide, so every test uses its own user id.
+    """
+    import sqlite3
+
+    from fastapi.testclient import TestClient
+
+    from api.app import app
+    from api.auth import _quota_ledger
+
+    db = tmp_path / "api.db"
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db}")
+
+    def make(user_id):
+        with sqlite3.connect(db) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, api_key TEXT, is_active BOOLEAN,"
+                         " is_pro BOOLEAN, requests_today INTEGER, total_requests INTEGER, last_request_date DATE)")
+            conn.execute("INSERT INTO users VALUES (?, ?, 1, 0, 0, 0, NULL)", (user_id, f"key-{user_id}"))
+        client = TestClient(app)
+        client.headers["Authorization"] = f"Bearer key-{user_id}"
+        return client
+
+    yield make
+    # Write pending usage here, before DATABASE_URL is restored.
+    _quota_ledger.flush()
+
+
+def test_api_batch_archive_validated_before_charging(api_client):
+    """A batch is zipped table by table; a table with bad constraints fails it before quota is used."""
+    import io
+    import zipfile
+
+    from api.auth import _quota_ledger
+
+    client = api_client(2901)
+    users = {"name": "users", "rows": 20, "format": "csv", "fields": [{"name": "id", "type": "integer"}]}
+    events = {"name": "events", "rows": 30, "fields": [
+        {"name": "day", "type": "date", "constraints": {"start": "2024-01-01", "end": "2024-02-01"}}]}
+    r = client.post("/generate/batch", json={"tables": [users, events]})
+    assert r.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(r.content))
+    assert sorted(archive.namelist()) == ["events.json", "users.csv"]
+    assert len(json.loads(archive.read("events.json"))) == 30
+    assert _quota_ledger.usage(2901) == 2
+
+    for bad in ({"name": "day", "type": "date", "constraints": {"start": "2024-02-01", "end": "2024-01-01"}},
+                {"name": "who", "type": "name", "constraints": {"locale": "xx_XX"}}):
+        r = client.post("/generate/batch", json={"tables": [users, dict(events, fields=[bad])]})
+        assert r.status_code == 400 and r.json()["detail"].startswith("events: ")
+    assert _quota_ledger.usage(2901) == 2
+
+
+def test_deadline_truncate_and_fail():
+    """An expired deadline truncates to zero rows or fails, as asked."""
+    import time
+
+    from core.cancellation import Deadline, DeadlineExceeded
+
+    engine = SyntheticDataEngine([FieldSchema(name="id", field_type="integer")])
+    expired = Deadline(1)
+    time.sleep(0.01)
+    assert engine.generate(5000, deadline=expired, on_deadline="truncate") == []
+    try:
+        engine.generate(5000, deadline=expired)
+    except DeadlineExceeded as e:
+        assert (e.rows_done, e.total_rows) == (0, 5000)
+    else:
+        raise AssertionError("expired deadline should fail")
+    assert len(engine.generate(5000, deadline=Deadline(60_000), on_deadline="truncate")) == 5000
+
+
+def test_single_flight_coalesces_only_plain_seeded_requests(api_client, monkeypatch):
+    """Identical seeded requests share one generation; deadline/progress ones run alone."""
+    import asyncio
+
+    import api.app
+
+    async def coalesced():
+        calls = []
+        gate = asyncio.Event()
+
+        async def work(cancel):
+            calls.append(cancel)
+            await gate.wait()
+            return b"rows"
+
+        flights = [asyncio.ensure_future(api.app._single_flight.run("same", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(*flights), len(calls)
+
+    assert asyncio.run(coalesced()) == ([b"rows"] * 3, 1)
+
+    shared = []
+    run = api.app._single_flight.run
+    monkeypatch.setattr(api.app._single_flight, "run", lambda key, work: shared.append(key) or run(key, work))
+    client = api_client(3401)
+    body = {"rows": 10, "seed": 5, "fields": [{"name": "id", "type": "integer"}]}
+    for extra in ({}, {"deadline_ms": 60_000}, {"progress_id": "progress-3401"}, {"seed": None}):
+        assert client.post("/generate", json={**body, **extra}).status_code == 200
+    assert len(shared) == 1
+
+
+def _web_client(tmp_path, **settings):
+    """Flask test client logged in as a fresh user, with all app state under `tmp_path`."""
+    web = os.path.join(os.path.dirname(os.path.abspath(__file__)), "web")
+    if web not in sys.path:
+        sys.path.insert(0, web)
+    from app import create_app, db
+    from config import Config
+    from models import User
+
+    class TestConfig(Config):
+        TESTING = True
+        WTF_CSRF_ENABLED = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'web.db'}"
+        SPOOL_DIR = str(tmp_path / "spool")
+        PROGRESS_DIR = str(tmp_path / "progress")
+        ARTIFACT_DIR = str(tmp_path / "artifacts")
+
+    for name, value in settings.items():
+        setattr(TestConfig, name, value)
+    app = create_app(TestConfig)
+    with app.app_context():
+        user = User(username="tester", email="tester@example.com")
+        user.set_password("pw")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user_id)
+        session["_fresh"] = True
+    return client
+
+
+def test_web_download_token_is_single_use(tmp_path):
+    """A previewed dataset downloads once; the token can't be replayed or turned into a job."""
+    client = _web_client(tmp_path)
+    fields = [{"name": "id", "type": "integer"}, {"name": "day", "type": "date"}]
+    r = client.post("/generator/generate", json={"rows": 250, "format": "csv", "fields": fields})
+    assert r.status_code == 200
+    url = r.get_json()["download_url"]
+    r = client.get(url)
+    assert r.status_code == 200 and len(r.get_data(as_text=True).splitlines()) == 251
+    assert client.get(url).status_code == 404
+    assert client.post("/generator/jobs", json={"token": url.rsplit("/", 1)[1]}).status_code == 404
+    assert os.listdir(tmp_path / "spool") == []
+
+
+def test_web_preview_matches_download_for_its_seed(tmp_path):
+    """The preview is the start of the download; a new seed gives a new sample."""
+    client = _web_client(tmp_path)
+    assert b"newSample()" in client.get("/generator/").data
+    fields = [{"name": "who", "type": "name"}, {"name": "score", "type": "csat_score"}]
+
+    def preview(seed):
+        r = client.post("/generator/generate", json={"rows": 300, "seed": seed, "fields": fields})
+        return r.get_json()
+
+    first = preview(7)
+    assert first["seed"] == 7 and first["preview_rows"] == 100
+    download = json.loads(client.get(first["download_url"]).data)
+    assert len(download) == 300 and download[:100] == first["preview"]
+    assert preview(7)["preview"] == first["preview"]
+    assert preview(8)["preview"] != first["preview"]
+
+
+def test_web_jobs_are_bounded_and_expire(tmp_path):
+    """Jobs need JOB_MIN_ROWS, are capped per user and charged, and their files expire."""
+    import time
+    from datetime import datetime, timedelta
+
+    client = _web_client(tmp_path, JOB_MIN_ROWS=100, JOB_MAX_ACTIVE=1, JOB_TIMEOUT=60,
+                         ARTIFACT_TTL=3600)
+    app = client.application
+    from app import db
+    from models import GenerationHistory
+
+    ledger = app.extensions["quota_ledger"]
+    fields = [{"name": "id", "type": "integer"}]
+
+    def token(rows):
+        r = client.post("/generator/generate", json={"rows": rows, "format": "csv", "fields": fields})
+        return r.get_json()["download_url"].rsplit("/", 1)[1]
+
+    def finish(job):
+        for _ in range(100):
+            status = client.get(f"/generator/jobs/{job['job_id']}").get_json()
+            if status["status"] not in ("queued", "running"):
+                return status
+            time.sleep(0.05)
+        return status
+
+    small = token(50)
+    assert client.post("/generator/jobs", json={"token": small}).status_code == 400
+    assert len(client.get(f"/generator/download/{small}").data.splitlines()) == 51
+
+    job = client.post("/generator/jobs", json={"token": token(200)}).get_json()
+    assert ledger.usage(1) == 3
+    status = finish(job)
+    assert status["status"] == "complete"
+    assert len(client.get(status["download_url"]).data.splitlines()) == 201
+
+    # A job whose worker died: the cap holds until its heartbeat is
+    # JOB_TIMEOUT old, long before its artifact would expire.
+    with app.app_context():
+        stuck = GenerationHistory(user_id=1, rows_generated=500, output_format="csv",
+                                  field_config=fields, status="running",
+                                  heartbeat_at=datetime.utcnow() - timedelta(seconds=30))
+        db.session.add(stuck)
+        db.session.commit()
+        stuck_id = stuck.id
+    app.extensions.pop("jobs_expired_at", None)
+    assert client.post("/generator/jobs", json={"token": token(200)}).status_code == 429
+    assert ledger.usage(1) == 4
+
+    with app.app_context():
+        db.session.get(GenerationHistory, stuck_id).heartbeat_at = datetime.utcnow() - timedelta(seconds=90)
+        db.session.commit()
+    app.extensions.pop("jobs_expired_at", None)
+    second = client.post("/generator/jobs", json={"token": token(200)})
+    assert second.status_code == 202
+    assert finish(second.get_json())["status"] == "complete"
+    with app.app_context():
+        assert db.session.get(GenerationHistory, stuck_id).status == "failed"
+        assert db.session.get(GenerationHistory, second.get_json()["job_id"]).heartbeat_at is not None
+
+    with app.app_context():
+        GenerationHistory.query.update({"created_at": datetime.utcnow() - timedelta(hours=2)})
+        db.session.commit()
+        artifact = db.session.get(GenerationHistory, job["job_id"]).artifact_path
+    os.utime(artifact, (time.time() - 7200,) * 2)
+    app.extensions.pop("jobs_expired_at", None)
+    assert client.get("/generator/history").status_code == 200
+    assert not os.path.exists(artifact)
+    assert client.get(status["download_url"]).status_code == 404
+    with app.app_context():
+        assert db.session.get(GenerationHistory, job["job_id"]).status == "complete"
+
+
+def test_web_jobs_can_be_turned_off(tmp_path):
+    """With JOB_MIN_ROWS=0 (always on Vercel) jobs are refused and large downloads stream."""
+    client = _web_client(tmp_path, JOB_MIN_ROWS=0)
+    ledger = client.application.extensions["quota_ledger"]
+    page = client.get("/generator/").get_data(as_text=True)
+    assert "const JOB_MIN_ROWS = 0;" in page
+
+    r = client.post("/generator/generate", json={"rows": 200, "format": "csv",
+                                                  "fields": [{"name": "id", "type": "integer"}]})
+    url = r.get_json()["download_url"]
+    assert client.post("/generator/jobs", json={"token": url.rsplit("/", 1)[1]}).status_code == 400
+    assert ledger.usage(1) == 1
+    assert len(client.get(url).data.splitlines()) == 201
+
+
+def test_api_key_lookups_cached(api_client, tmp_path):
+    """Keys are served from a TTL/LRU cache; a change in the database shows once the entry goes."""
+    import sqlite3
+    import time
+
+    from api.auth import _user_cache
+    from core.ttl_cache import TTLCache
+
+    cache = TTLCache(ttl=0.05, max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+    client = api_client(2601)
+    body = {"rows": 1, "fields": [{"name": "id", "type": "integer"}]}
+    assert client.post("/generate", json=body).status_code == 200
+    with sqlite3.connect(tmp_path / "api.db") as conn:
+        conn.execute("UPDATE users SET api_key = 'rotated' WHERE id = 2601")
+    assert client.post("/generate", json=body).status_code == 200
+    _user_cache.invalidate("key-2601")
+    assert client.post("/generate", json=body).status_code == 401
+
+
+def test_json_envelope_matches_json_dumps(api_client):
+    """Spliced and streamed JSON decode to the same document json.dumps would build."""
+    from datetime import date
+
+    rows = [{"id": i, "name": "Zoë ✓", "day": date(2024, 1, i % 28 + 1), "ok": i % 2 == 0} for i in range(2500)]
+    expected = json.loads(json.dumps(rows, default=str))
+    assert json.loads(JSONFormatter.encode(rows)) == expected
+    assert json.loads(JSONFormatter.envelope({"success": True}, JSONFormatter.encode(rows))) == \
+        {"success": True, "data": expected}
+    assert JSONFormatter.envelope({}, b"[]", key="preview") == b'{"preview":[]}'
+    batches = [rows[:1000], [], rows[1000:]]
+    assert "".join(JSONFormatter.stream(batches)) == JSONFormatter.format(rows)
+    assert "".join(JSONFormatter.stream([])) == "[]"
+
+    client = api_client(2801)
+    body = {"rows": 30, "seed": 1, "fields": [{"name": "id", "type": "integer"}, {"name": "who", "type": "name"}]}
+    full = client.post("/generate", json=body).json()
+    assert (full["success"], full["rows_generated"], full["truncated"]) == (True, 30, False)
+    preview = client.post("/generate/preview", json=body).json()
+    assert preview["rows_generated"] == 10 and preview["data"] == full["data"][:10]
+
+
+def test_admission_queues_then_rejects_with_refund(api_client, monkeypatch):
+    """Work over the budget queues FIFO; past the queue the API answers 503 and gives the quota back."""
+    import asyncio
+
+    import api.app
+    from api.admission import AdmissionController, Overloaded
+    from api.auth import _quota_ledger
+
+    async def scenario():
+        controller = AdmissionController(capacity=10, max_queue=1, queue_timeout=5)
+        first = await controller.acquire(8)
+        waiter = asyncio.ensure_future(controller.acquire(5))
+        await asyncio.sleep(0)
+        try:
+            await controller.acquire(1)
+        except Overloaded as e:
+            rejected = e.retry_after
+        controller.release(first)
+        await waiter
+        return rejected, controller.status()
+
+    retry_after, status = asyncio.run(scenario())
+    assert retry_after >= 1
+    assert (status["running"], status["queued"], status["rejected_total"]) == (1, 0, 1)
+
+    full = AdmissionController(capacity=1, max_queue=0, queue_timeout=1)
+    ticket = asyncio.run(full.acquire(1))
+    monkeypatch.setattr(api.app, "admission", full)
+    client = api_client(3101)
+    body = {"rows": 10, "fields": [{"name": "id", "type": "integer"}]}
+    r = client.post("/generate", json=body)
+    assert r.status_code == 503 and int(r.headers["Retry-After"]) >= 1
+    assert _quota_ledger.usage(3101) == 0
+    full.release(ticket)
+    assert client.post("/generate", json=body).status_code == 200
+    assert _quota_ledger.usage(3101) == 1
+
+
+def _sse_events(text):
+    """(event, data) pairs of a Server-Sent Events body, skipping comments."""
+    events = []
+    for message in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.splitlines() if not line.startswith(":"))
+        if lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_progress_reported_per_batch_and_streamed(api_client, tmp_path):
+    """The engine reports each batch; API and web SSE streams end with the finished totals."""
+    seen = []
+    SyntheticDataEngine([FieldSchema(name="id", field_type="integer")]).generate(2500, progress=seen.append)
+    assert [(p.rows_done, p.total_rows) for p in seen] == [(1000, 2500), (2000, 2500), (2500, 2500)]
+    assert seen[-1].fraction == 1.0
+
+    client = api_client(3201)
+    body = {"rows": 2500, "progress_id": "track-3201", "fields": [{"name": "id", "type": "integer"}]}
+    assert client.post("/generate", json=body).status_code == 200
+    events = _sse_events(client.get("/progress/track-3201").text)
+    assert [name for name, _ in events] == ["done"]
+    assert events[0][1]["rows_done"] == 2500 and events[0][1]["error"] is None
+
+    web = _web_client(tmp_path)
+    r = web.post("/generator/generate", json={"rows": 2500, "fields": body["fields"]})
+    url = r.get_json()["download_url"]
+    assert len(json.loads(web.get(f"{url}?progress_id=track-web-1").data)) == 2500
+    events = _sse_events(web.get("/generator/progress/track-web-1").get_data(as_text=True))
+    assert [name for name, _ in events] == ["done"]
+    assert (events[0][1]["rows_done"], events[0][1]["total_rows"], events[0][1]["error"]) == (2500, 2500, None)
+
+
+def test_history_written_behind_in_batches(tmp_path):
+    """Records reach the sink in batches, survive a failed write, and inline downloads land in history."""
+    import time
+
+    from core.write_behind import WriteBehindQueue
+
+    written, failures = [], [RuntimeError("database is down")]
+
+    def sink(batch):
+        if failures:
+            raise failures.pop()
+        written.append(list(batch))
+
+    queue = WriteBehindQueue(sink, flush_interval=3600, max_pending=5)
+    try:
+        for n in range(3):
+            queue.put(n)
+        try:
+            queue.flush()
+        except RuntimeError:
+            pass
+        assert queue.pending() == 3 and written == []
+        for n in range(3, 7):
+            queue.put(n)  # past max_pending the oldest records are dropped
+        queue.flush()
+        assert written == [[2, 3, 4, 5, 6]]
+    finally:
+        queue.close()
+
+    batched = WriteBehindQueue(sink, flush_interval=3600, max_batch=3)
+    try:
+        for n in range(3):
+            batched.put(n)  # a full batch wakes the background flusher
+        for _ in range(100):
+            if len(written) == 2:
+                break
+            time.sleep(0.01)
+        assert written[1:] == [[0, 1, 2]]
+    finally:
+        batched.close()
+
+    client = _web_client(tmp_path, HISTORY_FLUSH_INTERVAL=3600)
+    fields = [{"name": "id", "type": "integer"}, {"name": "who", "type": "name"}]
+    url = client.post("/generator/generate", json={"rows": 42, "format": "sql", "fields": fields}).get_json()["download_url"]
+    client.get(url).get_data()
+    assert client.application.extensions["history_writer"].pending() == 1
+    page = client.get("/generator/history").get_data(as_text=True)
+    assert ">42<" in page and "SQL" in page
+
+
+def test_web_user_loader_cached_with_live_usage(tmp_path):
+    """Session users come from a TTL cache that still shows live usage; outside changes apply on expiry."""
+    import time
+
+    from sqlalchemy import text
+
+    client = _web_client(tmp_path, USER_CACHE_TTL=1)
+    app = client.application
+    from app import db
+
+    assert "0 / 1000 requests used today" in client.get("/generator/").get_data(as_text=True)
+    client.post("/generator/generate", json={"rows": 5, "fields": [{"name": "id", "type": "integer"}]})
+    assert "1 / 1000 requests used today" in client.get("/generator/").get_data(as_text=True)
+
+    app.extensions["user_cache"].invalidate()
+    client.get("/generator/")
+    with app.app_context():
+        db.session.execute(text("UPDATE users SET is_active = 0"))
+        db.session.commit()
+    assert client.get("/generator/").status_code == 200
+    time.sleep(1.1)
+    assert client.get("/generator/").status_code == 302
+
+
 if __name__ == "__main__":
     test_basic_generation()
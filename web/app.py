@@ -38,6 +38,11 @@ def create_app(config_class=Config):
     csrf.init_app(app)
     limiter.init_app(app)
 
+    from models import init_history_writer, init_quota_ledger, init_user_cache
+    init_quota_ledger(app)
+    init_history_writer(app)
+    init_user_cache(app)
+
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Please log in to access this page.'
     login_manager.login_message_category = 'info'
@@ -53,10 +58,21 @@ def create_app(config_class=Config):
     app.register_blueprint(generator_bp, url_prefix='/generator')
     app.register_blueprint(api_docs_bp, url_prefix='/docs')
 
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create or upgrade the database tables."""
+        from models import ensure_schema
+        ensure_schema(force=True)
+        print('Database schema is up to date.')
+
+    if not app.config['DB_AUTO_MIGRATE']:
+        return app
+
     # Create database tables (skip hard crash if DB is briefly unreachable)
     with app.app_context():
         try:
-            db.create_all()
+            from models import ensure_schema
+            ensure_schema()
         except Exception as exc:
             app.logger.exception('Database init failed: %s', exc)
             if os.environ.get('VERCEL') or os.environ.get('RAILWAY_ENVIRONMENT'):
@@ -64,6 +80,9 @@ def create_app(config_class=Config):
                     'Database init failed. Set a reachable DATABASE_URL '
                     '(Postgres recommended on Vercel/Railway).'
                 ) from exc
+        # Connections opened here must not be shared with workers forked
+        # from this process (gunicorn --preload); they open their own.
+        db.engine.dispose()
 
     return app
 
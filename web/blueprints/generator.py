@@ -1,66 +1,41 @@
-from flask import Blueprint, render_template, request, jsonify, Response
+from flask import (
+    Blueprint, abort, current_app, render_template, request, jsonify, Response,
+    send_file, stream_with_context, url_for,
+)
 from flask_login import login_required, current_user
+from werkzeug.exceptions import NotFound
 import json
-
-from app import db
-from models import GenerationHistory
-
-# Import core modules from parent directory
-from core.engine import SyntheticDataEngine
+import os
+import re
+import secrets
+
+from jobs import active_jobs, expire_jobs, stream_output, submit_job
+from models import GenerationHistory, record_generation
+
+# Import core modules from parent directory. The engine (Faker) and the
+# Kaggle client (requests) are imported by the views that use them instead,
+# so they don't add to every cold start.
+from core.cancellation import Deadline, DeadlineExceeded
+from core.column_cache import ColumnCache
 from core.schema import FieldSchema
-from core.kaggle_client import KaggleClient, KaggleError
-from core.schema_learner import infer_schema
+from core.progress import FileProgressBoard, sse_event
+from core.registry import registry
+from core.spool import Spool
 from formatters.csv_formatter import CSVFormatter
 from formatters.json_formatter import JSONFormatter
 from formatters.sql_formatter import SQLFormatter
 
 generator_bp = Blueprint('generator', __name__)
 
-FIELD_TYPES = [
-    {'value': 'integer', 'label': 'Integer', 'category': 'Numeric'},
-    {'value': 'float', 'label': 'Float', 'category': 'Numeric'},
-    {'value': 'string', 'label': 'String', 'category': 'Text'},
-    {'value': 'name', 'label': 'Full Name', 'category': 'Text'},
-    {'value': 'company', 'label': 'Company Name', 'category': 'Text'},
-    {'value': 'email', 'label': 'Email Address', 'category': 'Contact'},
-    {'value': 'phone', 'label': 'Phone Number', 'category': 'Contact'},
-    {'value': 'url', 'label': 'URL', 'category': 'Contact'},
-    {'value': 'address', 'label': 'Street Address', 'category': 'Location'},
-    {'value': 'city', 'label': 'City', 'category': 'Location'},
-    {'value': 'country', 'label': 'Country', 'category': 'Location'},
-    {'value': 'date', 'label': 'Date', 'category': 'Date/Time'},
-    {'value': 'datetime', 'label': 'DateTime', 'category': 'Date/Time'},
-    {'value': 'boolean', 'label': 'Boolean', 'category': 'Other'},
-    {'value': 'uuid', 'label': 'UUID', 'category': 'Other'},
-    {'value': 'category', 'label': 'Custom Category', 'category': 'Other'},
-
-    # Call center metrics
-    {'value': 'call_duration', 'label': 'Call Duration (sec)', 'category': 'Call Center'},
-    {'value': 'wait_time', 'label': 'Queue Wait Time (sec)', 'category': 'Call Center'},
-    {'value': 'hold_time', 'label': 'Hold Time (sec)', 'category': 'Call Center'},
-    {'value': 'call_type', 'label': 'Call Type', 'category': 'Call Center'},
-    {'value': 'call_channel', 'label': 'Call Channel', 'category': 'Call Center'},
-    {'value': 'call_department', 'label': 'Department/Queue', 'category': 'Call Center'},
-    {'value': 'agent_id', 'label': 'Agent ID', 'category': 'Call Center'},
-    {'value': 'call_priority', 'label': 'Call Priority', 'category': 'Call Center'},
-    {'value': 'call_outcome', 'label': 'Call Outcome', 'category': 'Call Center'},
-    {'value': 'resolution_status', 'label': 'Resolution Status', 'category': 'Call Center'},
-    {'value': 'sentiment', 'label': 'Sentiment', 'category': 'Call Center'},
-    {'value': 'csat_score', 'label': 'CSAT Score', 'category': 'Call Center'},
-    {'value': 'nps_score', 'label': 'NPS Score', 'category': 'Call Center'},
-
-    # Demographics
-    {'value': 'age', 'label': 'Age', 'category': 'Demographics'},
-    {'value': 'gender', 'label': 'Gender', 'category': 'Demographics'},
-    {'value': 'ethnicity', 'label': 'Ethnicity', 'category': 'Demographics'},
-    {'value': 'marital_status', 'label': 'Marital Status', 'category': 'Demographics'},
-    {'value': 'education_level', 'label': 'Education Level', 'category': 'Demographics'},
-    {'value': 'employment_status', 'label': 'Employment Status', 'category': 'Demographics'},
-    {'value': 'income_bracket', 'label': 'Income Bracket', 'category': 'Demographics'},
-    {'value': 'household_size', 'label': 'Household Size', 'category': 'Demographics'},
-    {'value': 'language_preference', 'label': 'Language Preference', 'category': 'Demographics'},
-    {'value': 'generation', 'label': 'Generation', 'category': 'Demographics'},
-]
+_PROGRESS_ID = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+PROGRESS_IDLE_TIMEOUT = 60
+
+# format -> (content type, file extension)
+OUTPUT_FORMATS = {
+    'json': ('application/json', 'json'),
+    'csv': ('text/csv', 'csv'),
+    'sql': ('text/plain', 'sql'),
+}
 
 
 @generator_bp.route('/')
@@ -68,12 +43,80 @@ FIELD_TYPES = [
 def index():
     return render_template(
         'generator/index.html',
-        field_types=FIELD_TYPES,
+        field_types=registry.values(),
         has_kaggle_creds=current_user.has_kaggle_credentials(),
         kaggle_username=current_user.kaggle_username,
+        job_min_rows=current_app.config['JOB_MIN_ROWS'],
     )
 
 
+def _progress_board():
+    board = current_app.extensions.get('progress_board')
+    if board is None:
+        board = current_app.extensions['progress_board'] = FileProgressBoard(
+            current_app.config['PROGRESS_DIR']
+        )
+    return board
+
+
+def _spool():
+    spool = current_app.extensions.get('spool')
+    if spool is None:
+        spool = current_app.extensions['spool'] = Spool(
+            current_app.config['SPOOL_DIR'], ttl=current_app.config['SPOOL_TTL']
+        )
+    return spool
+
+
+def _column_cache():
+    cache = current_app.extensions.get('column_cache')
+    if cache is None:
+        cache = current_app.extensions['column_cache'] = ColumnCache(
+            max_values=current_app.config['COLUMN_CACHE_VALUES']
+        )
+    return cache
+
+
+def _load_recipe(token):
+    """The /generate request stored under `token` for the current user, or 404."""
+    path = _spool().find(current_user.id, token)
+    if path is None:
+        abort(404)
+    with open(path) as f:
+        return json.load(f)
+
+
+def _redeem_recipe(token):
+    """Like `_load_recipe`, but uses the token up.
+
+    Tokens are single-use: the quota was charged once, by /generate.
+    """
+    spool = _spool()
+    path = spool.take(current_user.id, token)
+    if path is None:
+        abort(404)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    finally:
+        spool.discard(path)
+
+
+def _build_schema(fields):
+    return [
+        FieldSchema(
+            name=field['name'],
+            field_type=field['type'],
+            constraints=field.get('constraints', {})
+        )
+        for field in fields
+    ]
+
+
+def _progress_key(progress_id):
+    return f'{current_user.id}-{progress_id}'
+
+
 def _resolve_kaggle_creds(data):
     """Use credentials from the request if given, else fall back to the user's saved ones."""
     username = (data.get('kaggle_username') or '').strip() or current_user.kaggle_username or ''
@@ -84,6 +127,12 @@ def _resolve_kaggle_creds(data):
 @generator_bp.route('/generate', methods=['POST'])
 @login_required
 def generate():
+    """Generate the preview rows of a dataset and a link to download all of it.
+
+    Only the first PREVIEW_ROWS rows are generated here. The full dataset is
+    generated on demand by /download, from the same seed, so the preview
+    matches the start of the file.
+    """
     if not current_user.try_consume_request():
         return jsonify({
             'error': 'Daily limit reached. Your quota resets at midnight UTC.'
@@ -95,8 +144,13 @@ def generate():
 
     rows = data.get('rows', 10)
     output_format = data.get('format', 'json')
+    if output_format not in OUTPUT_FORMATS:
+        output_format = 'json'
     table_name = data.get('table_name', 'synthetic_data')
     fields = data.get('fields', [])
+    seed = data.get('seed')
+    deadline_ms = data.get('deadline_ms')
+    on_deadline = data.get('on_deadline', 'fail')
 
     # Validate
     max_rows = current_user.get_max_rows()
@@ -111,92 +165,220 @@ def generate():
     if len(fields) > 20:
         return jsonify({'error': 'Maximum 20 fields allowed'}), 400
 
+    if seed is None:
+        seed = secrets.randbelow(2 ** 31)
+    elif not isinstance(seed, int) or isinstance(seed, bool):
+        return jsonify({'error': 'seed must be an integer'}), 400
+
+    if deadline_ms is not None and (
+        not isinstance(deadline_ms, int) or isinstance(deadline_ms, bool) or not 1 <= deadline_ms <= 600000
+    ):
+        return jsonify({'error': 'deadline_ms must be an integer between 1 and 600000'}), 400
+
+    if on_deadline not in ('fail', 'truncate'):
+        return jsonify({'error': "on_deadline must be 'fail' or 'truncate'"}), 400
+    deadline = Deadline(deadline_ms) if deadline_ms else None
+
+    from core.engine import SyntheticDataEngine
     try:
-        # Build schema
-        schema = []
-        for field in fields:
-            field_schema = FieldSchema(
-                name=field['name'],
-                field_type=field['type'],
-                constraints=field.get('constraints', {})
-            )
-            schema.append(field_schema)
-
-        # Generate data - use SyntheticDataEngine
-        engine = SyntheticDataEngine(schema)
-        # Generate in batches if needed (original engine limits to 1000 per call)
-        generated_data = []
-        remaining = rows
-        while remaining > 0:
-            batch_size = min(remaining, 1000)
-            generated_data.extend(engine.generate(batch_size))
-            remaining -= batch_size
-
-        # Format output using static methods
+        # With the page's seed kept across edits, only the columns that
+        # changed since the last preview are actually generated.
+        engine = SyntheticDataEngine(_build_schema(fields), seed=seed, column_cache=_column_cache())
+        preview = engine.generate(min(rows, current_app.config['PREVIEW_ROWS']),
+                                  deadline=deadline, on_deadline=on_deadline)
+
+        # Everything /download needs to rebuild the full dataset
+        token, path = _spool().create(current_user.id, '.json')
+        with open(path, 'w') as f:
+            json.dump({'rows': rows, 'format': output_format, 'table_name': table_name,
+                       'fields': fields, 'seed': seed}, f)
+
+        # JSON previews are sent as rows, not as a JSON string inside JSON
         if output_format == 'csv':
-            output = CSVFormatter.format(generated_data)
-            content_type = 'text/csv'
+            encoded_preview = json.dumps(CSVFormatter.format(preview)).encode('utf-8')
         elif output_format == 'sql':
-            output = SQLFormatter.format(generated_data, table_name)
-            content_type = 'text/plain'
+            encoded_preview = json.dumps(SQLFormatter.format(preview, table_name)).encode('utf-8')
         else:
-            output = JSONFormatter.format(generated_data)
-            content_type = 'application/json'
-
-        # Track usage (already consumed atomically at request start)
-
-        # Save to history
-        history = GenerationHistory(
-            user_id=current_user.id,
-            rows_generated=rows,
-            output_format=output_format,
-            field_config=[{'name': f['name'], 'type': f['type']} for f in fields]
-        )
-        db.session.add(history)
-        db.session.commit()
-
-        return jsonify({
+            encoded_preview = JSONFormatter.encode(preview)
+        content_type, _ = OUTPUT_FORMATS[output_format]
+        meta = {
             'success': True,
-            'data': output,
             'content_type': content_type,
             'rows': rows,
-            'format': output_format
-        })
+            'preview_rows': len(preview),
+            'truncated': len(preview) < min(rows, current_app.config['PREVIEW_ROWS']),
+            'format': output_format,
+            'seed': seed,
+            'download_url': url_for('generator.download', token=token),
+        }
+        return Response(JSONFormatter.envelope(meta, encoded_preview, key='preview'),
+                         mimetype='application/json')
+
+    except DeadlineExceeded as e:
+        return jsonify({'error': str(e)}), 504
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@generator_bp.route('/download', methods=['POST'])
+@generator_bp.route('/progress/<progress_id>')
 @login_required
-def download():
-    data = request.get_json()
-    content = data.get('content', '')
-    output_format = data.get('format', 'json')
-    filename = data.get('filename', 'synthetic_data')
+def progress(progress_id):
+    """Server-Sent Events stream of a running /download's progress.
 
-    extensions = {'csv': 'csv', 'json': 'json', 'sql': 'sql'}
-    content_types = {
-        'csv': 'text/csv',
-        'json': 'application/json',
-        'sql': 'text/plain'
+    The page opens this before starting a download with the same
+    progress_id. Note that with sync gunicorn workers the stream occupies a
+    worker for its duration, so the page only uses it for large runs.
+    """
+    if not _PROGRESS_ID.match(progress_id):
+        return jsonify({'error': 'Invalid progress id'}), 400
+
+    board = _progress_board()
+    key = _progress_key(progress_id)
+
+    def events():
+        version = 0
+        idle = 0
+        while idle < PROGRESS_IDLE_TIMEOUT:
+            entry = board.wait(key, version, timeout=15)
+            if entry and entry['version'] > version:
+                version = entry.pop('version')
+                idle = 0
+                yield sse_event('done' if entry['done'] else 'progress', entry)
+                if entry['done']:
+                    return
+            else:
+                idle += 15
+                yield ': keepalive\n\n'
+        yield sse_event('timeout', {'progress_id': progress_id})
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@generator_bp.route('/download/<token>')
+@login_required
+def download(token):
+    """Generate and stream the full dataset previewed by /generate.
+
+    A token downloads once and expires after SPOOL_TTL seconds. Pass
+    `?progress_id=` to follow the generation at /progress/<progress_id>. If
+    the client goes away mid-download, generation stops with the stream.
+    """
+    recipe = _redeem_recipe(token)
+    progress_id = request.args.get('progress_id', '')
+    progress_key = _progress_key(progress_id) if _PROGRESS_ID.match(progress_id) else None
+    output_format = recipe['format']
+    table_name = recipe['table_name']
+    rows = recipe['rows']
+
+    from core.engine import SyntheticDataEngine
+    engine = SyntheticDataEngine(_build_schema(recipe['fields']), seed=recipe['seed'])
+
+    def stream():
+        board = _progress_board()
+        progress = None
+        if progress_key:
+            board.start(progress_key, rows)
+            progress = board.callback(progress_key)
+        batches = engine.iter_batches(rows, progress=progress)
+        finished = False
+        try:
+            yield from stream_output(batches, output_format, table_name)
+            finished = True
+        finally:
+            if progress_key:
+                board.finish(progress_key, error=None if finished else 'Download interrupted')
+
+        record_generation(current_user.id, rows, output_format, recipe['fields'])
+
+    content_type, ext = OUTPUT_FORMATS[output_format]
+    return Response(stream_with_context(stream()), mimetype=content_type, headers={
+        'Content-Disposition': f'attachment; filename=synthetic_data.{ext}',
+        'Cache-Control': 'no-store',
+    })
+
+
+def _job_status(job):
+    status = {
+        'job_id': job.id,
+        'status': job.status,
+        'rows': job.rows_generated,
+        'format': job.output_format,
+        'duration_seconds': job.duration_seconds,
+        'error': job.error,
     }
+    if job.is_downloadable:
+        status['download_url'] = url_for('generator.history_download', job_id=job.id)
+    return status
 
-    ext = extensions.get(output_format, 'txt')
-    content_type = content_types.get(output_format, 'text/plain')
 
-    return Response(
-        content,
-        mimetype=content_type,
-        headers={
-            'Content-Disposition': f'attachment; filename={filename}.{ext}'
-        }
-    )
+@generator_bp.route('/jobs', methods=['POST'])
+@login_required
+def create_job():
+    """Generate a previewed dataset in the background instead of streaming it.
+
+    The finished file is listed, and downloadable, on the history page. A
+    job is charged as one more request, and a user can only have
+    JOB_MAX_ACTIVE of them queued or running.
+    """
+    app = current_app._get_current_object()
+    token = (request.get_json() or {}).get('token', '')
+    if not app.config['JOB_MIN_ROWS']:
+        return jsonify({'error': 'Background jobs are turned off. Download the dataset directly.'}), 400
+    recipe = _load_recipe(token)
+    if recipe['rows'] < app.config['JOB_MIN_ROWS']:
+        return jsonify({
+            'error': f"Background jobs are for {app.config['JOB_MIN_ROWS']:,} rows or more. "
+                     'Download smaller datasets directly.'
+        }), 400
+
+    expire_jobs(app)
+    if active_jobs(current_user.id) >= app.config['JOB_MAX_ACTIVE']:
+        return jsonify({
+            'error': 'You already have the maximum number of jobs in progress. '
+                     'Wait for one to finish and try again.'
+        }), 429
+
+    if not current_user.try_consume_request():
+        return jsonify({
+            'error': 'Daily limit reached. Your quota resets at midnight UTC.'
+        }), 429
+    try:
+        recipe = _redeem_recipe(token)
+    except NotFound:
+        current_user.refund_request()
+        raise
+    job = submit_job(app, current_user.id, recipe)
+    return jsonify({**_job_status(job), 'status_url': url_for('generator.job_status', job_id=job.id)}), 202
+
+
+@generator_bp.route('/jobs/<int:job_id>')
+@login_required
+def job_status(job_id):
+    job = current_user.generation_history.filter_by(id=job_id).first_or_404()
+    return jsonify(_job_status(job))
+
+
+@generator_bp.route('/history/<int:job_id>/download')
+@login_required
+def history_download(job_id):
+    job = current_user.generation_history.filter_by(id=job_id).first_or_404()
+    if not job.is_downloadable or not os.path.exists(job.artifact_path):
+        abort(404)
+    content_type, ext = OUTPUT_FORMATS.get(job.output_format, OUTPUT_FORMATS['json'])
+    return send_file(job.artifact_path, mimetype=content_type, as_attachment=True,
+                     download_name=f'synthetic_data_{job.id}.{ext}')
 
 
 @generator_bp.route('/kaggle/search', methods=['POST'])
 @login_required
 def kaggle_search():
+    from core.kaggle_client import KaggleClient, KaggleError
+
     data = request.get_json() or {}
     username, key = _resolve_kaggle_creds(data)
     query = (data.get('query') or '').strip()
@@ -231,6 +413,9 @@ def kaggle_learn():
     Only the inferred schema (types + distributions) is returned - the real
     dataset rows and the submitted credentials are never persisted.
     """
+    from core.kaggle_client import KaggleClient, KaggleError
+    from core.schema_learner import infer_schema
+
     data = request.get_json() or {}
     username, key = _resolve_kaggle_creds(data)
     dataset_ref = (data.get('dataset_ref') or '').strip()
@@ -262,6 +447,16 @@ def kaggle_learn():
 @generator_bp.route('/history')
 @login_required
 def history():
+    # Entries queued by this worker appear at once; other workers' within
+    # HISTORY_FLUSH_INTERVAL.
+    try:
+        current_app.extensions['history_writer'].flush()
+    except Exception:
+        current_app.logger.exception('History flush failed')
+    try:
+        expire_jobs(current_app._get_current_object())
+    except Exception:
+        current_app.logger.exception('Job expiry failed')
     page = request.args.get('page', 1, type=int)
     history = current_user.generation_history.order_by(
         GenerationHistory.created_at.desc()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -47,6 +48,9 @@ class Config:
     APP_ENCRYPTION_KEY = os.environ.get('APP_ENCRYPTION_KEY')
     SQLALCHEMY_DATABASE_URI = _database_url()
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Apply the model schema at startup. Once a schema version is recorded
+    # this is a single lookup; set to 0 to only migrate via `flask init-db`.
+    DB_AUTO_MIGRATE = os.environ.get('DB_AUTO_MIGRATE', '1') == '1'
 
     # Session settings
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
@@ -64,6 +68,51 @@ class Config:
     FREE_TIER_LIMIT = 1000
     PRO_TIER_LIMIT = 1000  # Same as free - no premium tiers
 
+    # Write-behind quota counters (see core/quota.py): seconds between flushes
+    # and how many unflushed requests a worker may count per user.
+    QUOTA_FLUSH_INTERVAL = float(os.environ.get('QUOTA_FLUSH_INTERVAL', '2'))
+    QUOTA_SAFETY_MARGIN = int(os.environ.get('QUOTA_SAFETY_MARGIN', '10'))
+
+    # Logged-in users are loaded from a per-process cache; changes made in
+    # another worker are seen within USER_CACHE_TTL seconds (0 disables).
+    USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', '30'))
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', '1024'))
+
+    # Generation history is written behind in bulk; a new entry shows up on
+    # the history page within this many seconds (at once on the same worker).
+    HISTORY_FLUSH_INTERVAL = float(os.environ.get('HISTORY_FLUSH_INTERVAL', '1'))
+
+    # Shared by all gunicorn workers so a progress stream can be served by
+    # a different worker than the one generating.
+    PROGRESS_DIR = os.environ.get('PROGRESS_DIR') or os.path.join(tempfile.gettempdir(), 'syngen-progress')
+
+    # Generated files wait here for download (see core/spool.py); like
+    # PROGRESS_DIR it must be shared by every worker. TTL is in seconds.
+    SPOOL_DIR = os.environ.get('SPOOL_DIR') or os.path.join(tempfile.gettempdir(), 'syngen-spool')
+    SPOOL_TTL = int(os.environ.get('SPOOL_TTL', '900'))
+    # Rows of each result sent back to the page for the preview pane
+    PREVIEW_ROWS = 100
+    # Background generation jobs: datasets of at least JOB_MIN_ROWS rows are
+    # generated by a per-worker thread pool into ARTIFACT_DIR and downloaded
+    # later from the history page. 0 turns jobs off, and every download is
+    # streamed. Always off on Vercel: a function is frozen once it has
+    # responded, and its /tmp isn't shared with the instance serving the
+    # download.
+    JOB_MIN_ROWS = 0 if os.environ.get('VERCEL') else int(os.environ.get('JOB_MIN_ROWS', '50000'))
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+    # Jobs a user may have queued or running at once
+    JOB_MAX_ACTIVE = int(os.environ.get('JOB_MAX_ACTIVE', '2'))
+    # A queued or running job whose worker hasn't checked in for this many
+    # seconds (it was restarted or killed) is marked failed.
+    JOB_TIMEOUT = int(os.environ.get('JOB_TIMEOUT', '300'))
+    ARTIFACT_DIR = os.environ.get('ARTIFACT_DIR') or os.path.join(basedir, 'artifacts')
+    # Finished job files are deleted this many seconds after the job was queued
+    ARTIFACT_TTL = int(os.environ.get('ARTIFACT_TTL', '86400'))
+
+    # Per-worker cache of seeded preview columns (total values kept), so an
+    # edit to one field only regenerates that column.
+    COLUMN_CACHE_VALUES = int(os.environ.get('COLUMN_CACHE_VALUES', '200000'))
+
     # Max rows per request
     MAX_ROWS_FREE = 100000
     MAX_ROWS_PRO = 100000  # Same as free - no premium tiers
@@ -7,12 +7,11 @@ doesn't also expose stored third-party credentials.
 """
 
 import base64
+import functools
 import hashlib
 import os
 import sys
 
-from cryptography.fernet import Fernet, InvalidToken
-
 _IS_PRODUCTION = os.environ.get('FLASK_ENV') == 'production' or os.environ.get('PRODUCTION') == '1'
 
 
@@ -32,17 +31,23 @@ def _load_key() -> bytes:
     return base64.urlsafe_b64encode(digest)
 
 
-_fernet = Fernet(_load_key())
+@functools.lru_cache(maxsize=None)
+def _fernet():
+    # Built on first use: cryptography is only needed once a secret is saved or read.
+    from cryptography.fernet import Fernet
+    return Fernet(_load_key())
 
 
 def encrypt_secret(plaintext: str) -> str:
     """Encrypt a secret for storage; returns a string safe to put in a DB column."""
-    return _fernet.encrypt(plaintext.encode()).decode()
+    return _fernet().encrypt(plaintext.encode()).decode()
 
 
 def decrypt_secret(ciphertext: str) -> str:
     """Decrypt a value previously produced by encrypt_secret."""
+    from cryptography.fernet import InvalidToken
+
     try:
-        return _fernet.decrypt(ciphertext.encode()).decode()
+        return _fernet().decrypt(ciphertext.encode()).decode()
     except InvalidToken as exc:
         raise ValueError("Stored secret could not be decrypted - APP_ENCRYPTION_KEY may have changed") from exc
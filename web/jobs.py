@@ -0,0 +1,177 @@
+"""Background generation jobs for the web app.
+
+Large datasets are generated by a small thread pool inside each web worker
+instead of on the request path, so a sync gunicorn worker is only busy for
+as long as it takes to queue the job. Each job is a GenerationHistory row
+(queued -> running -> complete | failed) whose finished file is kept in
+ARTIFACT_DIR and downloaded from the history page until it is ARTIFACT_TTL
+seconds old.
+
+Jobs run in the worker that accepted them, which keeps the heartbeat of
+every job it holds current while it runs them. One whose heartbeat is more
+than JOB_TIMEOUT seconds old lost its worker to a restart, and is marked
+failed so it stops counting against the user's JOB_MAX_ACTIVE.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app import db
+from models import GenerationHistory
+
+from formatters.csv_formatter import CSVFormatter
+from formatters.json_formatter import JSONFormatter
+from formatters.sql_formatter import SQLFormatter
+
+_pool_lock = threading.Lock()
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+# Seconds between heartbeats from a running job; well under JOB_TIMEOUT
+HEARTBEAT_INTERVAL = 15
+
+
+def stream_output(batches, output_format, table_name):
+    """Formatted output text, piece by piece, for batches of generated rows."""
+    if output_format == 'csv':
+        return CSVFormatter.stream(batches)
+    if output_format == 'sql':
+        return SQLFormatter.stream(batches, table_name)
+    return JSONFormatter.stream(batches)
+
+
+def _executor(app):
+    """This process's job pool, and the ids of the jobs it holds."""
+    # Created lazily, per process: threads don't survive a gunicorn fork.
+    pid, pool, held = app.extensions.get('job_pool', (None, None, None))
+    if pid != os.getpid():
+        with _pool_lock:
+            pid, pool, held = app.extensions.get('job_pool', (None, None, None))
+            if pid != os.getpid():
+                pool = ThreadPoolExecutor(max_workers=app.config['JOB_WORKERS'],
+                                          thread_name_prefix='syngen-job')
+                held = set()
+                app.extensions['job_pool'] = (os.getpid(), pool, held)
+    return pool, held
+
+
+def _heartbeat(held):
+    """Mark every job this process holds, queued ones included, as alive.
+
+    Jobs only wait in the queue while the pool is busy running others, so
+    the running jobs' heartbeats cover the queued ones too.
+    """
+    ids = list(held)
+    if ids:
+        GenerationHistory.query.filter(GenerationHistory.id.in_(ids)).update(
+            {'heartbeat_at': datetime.utcnow()}, synchronize_session=False)
+        db.session.commit()
+
+
+def active_jobs(user_id):
+    """Number of `user_id`'s jobs still queued or running."""
+    return GenerationHistory.query.filter(
+        GenerationHistory.user_id == user_id,
+        GenerationHistory.status.in_(ACTIVE_STATUSES),
+    ).count()
+
+
+def expire_jobs(app):
+    """Delete job files older than ARTIFACT_TTL and fail jobs whose worker is gone.
+
+    Runs at most once a minute per process.
+    """
+    if time.monotonic() - app.extensions.get('jobs_expired_at', -60.0) < 60:
+        return
+    app.extensions['jobs_expired_at'] = time.monotonic()
+
+    ttl = app.config['ARTIFACT_TTL']
+    cutoff = time.time() - ttl
+    try:
+        entries = list(os.scandir(app.config['ARTIFACT_DIR']))
+    except OSError:
+        entries = []
+    for entry in entries:
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+        except OSError:
+            pass
+
+    expired = GenerationHistory.created_at < datetime.utcnow() - timedelta(seconds=ttl)
+    GenerationHistory.query.filter(expired, GenerationHistory.artifact_path.isnot(None)).update(
+        {'artifact_path': None}, synchronize_session=False)
+
+    last_seen = db.func.coalesce(GenerationHistory.heartbeat_at, GenerationHistory.created_at)
+    stale = last_seen < datetime.utcnow() - timedelta(seconds=app.config['JOB_TIMEOUT'])
+    GenerationHistory.query.filter(stale, GenerationHistory.status.in_(ACTIVE_STATUSES)).update(
+        {'status': 'failed', 'error': 'Interrupted: the worker running it restarted'},
+        synchronize_session=False)
+    db.session.commit()
+
+
+def submit_job(app, user_id, recipe):
+    """Record a queued job for `recipe` (as stored by /generate) and start it."""
+    job = GenerationHistory(
+        user_id=user_id,
+        rows_generated=recipe['rows'],
+        output_format=recipe['format'],
+        field_config=[{'name': f['name'], 'type': f['type']} for f in recipe['fields']],
+        status='queued',
+        heartbeat_at=datetime.utcnow(),
+    )
+    db.session.add(job)
+    db.session.commit()
+    pool, held = _executor(app)
+    held.add(job.id)
+    pool.submit(_run_job, app, job.id, recipe, held)
+    return job
+
+
+def _run_job(app, job_id, recipe, held):
+    with app.app_context():
+        try:
+            _generate(app, job_id, recipe, held)
+        finally:
+            held.discard(job_id)
+
+
+def _generate(app, job_id, recipe, held):
+    job = db.session.get(GenerationHistory, job_id)
+    job.status = 'running'
+    job.heartbeat_at = datetime.utcnow()
+    db.session.commit()
+
+    directory = app.config['ARTIFACT_DIR']
+    path = os.path.join(directory, f'{job.user_id}-{job.id}.{recipe["format"]}')
+    partial = path + '.part'
+    started = time.perf_counter()
+    try:
+        from core.engine import SyntheticDataEngine
+
+        os.makedirs(directory, exist_ok=True)
+        engine = SyntheticDataEngine.from_config(recipe)
+        beat_at = time.monotonic()
+        with open(partial, 'w', encoding='utf-8', newline='') as f:
+            for chunk in stream_output(engine.iter_batches(recipe['rows']),
+                                       recipe['format'], recipe['table_name']):
+                f.write(chunk)
+                if time.monotonic() - beat_at >= HEARTBEAT_INTERVAL:
+                    _heartbeat(held)
+                    beat_at = time.monotonic()
+        os.replace(partial, path)
+    except Exception as exc:
+        app.logger.exception('Generation job %s failed', job_id)
+        db.session.rollback()
+        if os.path.exists(partial):
+            os.unlink(partial)
+        job.status = 'failed'
+        job.error = str(exc)
+    else:
+        job.status = 'complete'
+        job.artifact_path = path
+    job.duration_seconds = round(time.perf_counter() - started, 3)
+    db.session.commit()
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -31,6 +31,7 @@ class User(UserMixin, db.Model):
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
+        forget_cached_user(self)
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -38,6 +39,7 @@ class User(UserMixin, db.Model):
     def generate_api_key(self):
         import secrets
         self.api_key = secrets.token_hex(32)
+        forget_cached_user(self)
         return self.api_key
 
     def get_daily_limit(self):
@@ -49,40 +51,33 @@ class User(UserMixin, db.Model):
         return Config.MAX_ROWS_PRO if self.is_pro else Config.MAX_ROWS_FREE
 
     def try_consume_request(self):
-        """Atomically check quota and increment usage. Returns True if allowed."""
-        from datetime import date
-        from sqlalchemy import update, case, and_, or_
+        """Check quota and count one request. Returns True if allowed.
 
-        today = date.today()
-        limit = self.get_daily_limit()
-
-        stmt = (
-            update(User)
-            .where(
-                User.id == self.id,
-                or_(
-                    User.last_request_date.is_(None),
-                    User.last_request_date != today,
-                    and_(User.last_request_date == today, User.requests_today < limit),
-                ),
-            )
-            .values(
-                requests_today=case(
-                    (or_(User.last_request_date.is_(None), User.last_request_date != today), 1),
-                    else_=User.requests_today + 1,
-                ),
-                last_request_date=today,
-                total_requests=User.total_requests + 1,
-            )
-        )
-        result = db.session.execute(stmt)
-        if result.rowcount == 0:
-            db.session.rollback()
+        Counting happens in the app's write-behind QuotaLedger; the users
+        row is updated in aggregated batches by its background flusher.
+        """
+        from flask import current_app
+        from sqlalchemy.orm.attributes import set_committed_value
+
+        ledger = current_app.extensions['quota_ledger']
+        if not ledger.try_consume(self.id, self.get_daily_limit()):
             return False
-        db.session.commit()
-        db.session.refresh(self)
+
+        # Reflect live usage on this instance without marking it dirty, so a
+        # later commit on the session never overwrites the flushed counter.
+        set_committed_value(self, 'requests_today', ledger.usage(self.id))
+        set_committed_value(self, 'last_request_date', date.today())
         return True
 
+    def refund_request(self):
+        """Give back a request counted by try_consume_request that was never served."""
+        from flask import current_app
+        from sqlalchemy.orm.attributes import set_committed_value
+
+        ledger = current_app.extensions['quota_ledger']
+        ledger.refund(self.id)
+        set_committed_value(self, 'requests_today', ledger.usage(self.id))
+
     def can_make_request(self):
         from datetime import date
         today = date.today()
@@ -99,11 +94,13 @@ class User(UserMixin, db.Model):
             self.last_request_date = today
         self.requests_today += 1
         self.total_requests += 1
+        forget_cached_user(self)
 
     def set_kaggle_credentials(self, username, key):
         from crypto_utils import encrypt_secret
         self.kaggle_username = username
         self.kaggle_key_encrypted = encrypt_secret(key)
+        forget_cached_user(self)
 
     def get_kaggle_key(self):
         if not self.kaggle_key_encrypted:
@@ -117,6 +114,7 @@ class User(UserMixin, db.Model):
     def clear_kaggle_credentials(self):
         self.kaggle_username = None
         self.kaggle_key_encrypted = None
+        forget_cached_user(self)
 
     def __repr__(self):
         return f'<User {self.username}>'
@@ -132,10 +130,195 @@ class GenerationHistory(db.Model):
     output_format = db.Column(db.String(10), nullable=False)
     field_config = db.Column(db.JSON, nullable=False)
 
+    # Background jobs (see jobs.py): queued -> running -> complete | failed.
+    # Inline generations are recorded as complete, without an artifact.
+    status = db.Column(db.String(16), nullable=False, default='complete', server_default='complete')
+    duration_seconds = db.Column(db.Float)
+    artifact_path = db.Column(db.String(512))
+    error = db.Column(db.Text)
+    # Kept current by the worker while a job is queued or running
+    heartbeat_at = db.Column(db.DateTime)
+
+    @property
+    def is_downloadable(self):
+        return self.status == 'complete' and bool(self.artifact_path)
+
     def __repr__(self):
         return f'<GenerationHistory {self.id} - {self.rows_generated} rows>'
 
 
+class SchemaVersion(db.Model):
+    """Fingerprints of model schemas already applied to this database (see ensure_schema)."""
+    __tablename__ = 'schema_version'
+
+    fingerprint = db.Column(db.String(64), primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+def record_generation(user_id, rows_generated, output_format, fields):
+    """Queue a completed inline generation for the history table.
+
+    Written in bulk by the app's write-behind queue (HISTORY_FLUSH_INTERVAL)
+    instead of with an extra commit on the request path.
+    """
+    from flask import current_app
+
+    current_app.extensions['history_writer'].put({
+        'user_id': user_id,
+        'created_at': datetime.utcnow(),
+        'rows_generated': rows_generated,
+        'output_format': output_format,
+        'field_config': [{'name': f['name'], 'type': f['type']} for f in fields],
+    })
+
+
+def write_history(app, records):
+    """Write-behind sink: insert queued history records in one statement."""
+    from sqlalchemy import insert
+
+    with app.app_context():
+        db.session.execute(insert(GenerationHistory), records)
+        db.session.commit()
+
+
+def init_history_writer(app):
+    from functools import partial
+    from core.write_behind import WriteBehindQueue
+
+    app.extensions['history_writer'] = WriteBehindQueue(
+        partial(write_history, app),
+        flush_interval=app.config['HISTORY_FLUSH_INTERVAL'],
+    )
+
+
+def upgrade_schema():
+    """Add columns introduced after a table was first created.
+
+    db.create_all() only creates missing tables, so existing deployments
+    would lack newer columns. Only additive changes are handled: new
+    columns must be nullable or have a server_default.
+    """
+    from sqlalchemy import inspect
+    from sqlalchemy.schema import CreateColumn
+
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = CreateColumn(column).compile(dialect=db.engine.dialect)
+                    conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {ddl}')
+
+
+def schema_fingerprint():
+    """Hash of the DDL for every model table, as compiled for this database."""
+    import hashlib
+    from sqlalchemy.schema import CreateTable
+
+    dialect = db.engine.dialect
+    ddl = ';'.join(str(CreateTable(table).compile(dialect=dialect)).strip()
+                   for table in db.metadata.sorted_tables)
+    return hashlib.sha256(ddl.encode()).hexdigest()
+
+
+def ensure_schema(force=False):
+    """Create missing tables and columns, once per schema version.
+
+    When the current fingerprint is already recorded this costs a single
+    primary-key lookup instead of create_all's per-table inspection, so
+    cold starts after the first one of a deployment skip the DDL entirely.
+    Returns True if the schema was (re)applied.
+    """
+    from sqlalchemy.exc import SQLAlchemyError
+
+    fingerprint = schema_fingerprint()
+    if not force:
+        try:
+            if db.session.get(SchemaVersion, fingerprint) is not None:
+                return False
+        except SQLAlchemyError:
+            # First run: the schema_version table doesn't exist yet.
+            db.session.rollback()
+
+    db.create_all()
+    upgrade_schema()
+    db.session.merge(SchemaVersion(fingerprint=fingerprint))
+    db.session.commit()
+    return True
+
+
+def sync_usage_counters(app, day, deltas):
+    """QuotaLedger sync: apply aggregated request deltas for `day` in one transaction."""
+    from sqlalchemy import text
+    from core.quota import sync_usage
+
+    with app.app_context():
+        counts = sync_usage(lambda sql, params: db.session.execute(text(sql), params),
+                            day, deltas)
+        db.session.commit()
+        return counts
+
+
+def init_quota_ledger(app):
+    from functools import partial
+    from core.quota import QuotaLedger
+
+    app.extensions['quota_ledger'] = QuotaLedger(
+        partial(sync_usage_counters, app),
+        flush_interval=app.config['QUOTA_FLUSH_INTERVAL'],
+        safety_margin=app.config['QUOTA_SAFETY_MARGIN'],
+    )
+
+
+def init_user_cache(app):
+    from core.ttl_cache import TTLCache
+
+    app.extensions['user_cache'] = TTLCache(app.config['USER_CACHE_TTL'],
+                                            app.config['USER_CACHE_SIZE'])
+
+
+def forget_cached_user(user):
+    """Drop `user` from this process's login cache after a model-method update."""
+    from flask import current_app, has_app_context
+
+    if user.id is not None and has_app_context():
+        cache = current_app.extensions.get('user_cache')
+        if cache is not None:
+            cache.invalidate(user.id)
+
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    """Session user, from a short-lived per-process cache of its users row.
+
+    A hit rebuilds the instance without a query and attaches it to the
+    session as already loaded, so relationships and updates work as usual.
+    Changes made by another process show up within USER_CACHE_TTL seconds.
+    """
+    from flask import current_app
+    from sqlalchemy.orm import make_transient_to_detached
+
+    user_id = int(user_id)
+    cache = current_app.extensions['user_cache']
+    row = cache.get(user_id)
+    if row is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            cache.put(user_id, {column.key: getattr(user, column.key)
+                                for column in User.__table__.columns})
+        return user
+
+    user = User(**row)
+    make_transient_to_detached(user)
+    user = db.session.merge(user, load=False)
+
+    # Today's usage is tracked by the quota ledger; show its live count.
+    usage = current_app.extensions['quota_ledger'].usage(user_id)
+    if usage is not None:
+        from sqlalchemy.orm.attributes import set_committed_value
+        set_committed_value(user, 'requests_today', usage)
+        set_committed_value(user, 'last_request_date', date.today())
+    return user